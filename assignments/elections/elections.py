@@ -1,24 +1,18 @@
-import pandas as pd
-import duckdb
 import os
+from cmu_datasets.duck import get_manager
+from cmu_datasets.paths import ELECTIONS_DB, ELECTIONS_DIR
+from cmu_datasets.profiling import step, traced
 
-def create_elections_database():
+def create_elections_database(base_path=ELECTIONS_DIR):
     """
     Creates a DuckDB database file from the CSV files in the elections dataset.
     
+    Args:
+        base_path: Directory holding the election CSV files (default: this dataset's).
+
     Returns:
         str: Path to the created database file
     """
-    # Determine base path depending on current working directory
-    if os.path.exists("candidates.csv"):
-        # Running from within elections directory
-        base_path = "."
-    elif os.path.exists("assignments/elections/candidates.csv"):
-        # Running from project root
-        base_path = "assignments/elections"
-    else:
-        raise FileNotFoundError("Cannot find election CSV files. Please run from project root or elections directory.")
-    
     db_path = os.path.join(base_path, "elections.duckdb")
     
     # Remove existing database if it exists
@@ -26,58 +20,58 @@ def create_elections_database():
         os.remove(db_path)
     
     # Read CSV files with appropriate separators and correct filenames
+    import pandas as pd  # only the build needs pandas; the connection test does not
+
     print("Loading CSV files...")
     candidates_df = pd.read_csv(os.path.join(base_path, "candidates.csv"), sep='\t')  # Tab-separated
     elections_df = pd.read_csv(os.path.join(base_path, "elections.csv"))
     parties_df = pd.read_csv(os.path.join(base_path, "parties.csv"))  # Corrected filename
     results_df = pd.read_csv(os.path.join(base_path, "results.csv"))  # Corrected filename
     
-    # Create DuckDB connection and tables
+    # Create DuckDB database and tables through the single writer
     print("Creating DuckDB database...")
-    conn = duckdb.connect(db_path)
+    db = get_manager(db_path, read_only=False)
     
     try:
-        # Create tables from dataframes
-        conn.execute("CREATE TABLE candidates AS SELECT * FROM candidates_df")
-        conn.execute("CREATE TABLE elections AS SELECT * FROM elections_df")
-        conn.execute("CREATE TABLE parties AS SELECT * FROM parties_df")
-        conn.execute("CREATE TABLE results AS SELECT * FROM results_df")
+        with step("create election tables"), db.writer() as conn:
+            # Create tables from dataframes
+            conn.register("candidates_df", candidates_df)
+            conn.register("elections_df", elections_df)
+            conn.register("parties_df", parties_df)
+            conn.register("results_df", results_df)
+            conn.execute("CREATE TABLE candidates AS SELECT * FROM candidates_df")
+            conn.execute("CREATE TABLE elections AS SELECT * FROM elections_df")
+            conn.execute("CREATE TABLE parties AS SELECT * FROM parties_df")
+            conn.execute("CREATE TABLE results AS SELECT * FROM results_df")
         
         # Verify tables were created
-        tables = conn.execute("SHOW TABLES").fetchall()
+        check = traced(db.cursor())
+        tables = check.execute("SHOW TABLES").fetchall()
         print(f"Created {len(tables)} tables:")
         for table in tables:
-            count = conn.execute(f"SELECT COUNT(*) FROM {table[0]}").fetchone()[0]
+            count = check.execute(f"SELECT COUNT(*) FROM {table[0]}").fetchone()[0]
             print(f"  - {table[0]}: {count} rows")
         
         print(f"\nDatabase created successfully at: {db_path}")
         return db_path
         
     finally:
-        conn.close()
+        db.close()
 
-def test_database_connection(db_path=None):
+def test_database_connection(db_path=ELECTIONS_DB):
     """
     Test the database connection and show basic information.
     
     Args:
-        db_path: Path to the database file. If None, uses default path.
+        db_path: Path to the database file (default: assignments/elections/elections.duckdb).
     """
-    if db_path is None:
-        # Determine database path depending on current working directory
-        if os.path.exists("elections.duckdb"):
-            db_path = "elections.duckdb"
-        elif os.path.exists("assignments/elections/elections.duckdb"):
-            db_path = "assignments/elections/elections.duckdb"
-        else:
-            db_path = "elections.duckdb"  # Default fallback
-    
     if not os.path.exists(db_path):
         print(f"Database not found at {db_path}. Run create_elections_database() first.")
         return False
     
     print(f"Connecting to database at: {db_path}")
-    conn = duckdb.connect(db_path)
+    db = get_manager(db_path, read_only=True)
+    conn = traced(db.cursor())
     
     try:
         # Test connection with a sample query
@@ -99,9 +93,10 @@ def test_database_connection(db_path=None):
         print("Connection successful! Recent election winners:")
         print("Year | Winner | Electoral Votes | Party")
         print("-" * 50)
-        for row in result:
-            party = row[3] if row[3] else "Independent"
-            print(f"{row[1]} | {row[0]} | {row[2]} | {party}")
+        # five rows: plain tuples; a record table would cost more in imports than the query
+        for name, election_year, electoral_votes, party_name in result:
+            party = party_name or "Independent"
+            print(f"{election_year} | {name} | {electoral_votes} | {party}")
         
         return True
         
@@ -109,7 +104,7 @@ def test_database_connection(db_path=None):
         print(f"Error testing database: {e}")
         return False
     finally:
-        conn.close()
+        db.close()
 
 if __name__ == "__main__":
     # Create the database
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Import Time Benchmark
+
+For every `python -m cmu_datasets` command, runs the script's module-level
+import statements in a fresh interpreter under `-X importtime` and reports:
+- total import time, and the three most expensive top-level packages
+- dependencies that are not installed (those imports are skipped)
+
+Then runs `elections-check` end to end (if elections.duckdb exists) and
+splits its wall time into interpreter startup, imports and the query.
+
+Run from the project root:
+    PYTHONPATH=. python benchmarks/import_time.py
+    python -m cmu_datasets bench-imports
+"""
+
+import ast
+import os
+import subprocess
+import sys
+import time
+
+from cmu_datasets.commands import COMMANDS, script_path
+from cmu_datasets.paths import ELECTIONS_DB, REPO_ROOT
+
+REPEATS = 3
+
+# Runs each import on its own so one missing package does not hide the rest
+PRELUDE = """
+import sys
+for statement in {statements!r}:
+    try:
+        exec(statement, {{}})
+    except ImportError as e:
+        print('MISSING', e.name, file=sys.stderr)
+"""
+
+
+def top_level_imports(path):
+    """Source of the import statements in a script's module body."""
+    source = path.read_text(encoding='utf-8')
+    return [ast.get_source_segment(source, node) for node in ast.parse(source).body
+            if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def parse_importtime(stderr):
+    """(total ms, {package: cumulative ms}, [missing]) from -X importtime output."""
+    packages, missing, total = {}, set(), 0.0
+    for line in stderr.splitlines():
+        if line.startswith('MISSING'):
+            missing.add(line.split()[1])
+            continue
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2]
+        total += self_us / 1000
+        # a package's own line carries its cumulative time, wherever it was imported from
+        name = name.strip()
+        if '.' not in name and name != 'cmu_datasets':
+            packages[name] = cumulative_us / 1000
+    return total, packages, sorted(missing)
+
+
+def time_imports(statements):
+    """Best-of-REPEATS import profile of a list of import statements."""
+    best = None
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    for _ in range(REPEATS):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', PRELUDE.format(statements=statements)],
+                              capture_output=True, text=True, env=env, cwd=REPO_ROOT)
+        profile = parse_importtime(proc.stderr)
+        if best is None or profile[0] < best[0]:
+            best = profile
+    return best
+
+
+def wall_time(*args):
+    """(best wall ms, import profile of that run) of `python -X importtime *args`."""
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', *args],
+                              capture_output=True, text=True, env=env, cwd=REPO_ROOT)
+        wall = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            return None
+        if best is None or wall < best[0]:
+            best = (wall, parse_importtime(proc.stderr))
+    return best
+
+
+def main():
+    baseline = time_imports([])[0]
+    print(f"Interpreter startup imports: {baseline:.0f} ms (included below)\n")
+    print(f"{'command':<20} {'imports':>9}  heaviest packages")
+    print("-" * 78)
+    seen = {}
+    for name in COMMANDS:
+        path = script_path(name)
+        statements = tuple(top_level_imports(path))
+        if statements not in seen:
+            seen[statements] = time_imports(list(statements))
+        total, packages, missing = seen[statements]
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:3]
+        top = ', '.join(f"{package} {ms:.0f}" for package, ms in heaviest)
+        note = f"  [not installed: {', '.join(missing)}]" if missing else ''
+        print(f"{name:<20} {total:>6.0f} ms  {top}{note}")
+
+    print()
+    if not ELECTIONS_DB.exists():
+        print(f"{ELECTIONS_DB} not found; run `python -m cmu_datasets elections` for the end-to-end check")
+        return
+    startup, (startup_imports, startup_packages, _) = wall_time('-c', 'pass')
+    result = wall_time('-m', 'cmu_datasets', 'elections-check')
+    if result is None:
+        print("elections-check failed")
+        return
+    wall, (imports, packages, _) = result
+    imports -= startup_imports
+    heaviest = sorted((item for item in packages.items() if item[0] not in startup_packages),
+                      key=lambda item: -item[1])[:2]
+    top = ', '.join(f"{package} {ms:.0f}" for package, ms in heaviest)
+    print(f"elections-check end to end: {wall:.0f} ms wall = {startup:.0f} ms interpreter startup"
+          f" + {imports:.0f} ms imports ({top}) + {wall - startup - imports:.0f} ms query and output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Table Extraction Benchmark
+
+Scales the bundled web_page.html up with synthetic standings tables and
+times three ways of turning them into DataFrames:
+- the BeautifulSoup loop from scrape.py (html.parser, get_text per cell)
+- pandas.read_html (if lxml is installed, as it is for cmu_datasets.tables)
+- cmu_datasets.tables.read_tables (streaming lxml parser)
+
+Run from the project root:
+    PYTHONPATH=. python benchmarks/table_extraction.py
+"""
+
+import random
+import time
+from io import StringIO
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from cmu_datasets.tables import read_tables
+
+ROW_COUNTS = [100, 1_000, 10_000, 50_000]
+TABLES_PER_PAGE = 3
+REPEATS = 3
+
+
+def synthetic_table(n_rows, seed):
+    """One league-standings style table with n_rows rows."""
+    rng = random.Random(seed)
+    rows = ["<tr><th>Pos</th><th>Club</th><th>Played</th><th>Points</th><th>Goal Diff</th><th>Attendance</th></tr>"]
+    for i in range(1, n_rows + 1):
+        rows.append(
+            f"<tr><td>{i}</td><td><a href='/club/{i}'>Club {i}</a></td>"
+            f"<td>{rng.randint(1, 34)}</td><td>{rng.randint(0, 99)}</td>"
+            f"<td>{rng.uniform(-40, 40):.1f}</td><td>{rng.randint(1000, 60000):,}</td></tr>"
+        )
+    return f"<table class='standings'>{''.join(rows)}</table>"
+
+
+def build_page(n_rows):
+    """Insert synthetic tables into the bundled web page."""
+    with open('web_page.html', encoding='utf-8') as f:
+        page = f.read()
+    tables = ''.join(synthetic_table(n_rows, seed) for seed in range(TABLES_PER_PAGE))
+    return page.replace('</div>', tables + '</div>', 1)
+
+
+def soup_loop(html):
+    """The per-cell BeautifulSoup extraction used in scrape.py."""
+    soup = BeautifulSoup(html, 'html.parser')
+    frames = []
+    for table in soup.find_all('table'):
+        rows = []
+        for tr in table.find_all('tr'):
+            rows.append([cell.get_text(strip=True) for cell in tr.find_all(['td', 'th'])])
+        frames.append(pd.DataFrame(rows[1:], columns=rows[0]))
+    return frames
+
+
+def pandas_read_html(html):
+    return pd.read_html(StringIO(html), flavor='lxml')
+
+
+def timed(func, html):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        frames = func(html)
+        best = min(best, time.perf_counter() - start)
+    assert len(frames) == TABLES_PER_PAGE
+    return best
+
+
+def main():
+    methods = [
+        ('bs4 loop', soup_loop),
+        ('pandas.read_html', pandas_read_html),
+        ('read_tables', read_tables),
+    ]
+    print(f"{'Rows/table':<12} {'Page (KB)':<10} " + ' '.join(f"{name:<18}" for name, _ in methods))
+    print("-" * 80)
+    for n_rows in ROW_COUNTS:
+        html = build_page(n_rows)
+        cells = []
+        for _, func in methods:
+            try:
+                cells.append(f"{timed(func, html):<18.3f}")
+            except ImportError:
+                cells.append(f"{'n/a':<18}")
+        print(f"{n_rows:<12,} {len(html) / 1024:<10.0f} " + ' '.join(cells))
+    print("\nBest of", REPEATS, "runs, seconds per page")
+
+
+if __name__ == "__main__":
+    main()
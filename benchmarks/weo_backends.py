@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+"""
+WEO Backend Benchmark
+
+Replays the WEO EDA query set (clean/weo/eda.py / eda_db.py) against three
+backends holding the same synthetic data:
+- duckdb:   a DuckDB database file, as built by clean/weo/weo.py
+- postgres: PostgreSQL, as built by clean/weo/weo_postgres.py
+- pandas:   DataFrames read from the flat CSVs, each query in pandas
+
+The data has the EDA scripts' schema (countries, metrics with the subject
+metadata, indicators with one observation per country, subject and year,
+plus the obs_stats_year / obs_stats_country summaries) and is generated
+from the real countries.csv and indicators.csv. Scale 1 is the real WEO
+size (every country and subject, 1980-2030, ~450k observations). Scale k
+adds synthetic countries, giving k times the observations with the same
+subjects and years, so each query selects k times the rows.
+
+Each backend loads the CSVs once per scale (the load time is reported).
+Then every query is run once to warm up and timed REPEATS times, or until
+it has used --max-seconds. The report gives p50 / p95 / p99 latency per
+query, the throughput of the whole query mix (queries per second, one
+client) and a check that every backend returns the same number of rows.
+The pandas backend has no summary tables, so it aggregates the
+observations for the queries that read them.
+
+Postgres runs in a throwaway cluster when `initdb` and `pg_ctl` are on
+PATH or under `pg_config --bindir`. The cluster lives in a temporary
+directory with a Unix socket and no TCP listener, and is deleted
+afterwards. `--postgres-url` uses an existing server instead; the tables
+go in a scratch schema that is dropped at the end. Without either (or
+without psycopg2) the postgres backend is skipped.
+
+Run from the project root:
+    PYTHONPATH=. python benchmarks/weo_backends.py                    # scales 1, 10, 100
+    PYTHONPATH=. python benchmarks/weo_backends.py --scales 1 10 --backends duckdb pandas
+    python -m cmu_datasets bench-backends --postgres-url postgresql://user@localhost/scratch --output bench.csv
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from cmu_datasets import screening, timeseries
+from cmu_datasets.normalize import WEO_COLUMNS, normalize
+from cmu_datasets.paths import WEO_DIR
+from cmu_datasets.summaries import DDL, TABLES
+
+SCALES = [1, 10, 100]
+BACKENDS = ['duckdb', 'postgres', 'pandas']
+REPEATS = 30
+MAX_SECONDS = 10.0   # per query and backend, after at least MIN_RUNS runs
+MIN_RUNS = 5
+PERCENTILES = [50, 95, 99]
+
+YEARS = np.arange(1980, 2031)
+MISSING = 0.08       # share of observations without a value
+SCHEMA = 'weo_bench'
+
+# name: SQL, params ('?' placeholders), pandas equivalent (frames dict -> DataFrame),
+# finish: optional step applied to every backend's result (NumPy work after a fetch)
+Query = namedtuple('Query', ['name', 'sql', 'params', 'pandas', 'finish'])
+
+# name, load seconds, run(query) -> DataFrame, close()
+Backend = namedtuple('Backend', ['name', 'load_seconds', 'run', 'close'])
+
+Result = namedtuple('Result', ['scale', 'observations', 'backend', 'query', 'runs', 'rows',
+                               'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'])
+
+
+# ============================================================================
+# SYNTHETIC DATA
+# ============================================================================
+
+def _iso_codes(existing, n):
+    """`n` three-character codes (letters and digits) not among `existing`."""
+    alphabet = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    codes = []
+    if n <= 0:
+        return codes
+    for i in range(36 ** 3):
+        code = alphabet[i // 1296] + alphabet[i // 36 % 36] + alphabet[i % 36]
+        if code not in existing and not code.isalpha():
+            codes.append(code)
+            if len(codes) == n:
+                return codes
+    raise ValueError(f"Cannot make {n} synthetic country codes")
+
+
+def synthetic_weo(scale, seed=0):
+    """
+    countries, metrics and indicators (observations) DataFrames at `scale`.
+
+    Percent-type subjects are noisy rates around a per-country level;
+    the other subjects are level series growing from a per-country base,
+    so thresholds, growth and CAGR queries select realistic shares.
+    """
+    rng = np.random.default_rng(seed)
+    # cleaned as the loaders clean them (blank rows dropped, flags as bool)
+    base = normalize(pd.read_csv(WEO_DIR / 'countries.csv'), **WEO_COLUMNS['countries'])
+    base = base.dropna(subset=['iso_code']).reset_index(drop=True)
+    metrics = pd.read_csv(WEO_DIR / 'indicators.csv').dropna(subset=['subject_code'])
+
+    countries = [base]
+    codes = iter(_iso_codes(set(base['iso_code']), len(base) * (scale - 1)))
+    for copy in range(1, scale):
+        extra = base.copy()
+        extra['iso_code'] = [next(codes) for _ in range(len(base))]
+        extra['name'] = extra['name'] + f" {copy}"
+        countries.append(extra)
+    countries = pd.concat(countries, ignore_index=True)
+    countries['country_id'] = np.arange(1, len(countries) + 1)
+
+    n_countries, n_subjects, n_years = len(countries), len(metrics), len(YEARS)
+    rate = metrics['units'].str.startswith('Percent').to_numpy()
+    series = n_countries * n_subjects
+    level = rng.normal(3, 3, series)
+    start = np.exp(rng.normal(8, 2, series))
+    growth = rng.normal(0.03, 0.05, (series, n_years))
+    values = np.where(np.tile(rate, n_countries)[:, None],
+                      level[:, None] + rng.normal(0, 3, (series, n_years)),
+                      start[:, None] * np.exp(np.cumsum(growth, axis=1)))
+    values[rng.random(values.shape) < MISSING] = np.nan
+
+    indicators = pd.DataFrame({
+        'iso_code': np.repeat(countries['iso_code'].to_numpy(), n_subjects * n_years),
+        'subject_code': np.tile(np.repeat(metrics['subject_code'].to_numpy(), n_years), n_countries),
+        'year': np.tile(YEARS, series),
+        'value': values.ravel(),
+    })
+    return {'countries': countries, 'metrics': metrics, 'indicators': indicators}
+
+
+def write_csvs(frames, directory):
+    """The frames as CSV files (nulls as empty fields); returns {table: path}."""
+    import pyarrow as pa
+    import pyarrow.csv as csv
+
+    paths = {}
+    for table, frame in frames.items():
+        paths[table] = os.path.join(directory, f"{table}.csv")
+        csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), paths[table])
+    return paths
+
+
+# ============================================================================
+# QUERY SET
+# ============================================================================
+
+MAJOR_ECONOMIES = ['USA', 'CHN', 'JPN', 'DEU', 'GBR', 'IND', 'FRA', 'ITA', 'BRA', 'CAN']
+SCREENED = ['NGDPDPC', 'LUR']
+CORRELATED = ['NGDPDPC', 'NGDP_RPCH', 'PCPIPCH', 'LUR', 'GGXWDG_NGDP', 'GGXCNL_NGDP',
+              'BCA_NGDPD', 'NID_NGDP', 'NGSD_NGDP', 'TX_RPCH', 'TM_RPCH']
+TREND_YEAR = 2024
+
+
+def _observed(data):
+    ind = data['indicators']
+    return ind[ind['value'].notna()]
+
+
+def _latest(ind, subject):
+    rows = ind[ind['subject_code'] == subject]
+    return rows[rows['year'] == rows['year'].max()]
+
+
+def _pd_overview(data):
+    return pd.DataFrame([{table: len(data[table]) for table in ['countries', 'metrics', 'indicators']}])
+
+
+def _pd_year_range(data):
+    years = data['indicators']['year']
+    return pd.DataFrame([{'min_year': years.min(), 'max_year': years.max(), 'num_years': years.nunique()}])
+
+
+def _pd_top_subjects(data):
+    return data['indicators']['subject_code'].value_counts().head(10).rename('count').reset_index()
+
+
+def _pd_top_countries(data):
+    counts = _observed(data).groupby('iso_code').size().rename('data_points').reset_index()
+    return (counts.merge(data['countries'][['iso_code', 'name']], on='iso_code')
+            .nlargest(10, 'data_points')[['name', 'data_points']])
+
+
+def _pd_gdp_major(data):
+    ind = data['indicators']
+    rows = ind[(ind['subject_code'] == 'NGDPD') & (ind['year'] >= 2020) & ind['iso_code'].isin(MAJOR_ECONOMIES)]
+    return (rows.merge(data['countries'][['iso_code', 'name']], on='iso_code')
+            .merge(data['metrics'][['subject_code', 'units']], on='subject_code')
+            .sort_values(['year', 'value'], ascending=[True, False])[['name', 'year', 'value', 'units']])
+
+
+def _pd_g7_growth(data):
+    ind = data['indicators']
+    g7 = data['countries'][data['countries']['group_g7']]
+    rows = ind[(ind['subject_code'] == 'NGDP_RPCH') & (ind['year'] >= 2010)]
+    return rows.merge(g7[['iso_code', 'name']], on='iso_code').sort_values(['name', 'year'])[['name', 'year', 'value']]
+
+
+def _pd_gdp_trends(data):
+    ind = _observed(data)
+    gdp = timeseries.panel(ind[ind['subject_code'] == 'NGDP_R'])
+    growth = timeseries.yoy(gdp)
+    return timeseries.to_frame(gdp, growth=growth, cagr=timeseries.cagr(gdp, 5),
+                               rolling_mean=timeseries.rolling_mean(gdp, 5),
+                               volatility=timeseries.rolling_std(growth, 5),
+                               growth_rank=timeseries.rank(growth))
+
+
+def _pd_regional_gdp(data):
+    rows = _latest(data['indicators'], 'NGDPDPC').merge(data['countries'][['iso_code', 'region7']], on='iso_code')
+    return (rows.groupby('region7', dropna=False)['value'].agg(avg_gdp_per_capita='mean', country_count='size')
+            .reset_index().sort_values('avg_gdp_per_capita', ascending=False))
+
+
+def _pd_availability(data):
+    return (_observed(data).groupby('year')
+            .agg(observations=('value', 'size'), countries=('iso_code', 'nunique'), metrics=('subject_code', 'nunique'))
+            .reset_index())
+
+
+def _pd_value_stats(data):
+    ind = data['indicators']
+    value = ind['value']
+    return pd.DataFrame([{'n': value.count(), 'mean': value.mean(), 'std': value.std(),
+                          'min': value.min(), 'max': value.max(),
+                          'countries': ind['iso_code'].nunique(), 'subjects': ind['subject_code'].nunique()}])
+
+
+def _pd_high_inflation(data):
+    ind = data['indicators']
+    rows = ind[(ind['subject_code'] == 'PCPIPCH') & (ind['year'] >= 2020) & (ind['value'] > 20)]
+    return (rows.nlargest(10, 'value').merge(data['countries'][['iso_code', 'name']], on='iso_code')
+            [['name', 'year', 'value']])
+
+
+def _pd_indicator_rows(subjects, years=None):
+    def rows(data):
+        ind = _observed(data)
+        keep = ind['subject_code'].isin(subjects)
+        if years is not None:
+            keep &= ind['year'].isin(years)
+        return ind[keep][['iso_code', 'subject_code', 'year', 'value']]
+    return rows
+
+
+def _screen(df):
+    matrix = screening.align(df, SCREENED, 'latest')
+    return screening.to_frame(matrix, rows=screening.screen(matrix, {'NGDPDPC': ('>', 30000), 'LUR': ('<', 5)}))
+
+
+def _correlate(df):
+    return screening.correlation(screening.align(df, CORRELATED, TREND_YEAR), method='spearman')
+
+
+def query_set():
+    """The EDA scripts' queries, in the order they run."""
+    major = ', '.join(f"'{iso}'" for iso in MAJOR_ECONOMIES)
+    trends_sql, trends_params = timeseries.window_query('NGDP_R', window=5)
+    screen_sql, screen_params = screening.query(SCREENED, 'latest')
+    corr_sql, corr_params = screening.query(CORRELATED, TREND_YEAR)
+    return [
+        Query('overview_counts', """
+            SELECT (SELECT COUNT(*) FROM countries) AS countries,
+                   (SELECT COUNT(*) FROM metrics) AS metrics,
+                   (SELECT COUNT(*) FROM indicators) AS indicators""", [], _pd_overview, None),
+        Query('year_range', """
+            SELECT MIN(year) as min_year, MAX(year) as max_year, COUNT(DISTINCT year) as num_years
+            FROM indicators""", [], _pd_year_range, None),
+        Query('top_subjects', """
+            SELECT subject_code, COUNT(*) as count
+            FROM indicators
+            GROUP BY subject_code
+            ORDER BY count DESC
+            LIMIT 10""", [], _pd_top_subjects, None),
+        Query('top_countries', """
+            SELECT c.name, s.n as data_points
+            FROM obs_stats_country s
+            JOIN countries c ON s.iso_code = c.iso_code
+            ORDER BY data_points DESC
+            LIMIT 10""", [], _pd_top_countries, None),
+        Query('gdp_major', f"""
+            SELECT c.name, i.year, i.value, m.units
+            FROM indicators i
+            JOIN countries c ON i.iso_code = c.iso_code
+            JOIN metrics m ON i.subject_code = m.subject_code
+            WHERE i.subject_code = 'NGDPD'
+              AND i.year >= 2020
+              AND c.iso_code IN ({major})
+            ORDER BY i.year, i.value DESC""", [], _pd_gdp_major, None),
+        Query('g7_growth', """
+            SELECT c.name, i.year, i.value
+            FROM indicators i
+            JOIN countries c ON i.iso_code = c.iso_code
+            WHERE i.subject_code = 'NGDP_RPCH'
+              AND c.group_g7 = true
+              AND i.year >= 2010
+            ORDER BY c.name, i.year""", [], _pd_g7_growth, None),
+        Query('gdp_trends', trends_sql, trends_params, _pd_gdp_trends, None),
+        Query('regional_gdp', """
+            SELECT c.region7, AVG(i.value) as avg_gdp_per_capita, COUNT(*) as country_count
+            FROM indicators i
+            JOIN countries c ON i.iso_code = c.iso_code
+            WHERE i.subject_code = 'NGDPDPC'
+              AND i.year = (SELECT MAX(year) FROM indicators WHERE subject_code = 'NGDPDPC')
+            GROUP BY c.region7
+            ORDER BY avg_gdp_per_capita DESC""", [], _pd_regional_gdp, None),
+        Query('availability_by_year', """
+            SELECT year, n as observations, countries, subjects as metrics
+            FROM obs_stats_year
+            ORDER BY year""", [], _pd_availability, None),
+        Query('value_stats', """
+            SELECT COUNT(value) AS n, AVG(value) AS mean, STDDEV_SAMP(value) AS std,
+                   MIN(value) AS min, MAX(value) AS max,
+                   COUNT(DISTINCT iso_code) AS countries, COUNT(DISTINCT subject_code) AS subjects
+            FROM indicators""", [], _pd_value_stats, None),
+        Query('high_inflation', """
+            SELECT c.name, i.year, i.value as inflation_rate
+            FROM indicators i
+            JOIN countries c ON i.iso_code = c.iso_code
+            WHERE i.subject_code = 'PCPIPCH'
+              AND i.year >= 2020
+              AND i.value > 20
+            ORDER BY i.value DESC
+            LIMIT 10""", [], _pd_high_inflation, None),
+        Query('economic_screen', screen_sql, screen_params, _pd_indicator_rows(SCREENED), _screen),
+        Query('indicator_correlations', corr_sql, corr_params,
+              _pd_indicator_rows(CORRELATED, [TREND_YEAR]), _correlate),
+    ]
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+TABLE_DDL = {
+    'countries': """CREATE TABLE countries (
+        country_id INTEGER PRIMARY KEY,
+        iso_code VARCHAR(3) UNIQUE NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        region7 VARCHAR(50),
+        econ_group VARCHAR(50),
+        group_g7 BOOLEAN,
+        group_european_union BOOLEAN,
+        group_asean5 BOOLEAN
+    )""",
+    'metrics': """CREATE TABLE metrics (
+        indicator_id INTEGER PRIMARY KEY,
+        subject_code VARCHAR(20) UNIQUE NOT NULL,
+        description TEXT,
+        notes TEXT,
+        units TEXT,
+        scale TEXT
+    )""",
+    'indicators': """CREATE TABLE indicators (
+        iso_code VARCHAR(3) NOT NULL,
+        subject_code VARCHAR(20) NOT NULL,
+        year INTEGER NOT NULL,
+        value DOUBLE PRECISION
+    )""",
+}
+
+# the loaders' indexes, on the EDA table names
+INDEXES = [
+    "CREATE INDEX idx_indicators_iso ON indicators(iso_code)",
+    "CREATE INDEX idx_indicators_subject ON indicators(subject_code)",
+    "CREATE INDEX idx_indicators_year ON indicators(year)",
+]
+
+_SUMMARY_DDL = dict(zip(TABLES, DDL))
+
+# obs_stats_year / obs_stats_country as the loaders leave them (non-missing values only)
+SUMMARIES = [
+    _SUMMARY_DDL['obs_stats_year'],
+    """INSERT INTO obs_stats_year
+       SELECT year, COUNT(DISTINCT iso_code), COUNT(DISTINCT subject_code), COUNT(*),
+              AVG(value), VAR_POP(value) * COUNT(*), MIN(value), MAX(value)
+       FROM indicators WHERE value IS NOT NULL GROUP BY year""",
+    _SUMMARY_DDL['obs_stats_country'],
+    """INSERT INTO obs_stats_country
+       SELECT iso_code, MIN(year), MAX(year), COUNT(*),
+              AVG(value), VAR_POP(value) * COUNT(*), MIN(value), MAX(value)
+       FROM indicators WHERE value IS NOT NULL GROUP BY iso_code""",
+]
+
+
+def duckdb_backend(paths, directory):
+    import duckdb
+
+    start = time.perf_counter()
+    conn = duckdb.connect(os.path.join(directory, 'weo-bench.duckdb'))
+    for table, ddl in TABLE_DDL.items():
+        conn.execute(ddl)
+        conn.execute(f"INSERT INTO {table} SELECT * FROM read_csv(?, header = true)", [paths[table]])
+    for sql in INDEXES + SUMMARIES:
+        conn.execute(sql)
+    seconds = time.perf_counter() - start
+
+    def run(query):
+        return conn.execute(query.sql, query.params).df()
+
+    return Backend('duckdb', seconds, run, conn.close)
+
+
+def postgres_backend(paths, url):
+    import psycopg2
+
+    start = time.perf_counter()
+    conn = psycopg2.connect(url)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    cursor.execute(f"SET search_path TO {SCHEMA}")
+    for table, ddl in TABLE_DDL.items():
+        cursor.execute(ddl)
+        with open(paths[table], encoding='utf-8') as f:
+            cursor.copy_expert(f"COPY {table} FROM STDIN WITH (FORMAT csv, HEADER true)", f)
+    for sql in INDEXES + SUMMARIES:
+        cursor.execute(sql)
+    conn.commit()
+    conn.autocommit = True
+    cursor.execute("ANALYZE")
+    seconds = time.perf_counter() - start
+
+    def run(query):
+        # psycopg2 placeholders are %s, and a literal % must be doubled
+        cursor.execute(query.sql.replace('%', '%%').replace('?', '%s'), query.params)
+        return pd.DataFrame(cursor.fetchall(), columns=[c.name for c in cursor.description])
+
+    def close():
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+    return Backend('postgres', seconds, run, close)
+
+
+def pandas_backend(paths):
+    start = time.perf_counter()
+    data = {table: pd.read_csv(path, engine='pyarrow') for table, path in paths.items()}
+    seconds = time.perf_counter() - start
+    return Backend('pandas', seconds, lambda query: query.pandas(data), lambda: None)
+
+
+def _postgres_bin(name):
+    found = shutil.which(name)
+    if found or not shutil.which('pg_config'):
+        return found
+    bindir = subprocess.run(['pg_config', '--bindir'], capture_output=True, text=True).stdout.strip()
+    path = os.path.join(bindir, name)
+    return path if os.path.exists(path) else None
+
+
+@contextmanager
+def throwaway_postgres():
+    """
+    A private PostgreSQL cluster in a temporary directory, reachable only
+    through a Unix socket there; yields its connection URL (None if the
+    server binaries are not installed).
+    """
+    initdb, pg_ctl = _postgres_bin('initdb'), _postgres_bin('pg_ctl')
+    if not (initdb and pg_ctl):
+        yield None
+        return
+    with tempfile.TemporaryDirectory(prefix='weo-bench-pg-') as directory:
+        data = os.path.join(directory, 'data')
+        subprocess.run([initdb, '-D', data, '-U', 'bench', '--auth=trust', '--no-sync', '-E', 'UTF8'],
+                       check=True, capture_output=True)
+        options = f"-k {directory} -c listen_addresses='' -c fsync=off -c synchronous_commit=off"
+        subprocess.run([pg_ctl, '-D', data, '-o', options, '-l', os.path.join(directory, 'server.log'),
+                        '-w', 'start'], check=True, capture_output=True)
+        try:
+            yield f"postgresql://bench@/postgres?host={directory}"
+        finally:
+            subprocess.run([pg_ctl, '-D', data, '-m', 'immediate', 'stop'], capture_output=True)
+
+
+@contextmanager
+def postgres_server(url=None, enabled=True):
+    """`url` if given, else a throwaway cluster; None when postgres cannot run."""
+    try:
+        import psycopg2  # noqa: F401
+    except ImportError:
+        enabled = False
+    if not enabled or url:
+        yield url if enabled else None
+        return
+    with throwaway_postgres() as url:
+        yield url
+
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+def time_query(backend, query, repeats, max_seconds):
+    """(latencies in ms, result rows): one warm-up run, then up to `repeats` timed runs."""
+    result = backend.run(query)
+    if query.finish:
+        result = query.finish(result)
+    latencies, spent = [], 0.0
+    while len(latencies) < repeats and (len(latencies) < MIN_RUNS or spent < max_seconds):
+        start = time.perf_counter()
+        out = backend.run(query)
+        if query.finish:
+            query.finish(out)
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed * 1000)
+        spent += elapsed
+    return np.array(latencies), len(result)
+
+
+def bench_scale(scale, backends, args, postgres_url, queries):
+    """Results of every backend and query at one scale."""
+    frames = synthetic_weo(scale, seed=args.seed)
+    observations = len(frames['indicators'])
+    results = []
+    with tempfile.TemporaryDirectory(prefix='weo-bench-', dir=args.workdir) as directory:
+        paths = write_csvs(frames, directory)
+        del frames
+        size = sum(os.path.getsize(path) for path in paths.values()) / 1e6
+        print(f"\n=== Scale {scale}x: {observations:,} observations ({size:,.0f} MB of CSV) ===")
+
+        for name in backends:
+            if name == 'duckdb':
+                backend = duckdb_backend(paths, directory)
+            elif name == 'postgres':
+                backend = postgres_backend(paths, postgres_url)
+            else:
+                backend = pandas_backend(paths)
+            print(f"{name}: loaded in {backend.load_seconds:.1f} s")
+            try:
+                for query in queries:
+                    latencies, rows = time_query(backend, query, args.repeats, args.max_seconds)
+                    p50, p95, p99 = np.percentile(latencies, PERCENTILES)
+                    results.append(Result(scale, observations, name, query.name, len(latencies), rows,
+                                          p50, p95, p99, latencies.mean()))
+            finally:
+                backend.close()
+    return results
+
+
+def print_scale(results, backends, queries):
+    """Latency table (p50 / p95 / p99 ms per backend), throughput and row-count check."""
+    by_key = {(r.backend, r.query): r for r in results}
+    width = 24
+    print(f"\n{'query':<24}" + ''.join(f"{name + ' p50/p95/p99 ms':>{width}}" for name in backends))
+    print("-" * (24 + width * len(backends)))
+    mismatched = []
+    for query in queries:
+        cells = []
+        for name in backends:
+            r = by_key[(name, query.name)]
+            cells.append(f"{f'{r.p50_ms:.1f} / {r.p95_ms:.1f} / {r.p99_ms:.1f}':>{width}}")
+        print(f"{query.name:<24}" + ''.join(cells))
+        if len({by_key[(name, query.name)].rows for name in backends}) > 1:
+            mismatched.append(query.name)
+
+    throughput = []
+    for name in backends:
+        mix = [by_key[(name, query.name)] for query in queries]
+        # one pass over the query mix at each query's mean latency
+        throughput.append(f"{len(mix) / (sum(r.mean_ms for r in mix) / 1000):>{width}.1f}")
+    print(f"{'throughput (queries/s)':<24}" + ''.join(throughput))
+    if mismatched:
+        print(f"Row counts differ between backends for: {', '.join(mismatched)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the WEO EDA queries on DuckDB, PostgreSQL and pandas")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES,
+                        help="multiples of the real WEO observation count (default: 1 10 100)")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS)
+    parser.add_argument('--repeats', type=int, default=REPEATS, help="timed runs per query")
+    parser.add_argument('--max-seconds', type=float, default=MAX_SECONDS,
+                        help=f"stop repeating a query after this long (at least {MIN_RUNS} runs)")
+    parser.add_argument('--postgres-url', default=None,
+                        help="existing server to use (tables go in a scratch schema); "
+                             "default: a throwaway local cluster")
+    parser.add_argument('--workdir', default=None, help="directory for the CSVs and DuckDB file (default: temp)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="also write the results as CSV")
+    args = parser.parse_args(argv)
+
+    backends = list(args.backends)
+    queries = query_set()
+    results = []
+    with postgres_server(args.postgres_url, enabled='postgres' in backends) as url:
+        if 'postgres' in backends and url is None:
+            print("Skipping postgres: needs psycopg2 and either --postgres-url or initdb / pg_ctl")
+            backends.remove('postgres')
+        for scale in args.scales:
+            scale_results = bench_scale(scale, backends, args, url, queries)
+            print_scale(scale_results, backends, queries)
+            results += scale_results
+
+    print(f"\nLatency over up to {args.repeats} runs per query after a warm-up run "
+          f"(at least {MIN_RUNS}, stopping after {args.max_seconds:g} s)")
+    if args.output:
+        pd.DataFrame(results, columns=Result._fields).round(3).to_csv(args.output, index=False)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
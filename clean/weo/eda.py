@@ -1,16 +1,27 @@
 # Exploratory Data Analysis - WEO Database
 # Run this code line by line or in sections for interactive exploration
 
-import pandas as pd
-import duckdb
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
 
-# Connect to the database
-conn = duckdb.connect('clean/weo/weo.duckdb')
+import pandas as pd
+# matplotlib / seaborn are not imported here: they add seconds of startup to
+# the scheduled runs; import them in the session before plotting
+
+from cmu_datasets.approx import print_summary, summarize
+from cmu_datasets.duck import connect_readonly
+from cmu_datasets.paths import WEO_OBSERVATIONS
+from cmu_datasets.profiling import traced
+from cmu_datasets.screening import correlation, load
+from cmu_datasets.timeseries import cagr, panel, rank, rolling_std, to_frame, yoy
+
+# Connect to the database (read-only, so several sessions can share the file)
+# (statement timings go to $CMU_TRACE_FILE when it is set)
+conn = traced(connect_readonly('clean/weo/weo.duckdb'))
 conn
 
+# Data-quality summaries are sampled, with error bounds, unless CMU_EDA_EXACT=1
+EXACT = os.getenv('CMU_EDA_EXACT') == '1'
+
 # ============================================================================
 # 1. BASIC DATABASE OVERVIEW
 # ============================================================================
@@ -18,12 +29,12 @@ conn
 # Check table sizes
 print("=== DATABASE OVERVIEW ===")
 countries_count = conn.execute("SELECT COUNT(*) FROM countries").fetchone()[0]
-indicators_count = conn.execute("SELECT COUNT(*) FROM indicators").fetchone()[0] 
-metrics_count = conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+indicators_count = conn.execute("SELECT COUNT(*) FROM indicators").fetchone()[0]
+observations_count = conn.execute(f"SELECT COUNT(*) FROM {WEO_OBSERVATIONS}").fetchone()[0]
 
 print(f"Countries: {countries_count}")
-print(f"Indicators: {indicators_count:,}")
-print(f"Metrics: {metrics_count}")
+print(f"Indicators: {indicators_count}")
+print(f"Observations: {observations_count:,}")
 
 # ============================================================================
 # 2. EXPLORE COUNTRIES TABLE
@@ -50,44 +61,44 @@ print(f"EU countries: {countries['group_european_union'].sum()}")
 print(f"ASEAN5 countries: {countries['group_asean5'].sum()}")
 
 # ============================================================================
-# 3. EXPLORE METRICS TABLE  
+# 3. EXPLORE INDICATORS TABLE (definitions)
 # ============================================================================
 
-print("\n=== METRICS TABLE ===")
+print("\n=== INDICATORS TABLE ===")
 
-# Load metrics as DataFrame
-metrics = conn.execute("SELECT * FROM metrics").df()
-print(f"Metrics shape: {metrics.shape}")
-metrics
+# Load indicator definitions as DataFrame
+indicators = conn.execute("SELECT * FROM indicators").df()
+print(f"Indicators shape: {indicators.shape}")
+indicators
 
 # Most common units
 print("\nMost common units:")
-print(metrics['units'].value_counts().head(10))
+print(indicators['units'].value_counts().head(10))
 
 # Most common scales
 print("\nMost common scales:")
-print(metrics['scale'].value_counts())
+print(indicators['scale'].value_counts())
 
-# Sample metrics
-print("\nSample metrics:")
-print(metrics[['subject_code', 'description']].head(10))
+# Sample indicators
+print("\nSample indicators:")
+print(indicators[['subject_code', 'description']].head(10))
 
 # ============================================================================
-# 4. EXPLORE INDICATORS TABLE
+# 4. EXPLORE OBSERVATIONS TABLE
 # ============================================================================
 
-print("\n=== INDICATORS TABLE ===")
+print("\n=== OBSERVATIONS TABLE ===")
 
-# Basic stats on indicators
+# Basic stats on observations
 print("Year range:")
-year_stats = conn.execute("SELECT MIN(year) as min_year, MAX(year) as max_year, COUNT(DISTINCT year) as num_years FROM indicators").fetchone()
+year_stats = conn.execute(f"SELECT MIN(year) as min_year, MAX(year) as max_year, COUNT(DISTINCT year) as num_years FROM {WEO_OBSERVATIONS}").fetchone()
 print(f"Years: {year_stats[0]} - {year_stats[1]} ({year_stats[2]} years)")
 
 # Most common metrics
 print("\nTop 10 most common subject codes:")
-top_subjects = conn.execute("""
+top_subjects = conn.execute(f"""
     SELECT subject_code, COUNT(*) as count 
-    FROM indicators 
+    FROM {WEO_OBSERVATIONS} 
     GROUP BY subject_code 
     ORDER BY count DESC 
     LIMIT 10
@@ -97,10 +108,9 @@ print(top_subjects)
 # Countries with most data
 print("\nTop 10 countries with most data points:")
 top_countries = conn.execute("""
-    SELECT c.name, COUNT(*) as data_points
-    FROM indicators i
-    JOIN countries c ON i.iso_code = c.iso_code
-    GROUP BY c.name
+    SELECT c.name, s.n as data_points
+    FROM obs_stats_country s
+    JOIN countries c ON s.iso_code = c.iso_code
     ORDER BY data_points DESC
     LIMIT 10
 """).df()
@@ -113,11 +123,11 @@ print(top_countries)
 print("\n=== GDP ANALYSIS ===")
 
 # Get GDP data for major economies in recent years
-gdp_data = conn.execute("""
-    SELECT c.name, i.year, i.value, m.units
-    FROM indicators i
+gdp_data = conn.execute(f"""
+    SELECT c.name, i.year, i.value, d.units
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code  
-    JOIN metrics m ON i.subject_code = m.subject_code
+    JOIN indicators d ON i.subject_code = d.subject_code
     WHERE i.subject_code = 'NGDPD'  -- GDP in USD billions
       AND i.year >= 2020
       AND c.iso_code IN ('USA', 'CHN', 'JPN', 'DEU', 'GBR', 'IND', 'FRA', 'ITA', 'BRA', 'CAN')
@@ -134,9 +144,9 @@ print(gdp_data)
 print("\n=== TIME SERIES ANALYSIS ===")
 
 # GDP growth rates for G7 countries
-growth_data = conn.execute("""
+growth_data = conn.execute(f"""
     SELECT c.name, i.year, i.value
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'NGDP_RPCH'  -- GDP growth rate
       AND c.group_g7 = true
@@ -154,6 +164,29 @@ if not growth_data.empty:
     print("\nGDP Growth Rates (%) - G7 Countries:")
     print(growth_pivot.round(2))
 
+# Derived from the real GDP level series, for all countries at once:
+# growth, 5-year CAGR, 5-year volatility of growth and the CAGR ranking
+real_gdp = panel(conn.execute(f"""
+    SELECT iso_code, year, value
+    FROM {WEO_OBSERVATIONS}
+    WHERE subject_code = 'NGDP_R' AND value IS NOT NULL  -- real GDP, national currency
+""").df())
+real_growth = yoy(real_gdp)
+real_cagr = cagr(real_gdp, 5)
+gdp_trends = to_frame(real_gdp, growth=real_growth, cagr_5y=real_cagr,
+                      volatility_5y=rolling_std(real_growth, 5), cagr_rank=rank(real_cagr))
+gdp_trends = gdp_trends.merge(countries[['iso_code', 'name', 'group_g7']], on='iso_code')
+
+TREND_YEAR = 2024  # last year before the WEO projections
+print(f"\nReal GDP trends, {TREND_YEAR} (5-year CAGR and volatility, %) - G7 Countries:")
+print(gdp_trends[(gdp_trends['year'] == TREND_YEAR) & gdp_trends['group_g7']]
+      .sort_values('cagr_5y', ascending=False)
+      [['name', 'growth', 'cagr_5y', 'volatility_5y', 'cagr_rank']].round(2))
+
+print(f"\nFastest 5-year real GDP growth, {TREND_YEAR}:")
+print(gdp_trends[gdp_trends['year'] == TREND_YEAR].nsmallest(10, 'cagr_rank')
+      [['name', 'cagr_5y', 'volatility_5y', 'cagr_rank']].round(2))
+
 # ============================================================================
 # 7. REGIONAL COMPARISON
 # ============================================================================
@@ -161,12 +194,12 @@ if not growth_data.empty:
 print("\n=== REGIONAL COMPARISON ===")
 
 # Average GDP per capita by region (latest year)
-gdp_per_capita = conn.execute("""
+gdp_per_capita = conn.execute(f"""
     SELECT c.region7, AVG(i.value) as avg_gdp_per_capita, COUNT(*) as country_count
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'NGDPDPC'  -- GDP per capita in USD
-      AND i.year = (SELECT MAX(year) FROM indicators WHERE subject_code = 'NGDPDPC')
+      AND i.year = (SELECT MAX(year) FROM {WEO_OBSERVATIONS} WHERE subject_code = 'NGDPDPC')
     GROUP BY c.region7
     ORDER BY avg_gdp_per_capita DESC
 """).df()
@@ -181,12 +214,10 @@ print(gdp_per_capita.round(0))
 print("\n=== DATA QUALITY ===")
 
 # Check for missing data patterns
+# (obs_stats_year is kept up to date by the weo.py loaders)
 missing_by_year = conn.execute("""
-    SELECT year, COUNT(*) as observations,
-           COUNT(DISTINCT iso_code) as countries,
-           COUNT(DISTINCT subject_code) as metrics
-    FROM indicators
-    GROUP BY year
+    SELECT year, n as observations, countries, subjects as metrics
+    FROM obs_stats_year
     ORDER BY year
 """).df()
 
@@ -195,11 +226,8 @@ print(missing_by_year.tail(10))
 
 # Check value distributions
 print("\nValue statistics:")
-value_stats = conn.execute("SELECT MIN(value) as min_val, MAX(value) as max_val, AVG(value) as avg_val, COUNT(*) as total_obs FROM indicators").fetchone()
-print(f"Min value: {value_stats[0]}")
-print(f"Max value: {value_stats[1]:,.2f}")
-print(f"Avg value: {value_stats[2]:.2f}")
-print(f"Total observations: {value_stats[3]:,}")
+value_stats = summarize(conn, WEO_OBSERVATIONS, 'value', distinct=['iso_code', 'subject_code'], exact=EXACT)
+print_summary(value_stats)
 
 # ============================================================================
 # 9. INTERESTING PATTERNS
@@ -208,9 +236,9 @@ print(f"Total observations: {value_stats[3]:,}")
 print("\n=== INTERESTING PATTERNS ===")
 
 # Countries with highest inflation in recent years
-high_inflation = conn.execute("""
+high_inflation = conn.execute(f"""
     SELECT c.name, i.year, i.value as inflation_rate
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'PCPIPCH'  -- Inflation rate
       AND i.year >= 2020
@@ -222,17 +250,26 @@ high_inflation = conn.execute("""
 print("Countries with highest inflation (>20%, 2020+):")
 print(high_inflation)
 
+# Correlations between macro indicators across countries (one query, same year for all)
+CORRELATED = ['NGDPDPC', 'NGDP_RPCH', 'PCPIPCH', 'LUR', 'GGXWDG_NGDP', 'GGXCNL_NGDP',
+              'BCA_NGDPD', 'NID_NGDP', 'NGSD_NGDP', 'TX_RPCH', 'TM_RPCH']
+indicator_correlations = correlation(load(conn, CORRELATED, year=TREND_YEAR), method='spearman')
+print(f"\nRank correlations between indicators across countries ({TREND_YEAR}):")
+print(indicator_correlations.round(2))
+
 # ============================================================================
 # 10. SETUP FOR FURTHER ANALYSIS
 # ============================================================================
 
 print("\n=== READY FOR FURTHER ANALYSIS ===")
 print("Variables available for continued exploration:")
-print("- conn: DuckDB connection")
+print("- conn: DuckDB connection (read-only cursor)")
 print("- countries: Countries DataFrame") 
-print("- metrics: Metrics DataFrame")
+print("- indicators: Indicator definitions DataFrame")
 print("- gdp_data: Major economies GDP data")
 print("- growth_data: G7 GDP growth rates")
+print("- gdp_trends: real GDP growth / 5-year CAGR / volatility / rank, every country and year")
+print("- indicator_correlations: Spearman correlations between macro indicators")
 print("- gdp_per_capita: Regional GDP per capita")
 print("- missing_by_year: Data availability by year")
 
@@ -3,10 +3,13 @@
 
 import pandas as pd
 import psycopg2
-import numpy as np
-import matplotlib.pyplot as plt
 import os
 from dotenv import load_dotenv
+from cmu_datasets.approx import print_summary, summarize
+from cmu_datasets.paths import WEO_OBSERVATIONS
+from cmu_datasets.profiling import traced
+from cmu_datasets.screening import correlation, load, screen, to_frame
+from cmu_datasets.timeseries import window_query
 
 # Load PostgreSQL credentials from .env file
 load_dotenv()
@@ -31,9 +34,13 @@ def get_connection():
     )
 
 # Connect to the database
-conn = get_connection()
+# (statement timings go to $CMU_TRACE_FILE when it is set)
+conn = traced(get_connection())
 cursor = conn.cursor()
 
+# Data-quality summaries are sampled, with error bounds, unless CMU_EDA_EXACT=1
+EXACT = os.getenv('CMU_EDA_EXACT') == '1'
+
 print("Connected to PostgreSQL database!")
 
 # ============================================================================
@@ -54,13 +61,13 @@ countries_count = cursor.fetchone()[0]
 cursor.execute("SELECT COUNT(*) FROM indicators")
 indicators_count = cursor.fetchone()[0]
 
-cursor.execute("SELECT COUNT(*) FROM metrics")
-metrics_count = cursor.fetchone()[0]
+cursor.execute(f"SELECT COUNT(*) FROM {WEO_OBSERVATIONS}")
+observations_count = cursor.fetchone()[0]
 
 print(f"\nTable sizes:")
 print(f"Countries: {countries_count}")
-print(f"Indicators: {indicators_count:,}")
-print(f"Metrics: {metrics_count}")
+print(f"Indicators: {indicators_count}")
+print(f"Observations: {observations_count:,}")
 
 # Check database size
 cursor.execute("""
@@ -116,20 +123,20 @@ print(f"EU countries: {eu_count}")
 print(f"ASEAN5 countries: {asean_count}")
 
 # ============================================================================
-# 4. EXPLORE METRICS TABLE
+# 4. EXPLORE INDICATORS TABLE (definitions)
 # ============================================================================
 
-print("\n=== METRICS TABLE ===")
+print("\n=== INDICATORS TABLE ===")
 
-# Load metrics as DataFrame
-metrics = pd.read_sql("SELECT * FROM metrics ORDER BY subject_code", conn)
-print(f"Metrics shape: {metrics.shape}")
+# Load indicator definitions as DataFrame
+indicators = pd.read_sql("SELECT * FROM indicators ORDER BY subject_code", conn)
+print(f"Indicators shape: {indicators.shape}")
 
 # Most common units
 print("\nMost common units:")
 units_counts = pd.read_sql("""
     SELECT units, COUNT(*) as count 
-    FROM metrics 
+    FROM indicators 
     WHERE units IS NOT NULL
     GROUP BY units 
     ORDER BY count DESC 
@@ -141,39 +148,39 @@ print(units_counts)
 print("\nMost common scales:")
 scale_counts = pd.read_sql("""
     SELECT scale, COUNT(*) as count 
-    FROM metrics 
+    FROM indicators 
     WHERE scale IS NOT NULL
     GROUP BY scale 
     ORDER BY count DESC
 """, conn)
 print(scale_counts)
 
-# Sample metrics
-print("\nSample metrics:")
-sample_metrics = pd.read_sql("""
+# Sample indicators
+print("\nSample indicators:")
+sample_indicators = pd.read_sql("""
     SELECT subject_code, description 
-    FROM metrics 
+    FROM indicators 
     WHERE description IS NOT NULL
     ORDER BY subject_code 
     LIMIT 10
 """, conn)
-print(sample_metrics)
+print(sample_indicators)
 
 # ============================================================================
-# 5. EXPLORE INDICATORS TABLE
+# 5. EXPLORE OBSERVATIONS TABLE
 # ============================================================================
 
-print("\n=== INDICATORS TABLE ===")
+print("\n=== OBSERVATIONS TABLE ===")
 
 # Year range and coverage
-year_stats = pd.read_sql("""
+year_stats = pd.read_sql(f"""
     SELECT 
         MIN(year) as min_year, 
         MAX(year) as max_year,
         COUNT(DISTINCT year) as num_years,
         COUNT(DISTINCT iso_code) as num_countries,
         COUNT(DISTINCT subject_code) as num_metrics
-    FROM indicators
+    FROM {WEO_OBSERVATIONS}
 """, conn)
 print("Data coverage:")
 print(f"Years: {year_stats.iloc[0]['min_year']} - {year_stats.iloc[0]['max_year']} ({year_stats.iloc[0]['num_years']} years)")
@@ -182,9 +189,9 @@ print(f"Metrics: {year_stats.iloc[0]['num_metrics']}")
 
 # Most common metrics
 print("\nTop 10 most common subject codes:")
-top_subjects = pd.read_sql("""
+top_subjects = pd.read_sql(f"""
     SELECT subject_code, COUNT(*) as count 
-    FROM indicators 
+    FROM {WEO_OBSERVATIONS} 
     GROUP BY subject_code 
     ORDER BY count DESC 
     LIMIT 10
@@ -194,10 +201,9 @@ print(top_subjects)
 # Countries with most data
 print("\nTop 10 countries with most data points:")
 top_countries = pd.read_sql("""
-    SELECT c.name, COUNT(*) as data_points
-    FROM indicators i
-    JOIN countries c ON i.iso_code = c.iso_code
-    GROUP BY c.name
+    SELECT c.name, s.n as data_points
+    FROM obs_stats_country s
+    JOIN countries c ON s.iso_code = c.iso_code
     ORDER BY data_points DESC
     LIMIT 10
 """, conn)
@@ -210,11 +216,11 @@ print(top_countries)
 print("\n=== GDP ANALYSIS ===")
 
 # Get GDP data for major economies in recent years
-gdp_data = pd.read_sql("""
-    SELECT c.name, i.year, i.value, m.units
-    FROM indicators i
+gdp_data = pd.read_sql(f"""
+    SELECT c.name, i.year, i.value, d.units
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code  
-    JOIN metrics m ON i.subject_code = m.subject_code
+    JOIN indicators d ON i.subject_code = d.subject_code
     WHERE i.subject_code = 'NGDPD'  -- GDP in USD billions
       AND i.year >= 2020
       AND c.iso_code IN ('USA', 'CHN', 'JPN', 'DEU', 'GBR', 'IND', 'FRA', 'ITA', 'BRA', 'CAN')
@@ -226,12 +232,12 @@ print(gdp_data)
 
 # GDP rankings for latest year
 print("\nTop 10 economies by GDP (latest year):")
-gdp_rankings = pd.read_sql("""
+gdp_rankings = pd.read_sql(f"""
     SELECT c.name, i.year, i.value as gdp_usd_billions
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'NGDPD'
-      AND i.year = (SELECT MAX(year) FROM indicators WHERE subject_code = 'NGDPD')
+      AND i.year = (SELECT MAX(year) FROM {WEO_OBSERVATIONS} WHERE subject_code = 'NGDPD')
     ORDER BY i.value DESC
     LIMIT 10
 """, conn)
@@ -244,9 +250,9 @@ print(gdp_rankings)
 print("\n=== TIME SERIES ANALYSIS ===")
 
 # GDP growth rates for G7 countries
-growth_data = pd.read_sql("""
+growth_data = pd.read_sql(f"""
     SELECT c.name, i.year, i.value as gdp_growth_rate
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'NGDP_RPCH'  -- GDP growth rate
       AND c.group_g7 = true
@@ -259,13 +265,13 @@ print("Sample GDP growth rates:")
 print(growth_data.head(10))
 
 # Average GDP growth by G7 country (2010+)
-avg_growth = pd.read_sql("""
+avg_growth = pd.read_sql(f"""
     SELECT c.name, 
            AVG(i.value) as avg_growth_rate,
            MIN(i.value) as min_growth_rate,
            MAX(i.value) as max_growth_rate,
            COUNT(*) as years_of_data
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'NGDP_RPCH'
       AND c.group_g7 = true
@@ -277,6 +283,21 @@ avg_growth = pd.read_sql("""
 print("\nG7 Average GDP Growth Rates (2010+):")
 print(avg_growth.round(2))
 
+# Derived from the real GDP level series with window functions in PostgreSQL:
+# growth, 5-year CAGR, 5-year volatility of growth and the growth ranking
+TREND_YEAR = 2024  # last year before the WEO projections
+trend_sql, trend_params = window_query('NGDP_R', window=5, placeholder='%s')
+gdp_trends = pd.read_sql(f"""
+    SELECT c.name, t.year, t.growth, t.cagr AS cagr_5y, t.volatility AS volatility_5y, t.growth_rank
+    FROM ({trend_sql}) t
+    JOIN countries c ON t.iso_code = c.iso_code
+    WHERE c.group_g7 = true AND t.year = %s
+    ORDER BY t.cagr DESC
+""", conn, params=[*trend_params, TREND_YEAR])
+
+print(f"\nReal GDP trends, {TREND_YEAR} (5-year CAGR and volatility, %) - G7 Countries:")
+print(gdp_trends.round(2))
+
 # ============================================================================
 # 8. REGIONAL COMPARISON
 # ============================================================================
@@ -284,16 +305,16 @@ print(avg_growth.round(2))
 print("\n=== REGIONAL COMPARISON ===")
 
 # Average GDP per capita by region (latest year)
-gdp_per_capita = pd.read_sql("""
+gdp_per_capita = pd.read_sql(f"""
     SELECT c.region7, 
            AVG(i.value) as avg_gdp_per_capita, 
            COUNT(*) as country_count,
            MIN(i.value) as min_gdp_per_capita,
            MAX(i.value) as max_gdp_per_capita
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'NGDPDPC'  -- GDP per capita in USD
-      AND i.year = (SELECT MAX(year) FROM indicators WHERE subject_code = 'NGDPDPC')
+      AND i.year = (SELECT MAX(year) FROM {WEO_OBSERVATIONS} WHERE subject_code = 'NGDPDPC')
       AND c.region7 IS NOT NULL
     GROUP BY c.region7
     ORDER BY avg_gdp_per_capita DESC
@@ -309,13 +330,10 @@ print(gdp_per_capita.round(0))
 print("\n=== DATA QUALITY ===")
 
 # Check for missing data patterns
+# (obs_stats_year is kept up to date by the weo.py loaders)
 missing_by_year = pd.read_sql("""
-    SELECT year, 
-           COUNT(*) as observations,
-           COUNT(DISTINCT iso_code) as countries,
-           COUNT(DISTINCT subject_code) as metrics
-    FROM indicators
-    GROUP BY year
+    SELECT year, n as observations, countries, subjects as metrics
+    FROM obs_stats_year
     ORDER BY year
 """, conn)
 
@@ -323,24 +341,10 @@ print("Data availability by year (recent years):")
 print(missing_by_year.tail(10))
 
 # Check value distributions
-value_stats = pd.read_sql("""
-    SELECT 
-        MIN(value) as min_val, 
-        MAX(value) as max_val, 
-        AVG(value) as avg_val,
-        STDDEV(value) as std_val,
-        COUNT(*) as total_obs,
-        COUNT(DISTINCT iso_code) as unique_countries,
-        COUNT(DISTINCT subject_code) as unique_metrics
-    FROM indicators
-""", conn)
+value_stats = summarize(conn, WEO_OBSERVATIONS, 'value', distinct=['iso_code', 'subject_code'], exact=EXACT)
 
 print("\nValue statistics:")
-print(f"Min value: {value_stats.iloc[0]['min_val']}")
-print(f"Max value: {value_stats.iloc[0]['max_val']:,.2f}")
-print(f"Avg value: {value_stats.iloc[0]['avg_val']:.2f}")
-print(f"Std deviation: {value_stats.iloc[0]['std_val']:.2f}")
-print(f"Total observations: {value_stats.iloc[0]['total_obs']:,}")
+print_summary(value_stats)
 
 # ============================================================================
 # 10. INTERESTING PATTERNS
@@ -349,9 +353,9 @@ print(f"Total observations: {value_stats.iloc[0]['total_obs']:,}")
 print("\n=== INTERESTING PATTERNS ===")
 
 # Countries with highest inflation in recent years
-high_inflation = pd.read_sql("""
+high_inflation = pd.read_sql(f"""
     SELECT c.name, i.year, i.value as inflation_rate, c.region7
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'PCPIPCH'  -- Inflation rate
       AND i.year >= 2020
@@ -364,16 +368,16 @@ print("Countries with highest inflation (>20%, 2020+):")
 print(high_inflation)
 
 # Unemployment rates by region (latest year)
-unemployment_by_region = pd.read_sql("""
+unemployment_by_region = pd.read_sql(f"""
     SELECT c.region7,
            AVG(i.value) as avg_unemployment_rate,
            MIN(i.value) as min_unemployment_rate,
            MAX(i.value) as max_unemployment_rate,
            COUNT(*) as countries_with_data
-    FROM indicators i
+    FROM {WEO_OBSERVATIONS} i
     JOIN countries c ON i.iso_code = c.iso_code
     WHERE i.subject_code = 'LUR'  -- Unemployment rate
-      AND i.year = (SELECT MAX(year) FROM indicators WHERE subject_code = 'LUR')
+      AND i.year = (SELECT MAX(year) FROM {WEO_OBSERVATIONS} WHERE subject_code = 'LUR')
       AND c.region7 IS NOT NULL
     GROUP BY c.region7
     ORDER BY avg_unemployment_rate DESC
@@ -389,26 +393,29 @@ print(unemployment_by_region.round(2))
 print("\n=== ECONOMIC CORRELATIONS ===")
 
 # Countries with both high GDP per capita and low unemployment (latest year)
-economic_performance = pd.read_sql("""
-    SELECT c.name, c.region7,
-           gdp.value as gdp_per_capita,
-           unemp.value as unemployment_rate
-    FROM countries c
-    LEFT JOIN indicators gdp ON c.iso_code = gdp.iso_code 
-        AND gdp.subject_code = 'NGDPDPC'
-        AND gdp.year = (SELECT MAX(year) FROM indicators WHERE subject_code = 'NGDPDPC')
-    LEFT JOIN indicators unemp ON c.iso_code = unemp.iso_code 
-        AND unemp.subject_code = 'LUR'
-        AND unemp.year = (SELECT MAX(year) FROM indicators WHERE subject_code = 'LUR')
-    WHERE gdp.value IS NOT NULL AND unemp.value IS NOT NULL
-      AND gdp.value > 30000  -- High GDP per capita threshold
-      AND unemp.value < 5    -- Low unemployment threshold
-    ORDER BY gdp.value DESC
-""", conn)
+# (one query for both indicators, aligned into a country-by-indicator matrix)
+performance = load(conn, ['NGDPDPC', 'LUR'], year='latest')
+economic_performance = (
+    to_frame(performance,
+             rows=screen(performance, {'NGDPDPC': ('>', 30000),  # High GDP per capita
+                                       'LUR': ('<', 5)}),        # Low unemployment
+             names={'NGDPDPC': 'gdp_per_capita', 'LUR': 'unemployment_rate'})
+    .merge(countries[['iso_code', 'name', 'region7']], on='iso_code')
+    [['name', 'region7', 'gdp_per_capita', 'unemployment_rate']]
+    .sort_values('gdp_per_capita', ascending=False, ignore_index=True)
+)
 
 print("High-performing economies (GDP per capita > $30k, unemployment < 5%):")
 print(economic_performance)
 
+# Correlations between macro indicators across countries (same year for all)
+CORRELATED = ['NGDPDPC', 'NGDP_RPCH', 'PCPIPCH', 'LUR', 'GGXWDG_NGDP', 'GGXCNL_NGDP',
+              'BCA_NGDPD', 'NID_NGDP', 'NGSD_NGDP', 'TX_RPCH', 'TM_RPCH']
+indicator_correlations = correlation(
+    load(conn, CORRELATED, year=TREND_YEAR), method='spearman')
+print(f"\nRank correlations between indicators across countries ({TREND_YEAR}):")
+print(indicator_correlations.round(2))
+
 # ============================================================================
 # 12. SETUP FOR FURTHER ANALYSIS
 # ============================================================================
@@ -418,21 +425,23 @@ print("Variables available for continued exploration:")
 print("- conn: PostgreSQL connection")
 print("- cursor: Database cursor")
 print("- countries: Countries DataFrame") 
-print("- metrics: Metrics DataFrame")
+print("- indicators: Indicator definitions DataFrame")
 print("- gdp_data: Major economies GDP data")
 print("- growth_data: G7 GDP growth rates")
+print("- gdp_trends: G7 real GDP growth / 5-year CAGR / volatility / rank")
 print("- gdp_per_capita: Regional GDP per capita")
+print("- indicator_correlations: Spearman correlations between macro indicators")
 print("- missing_by_year: Data availability by year")
 
 print("\nUseful SQL patterns for further exploration:")
 print("# Get specific country data:")
-print("# pd.read_sql(\"SELECT * FROM indicators WHERE iso_code = 'USA'\", conn)")
+print(f"# pd.read_sql(\"SELECT * FROM {WEO_OBSERVATIONS} WHERE iso_code = 'USA'\", conn)")
 print("\n# Join all tables:")
 print("# pd.read_sql(\"\"\"")
-print("#     SELECT c.name, m.description, i.year, i.value")
-print("#     FROM indicators i")
+print("#     SELECT c.name, d.description, i.year, i.value")
+print(f"#     FROM {WEO_OBSERVATIONS} i")
 print("#     JOIN countries c ON i.iso_code = c.iso_code")
-print("#     JOIN metrics m ON i.subject_code = m.subject_code")
+print("#     JOIN indicators d ON i.subject_code = d.subject_code")
 print("#     WHERE i.year = 2023")
 print("# \"\"\", conn)")
 
@@ -11,82 +11,115 @@ Creates a DuckDB database from World Economic Outlook CSV files:
 import duckdb
 import pandas as pd
 from pathlib import Path
+from cmu_datasets.normalize import WEO_COLUMNS, normalize
+from cmu_datasets.profiling import step, traced
+from cmu_datasets.summaries import create_summary_tables, update_summaries
+from cmu_datasets.validate import WEO_RULES, validate
+
+# Observations are inserted (and summarized) in chunks of this many rows
+CHUNK_ROWS = 100_000
 
 def create_weo_database():
     """Create WEO database from CSV files."""
     
+    # Read, normalize and validate all three tables before touching the database:
+    # sentinel spellings ('', '--', 'n/a', ...) become NULL, flags become booleans
+    countries_df = normalize(pd.read_csv('countries.csv'), **WEO_COLUMNS['countries'])
+    indicators_df = normalize(pd.read_csv('indicators.csv'), **WEO_COLUMNS['indicators'])  # definitions
+    with step("read metrics csv"):
+        metrics_df = pd.read_csv('metrics.csv')  # This has the actual data
+        
+        # Clean the data - '--' and other non-numeric values become NaN
+        metrics_df = normalize(metrics_df, **WEO_COLUMNS['metrics'])
+        
+        # Remove rows with missing values
+        metrics_df = metrics_df.dropna(subset=['value'])
+    
+    with step("validate", rows=len(metrics_df)):
+        report = validate({'countries': countries_df, 'indicators': indicators_df,
+                           'metrics': metrics_df}, WEO_RULES)
+    print("Validating CSV files...")
+    print(report)
+    report.raise_for_errors()
+    countries_df = countries_df[report.keep('countries')]
+    indicators_df = indicators_df[report.keep('indicators')]
+    
     # Connect to DuckDB (creates file if doesn't exist)
-    conn = duckdb.connect('weo.duckdb')
+    conn = traced(duckdb.connect('weo.duckdb'))
     
     print("Creating WEO database...")
     
     # Load countries table
     print("Loading countries table...")
-    countries_df = pd.read_csv('countries.csv')
-    conn.execute("DROP TABLE IF EXISTS countries")
-    conn.execute("""
-        CREATE TABLE countries (
-            country_id INTEGER PRIMARY KEY,
-            iso_code VARCHAR(3),
-            name VARCHAR(100),
-            region7 VARCHAR(50),
-            econ_group VARCHAR(50),
-            group_g7 BOOLEAN,
-            group_european_union BOOLEAN,
-            group_asean5 BOOLEAN
-        )
-    """)
-    conn.execute("INSERT INTO countries SELECT * FROM countries_df")
+    with step("load countries"):
+        conn.execute("DROP TABLE IF EXISTS countries")
+        conn.execute("""
+            CREATE TABLE countries (
+                country_id INTEGER PRIMARY KEY,
+                iso_code VARCHAR(3),
+                name VARCHAR(100),
+                region7 VARCHAR(50),
+                econ_group VARCHAR(50),
+                group_g7 BOOLEAN,
+                group_european_union BOOLEAN,
+                group_asean5 BOOLEAN
+            )
+        """)
+        conn.execute("INSERT INTO countries SELECT * FROM countries_df")
     print(f"  Inserted {len(countries_df)} countries")
     
     # Load indicators table (definitions)
     print("Loading indicators table...")
-    indicators_df = pd.read_csv('indicators.csv')  # This has the definitions
-    
-    conn.execute("DROP TABLE IF EXISTS indicators")
-    conn.execute("""
-        CREATE TABLE indicators (
-            indicator_id INTEGER PRIMARY KEY,
-            subject_code VARCHAR(20),
-            description TEXT,
-            notes TEXT,
-            units VARCHAR(100),
-            scale VARCHAR(50)
-        )
-    """)
-    conn.execute("INSERT INTO indicators SELECT * FROM indicators_df")
+    with step("load indicators"):
+        conn.execute("DROP TABLE IF EXISTS indicators")
+        conn.execute("""
+            CREATE TABLE indicators (
+                indicator_id INTEGER PRIMARY KEY,
+                subject_code VARCHAR(20),
+                description TEXT,
+                notes TEXT,
+                units VARCHAR(100),
+                scale VARCHAR(50)
+            )
+        """)
+        conn.execute("INSERT INTO indicators SELECT * FROM indicators_df")
     print(f"  Inserted {len(indicators_df)} indicator definitions")
     
     # Load metrics table (actual data)
     print("Loading metrics table...")
-    metrics_df = pd.read_csv('metrics.csv')  # This has the actual data
-    
-    # Clean the data - replace '--' and other non-numeric values with NaN
-    metrics_df['value'] = pd.to_numeric(metrics_df['value'], errors='coerce')
-    
-    # Remove rows with missing values
-    metrics_df = metrics_df.dropna(subset=['value'])
-    
-    conn.execute("DROP TABLE IF EXISTS metrics")
-    conn.execute("""
-        CREATE TABLE metrics (
-            metric_id INTEGER PRIMARY KEY,
-            iso_code VARCHAR(3),
-            subject_code VARCHAR(20),
-            year INTEGER,
-            value DOUBLE
-        )
-    """)
-    conn.execute("INSERT INTO metrics SELECT * FROM metrics_df")
+    with step("load metrics", rows=len(metrics_df)):
+        conn.execute("DROP TABLE IF EXISTS metrics")
+        conn.execute("""
+            CREATE TABLE metrics (
+                metric_id INTEGER PRIMARY KEY,
+                iso_code VARCHAR(3),
+                subject_code VARCHAR(20),
+                year INTEGER,
+                value DOUBLE
+            )
+        """)
+        # observations and their summary tables commit together
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            create_summary_tables(conn)
+            for start in range(0, len(metrics_df), CHUNK_ROWS):
+                chunk = metrics_df.iloc[start:start + CHUNK_ROWS]
+                conn.execute("INSERT INTO metrics SELECT * FROM chunk")
+                update_summaries(conn, chunk)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
     print(f"  Inserted {len(metrics_df)} observations")
     
     # Create indexes for better query performance
     print("Creating indexes...")
-    conn.execute("CREATE INDEX idx_countries_iso ON countries(iso_code)")
-    conn.execute("CREATE INDEX idx_indicators_subject ON indicators(subject_code)")
-    conn.execute("CREATE INDEX idx_metrics_iso ON metrics(iso_code)")
-    conn.execute("CREATE INDEX idx_metrics_subject ON metrics(subject_code)")
-    conn.execute("CREATE INDEX idx_metrics_year ON metrics(year)")
+    with step("create indexes"):
+        conn.execute("CREATE INDEX idx_countries_iso ON countries(iso_code)")
+        conn.execute("CREATE INDEX idx_indicators_subject ON indicators(subject_code)")
+        conn.execute("CREATE INDEX idx_metrics_iso ON metrics(iso_code)")
+        conn.execute("CREATE INDEX idx_metrics_subject ON metrics(subject_code)")
+        conn.execute("CREATE INDEX idx_metrics_year ON metrics(year)")
     
     # Display database info
     print("\nDatabase created successfully!")
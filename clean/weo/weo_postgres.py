@@ -23,6 +23,13 @@ import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 from pathlib import Path
+from cmu_datasets.normalize import WEO_COLUMNS, normalize, sql_rows
+from cmu_datasets.profiling import step, traced
+from cmu_datasets.summaries import create_summary_tables, update_summaries
+from cmu_datasets.validate import WEO_RULES, validate
+
+# Observations are inserted (and summarized) in chunks of this many rows
+CHUNK_ROWS = 100_000
 
 def load_postgres_credentials():
     """Load PostgreSQL credentials from .env file."""
@@ -51,6 +58,30 @@ def load_postgres_credentials():
 def create_weo_postgres_database():
     """Create WEO database tables in PostgreSQL from CSV files."""
     
+    # Read, normalize and validate all three tables before touching the database:
+    # sentinel spellings ('', '--', 'n/a', ...) become NULL, flags become booleans
+    countries_df = normalize(pd.read_csv('countries.csv'), **WEO_COLUMNS['countries'])
+    indicators_df = normalize(pd.read_csv('indicators.csv'), **WEO_COLUMNS['indicators'])  # definitions
+    with step("read metrics csv"):
+        metrics_df = pd.read_csv('metrics.csv')  # This has the actual data
+        
+        # Clean the data - '--' and other non-numeric values become NaN
+        metrics_df = normalize(metrics_df, **WEO_COLUMNS['metrics'])
+        
+        # Remove rows with missing values
+        metrics_df = metrics_df.dropna(subset=['value'])
+    
+    # Rows missing iso_code / name / subject_code are dropped; duplicate keys,
+    # years outside 1980-2030 and unknown countries / indicators stop the load
+    with step("validate", rows=len(metrics_df)):
+        report = validate({'countries': countries_df, 'indicators': indicators_df,
+                           'metrics': metrics_df}, WEO_RULES)
+    print("Validating CSV files...")
+    print(report)
+    report.raise_for_errors()
+    countries_df = countries_df[report.keep('countries')]
+    indicators_df = indicators_df[report.keep('indicators')]
+    
     print("Loading PostgreSQL credentials...")
     pg_config = load_postgres_credentials()
     
@@ -62,6 +93,9 @@ def create_weo_postgres_database():
         # Individual parameters
         conn = psycopg2.connect(**pg_config)
     
+    # Trace statement timings when CMU_TRACE_FILE is set
+    conn = traced(conn)
+    
     cursor = conn.cursor()
     
     print("Creating WEO database tables in PostgreSQL...")
@@ -86,41 +120,16 @@ def create_weo_postgres_database():
             )
         """)
         
-        # Load and clean countries data
-        countries_df = pd.read_csv('countries.csv')
-        
-        # First, remove rows with missing essential data (iso_code or name)
-        countries_df = countries_df.dropna(subset=['iso_code', 'name'])
-        
-        # Remove any rows where iso_code is empty string
-        countries_df = countries_df[countries_df['iso_code'].str.strip() != '']
-        
-        # Clean the data - handle missing values
-        # For text columns, replace NaN with empty string first, then convert to None for SQL
-        text_cols = ['region7', 'econ_group']
-        for col in text_cols:
-            if col in countries_df.columns:
-                countries_df[col] = countries_df[col].fillna('')
-        
-        # For boolean columns, fill NaN with False and convert to proper booleans
-        bool_cols = ['group_g7', 'group_european_union', 'group_asean5']
-        for col in bool_cols:
-            if col in countries_df.columns:
-                countries_df[col] = countries_df[col].fillna(False)
-                # Convert to boolean, handling any remaining NaN or string values
-                countries_df[col] = countries_df[col].astype(str).str.lower().isin(['true', '1', 'yes'])
-        
-        # Convert empty strings to None for SQL NULL
-        countries_df = countries_df.replace('', None)
-        
-        countries_data = [tuple(row) for row in countries_df.values]
+        # Row tuples with None for SQL NULL (already normalized above)
+        countries_data = sql_rows(countries_df)
         
-        execute_values(
-            cursor,
-            """INSERT INTO countries (country_id, iso_code, name, region7, econ_group, 
-               group_g7, group_european_union, group_asean5) VALUES %s""",
-            countries_data
-        )
+        with step("insert countries", rows=len(countries_data)):
+            execute_values(
+                cursor,
+                """INSERT INTO countries (country_id, iso_code, name, region7, econ_group, 
+                   group_g7, group_european_union, group_asean5) VALUES %s""",
+                countries_data
+            )
         print(f"  Inserted {len(countries_df)} countries")
         
         # =====================================================================
@@ -140,32 +149,14 @@ def create_weo_postgres_database():
             )
         """)
         
-        # Load and clean metrics data
-        indicators_df = pd.read_csv('indicators.csv')  # This has the definitions
-        
-        # Remove rows with missing essential data (subject_code)
-        indicators_df = indicators_df.dropna(subset=['subject_code'])
-        
-        # Remove any rows where subject_code is empty string
-        if 'subject_code' in indicators_df.columns:
-            indicators_df = indicators_df[indicators_df['subject_code'].astype(str).str.strip() != '']
-        
-        # Clean the data - handle missing values
-        text_cols = ['description', 'notes', 'units', 'scale']
-        for col in text_cols:
-            if col in indicators_df.columns:
-                indicators_df[col] = indicators_df[col].fillna('')
+        indicators_data = sql_rows(indicators_df)
         
-        # Convert empty strings to None for SQL NULL
-        indicators_df = indicators_df.replace('', None)
-        
-        indicators_data = [tuple(row) for row in indicators_df.values]
-        
-        execute_values(
-            cursor,
-            """INSERT INTO indicators (indicator_id, subject_code, description, notes, units, scale) VALUES %s""",
-            indicators_data
-        )
+        with step("insert indicators", rows=len(indicators_data)):
+            execute_values(
+                cursor,
+                """INSERT INTO indicators (indicator_id, subject_code, description, notes, units, scale) VALUES %s""",
+                indicators_data
+            )
         print(f"  Inserted {len(indicators_df)} metric definitions")
         
         # =====================================================================
@@ -185,23 +176,17 @@ def create_weo_postgres_database():
             )
         """)
         
-        # Load and clean indicators data
-        metrics_df = pd.read_csv('metrics.csv')  # This has the actual data
-        
-        # Clean the data - replace '--' and other non-numeric values with NaN
-        metrics_df['value'] = pd.to_numeric(metrics_df['value'], errors='coerce')
-        
-        # Remove rows with missing values
-        metrics_df = metrics_df.dropna(subset=['value'])
-        
-        # Prepare data for insertion
-        metrics_data = [tuple(row) for row in metrics_df.values]
-        
-        execute_values(
-            cursor,
-            """INSERT INTO metrics (metric_id, iso_code, subject_code, year, value) VALUES %s""",
-            metrics_data
-        )
+        # Summary tables are updated with each chunk, in the same transaction
+        create_summary_tables(cursor)
+        with step("insert metrics", rows=len(metrics_df)):
+            for start in range(0, len(metrics_df), CHUNK_ROWS):
+                chunk = metrics_df.iloc[start:start + CHUNK_ROWS]
+                execute_values(
+                    cursor,
+                    """INSERT INTO metrics (metric_id, iso_code, subject_code, year, value) VALUES %s""",
+                    sql_rows(chunk)
+                )
+                update_summaries(cursor, chunk)
         print(f"  Inserted {len(metrics_df)} observations")
         
         # =====================================================================
@@ -209,12 +194,13 @@ def create_weo_postgres_database():
         # =====================================================================
         print("Creating indexes...")
         
-        cursor.execute("CREATE INDEX idx_countries_iso ON countries(iso_code)")
-        cursor.execute("CREATE INDEX idx_indicators_subject ON indicators(subject_code)")
-        cursor.execute("CREATE INDEX idx_metrics_iso ON metrics(iso_code)")
-        cursor.execute("CREATE INDEX idx_metrics_subject ON metrics(subject_code)")
-        cursor.execute("CREATE INDEX idx_metrics_year ON metrics(year)")
-        cursor.execute("CREATE INDEX idx_metrics_value ON metrics(value)")
+        with step("create indexes"):
+            cursor.execute("CREATE INDEX idx_countries_iso ON countries(iso_code)")
+            cursor.execute("CREATE INDEX idx_indicators_subject ON indicators(subject_code)")
+            cursor.execute("CREATE INDEX idx_metrics_iso ON metrics(iso_code)")
+            cursor.execute("CREATE INDEX idx_metrics_subject ON metrics(subject_code)")
+            cursor.execute("CREATE INDEX idx_metrics_year ON metrics(year)")
+            cursor.execute("CREATE INDEX idx_metrics_value ON metrics(value)")
         
         # =====================================================================
         # 5. ADD FOREIGN KEY CONSTRAINTS (if not already added)
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the dataset scripts in this repository.
+
+Run scripts that use these helpers from the project root with the root on
+the import path, e.g. ``PYTHONPATH=. python clean/weo/eda.py``.
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from cmu_datasets.commands import main
+
+sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Approximate Summaries
+
+Fast data-quality summaries of one numeric column for interactive EDA on
+large (e.g. multi-vintage) observation tables:
+- min / max / mean / std / quantiles are computed on a random sample
+  (TABLESAMPLE bernoulli or system, or a DuckDB reservoir of fixed size)
+- row counts are scaled up from the sample
+- distinct counts never run COUNT(DISTINCT ...) over the table: columns
+  whose sampled values all repeat (codes, years) are fully seen in the
+  sample; others use DuckDB's HyperLogLog approx_count_distinct() (Postgres:
+  the planner's pg_stats estimate)
+- quantiles use DuckDB's T-Digest approx_quantile() sketch on the sample
+
+Every statistic comes with a low / high bound at the requested confidence:
+- mean: normal interval with finite-population correction
+- std: normal-theory interval (assumes roughly normal values)
+- quantiles: Dvoretzky-Kiefer-Wolfowitz rank band
+- counts: binomial interval
+- distinct counts: HLL standard error, raised to the distinct values seen in the sample
+  (pg_stats estimates have no upper bound)
+- min / max: one-sided (the true minimum is at most the sample minimum)
+Bounds assume row-level sampling; `method='system'` samples whole blocks,
+so its bounds are optimistic when rows are clustered.
+
+Exact mode runs the same summary as plain SQL over the whole table.
+
+Usage:
+    summary = summarize(conn, WEO_OBSERVATIONS, 'value', distinct=['iso_code', 'subject_code'])
+    print_summary(summary)
+"""
+
+import math
+import time
+from statistics import NormalDist
+
+import pandas as pd
+
+# DuckDB's approx_count_distinct keeps 64 HyperLogLog registers
+HLL_REGISTERS = 64
+HLL_RSE = 1.04 / math.sqrt(HLL_REGISTERS)
+
+SAMPLE_ROWS = 200_000
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+# Quantile bounds are read at multiples of 1 / QUANTILE_GRID (rounded outwards)
+QUANTILE_GRID = 200
+
+
+def _is_postgres(conn):
+    return type(conn).__module__.startswith('psycopg2')
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _fetchone(conn, sql, params=None):
+    if _is_postgres(conn):
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchone()
+    return conn.execute(sql, params).fetchone() if params else conn.execute(sql).fetchone()
+
+
+def estimated_rows(conn, table):
+    """Row count from the catalog without scanning (None if unknown)."""
+    if _is_postgres(conn):
+        row = _fetchone(conn, "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        return row[0] if row and row[0] >= 0 else None
+    row = _fetchone(conn, "SELECT estimated_size FROM duckdb_tables() WHERE table_name = ?", [table])
+    return row[0] if row else None
+
+
+def _sample_clause(conn, method, percent, rows, seed):
+    if _is_postgres(conn):
+        if method == 'reservoir':
+            raise ValueError("Postgres has no reservoir sampling; use 'bernoulli' or 'system'")
+        return f"TABLESAMPLE {method.upper()} ({percent:g}) REPEATABLE ({int(seed)})"
+    if method == 'reservoir':
+        return f"TABLESAMPLE reservoir({int(rows)} ROWS) REPEATABLE ({int(seed)})"
+    return f"TABLESAMPLE {percent:g} PERCENT ({method}, {int(seed)})"
+
+
+def _quantile_sql(conn, column, quantiles, approx):
+    values = ', '.join(f"{q:.6f}" for q in quantiles)
+    if _is_postgres(conn):
+        return f"percentile_cont(ARRAY[{values}]) WITHIN GROUP (ORDER BY {column})"
+    return f"{'approx_quantile' if approx else 'quantile_cont'}({column}, [{values}])"
+
+
+def _row(statistic, estimate, low, high, method):
+    return {'statistic': statistic, 'estimate': estimate, 'low': low, 'high': high, 'method': method}
+
+
+def summarize(conn, table, column, distinct=(), exact=False, method='bernoulli',
+              sample_rows=SAMPLE_ROWS, quantiles=QUANTILES, confidence=0.95, seed=42):
+    """
+    Summarize a numeric column: rows, non-null values, min, max, mean, std,
+    quantiles and distinct counts of other columns.
+
+    Args:
+        conn: DuckDB or psycopg2 connection (traced connections work too).
+        table: Table name.
+        column: Numeric column to describe.
+        distinct: Columns whose distinct values are counted.
+        exact: Scan the whole table with exact aggregates instead.
+        method: Sampling method: 'bernoulli', 'system' or (DuckDB) 'reservoir'.
+        sample_rows: Target sample size.
+        quantiles: Quantiles to estimate.
+        confidence: Confidence level of the reported bounds.
+        seed: Sampling seed (repeatable results).
+
+    Returns:
+        pandas.DataFrame: statistic, estimate, low, high, method; the run time is
+        in `.attrs['elapsed_ms']` and the sampled fraction in `.attrs['fraction']`.
+    """
+    start = time.perf_counter()
+    postgres = _is_postgres(conn)
+    value = _quote(column)
+    source = _quote(table)
+    quantiles = list(quantiles)
+
+    if exact:
+        select = [f"COUNT(*)", f"COUNT({value})", f"MIN({value})", f"MAX({value})",
+                  f"AVG({value})", f"STDDEV_SAMP({value})", _quantile_sql(conn, value, quantiles, False)]
+        select += [f"COUNT(DISTINCT {_quote(c)})" for c in distinct]
+        n, non_null, lo, hi, mean, std, qs, *counts = _fetchone(conn, f"SELECT {', '.join(select)} FROM {source}")
+        rows = [_row('rows', n, n, n, 'exact'), _row('non_null', non_null, non_null, non_null, 'exact'),
+                _row('min', lo, lo, lo, 'exact'), _row('max', hi, hi, hi, 'exact'),
+                _row('mean', mean, mean, mean, 'exact'), _row('std', std, std, std, 'exact')]
+        rows += [_row(f"p{q * 100:g}", v, v, v, 'exact') for q, v in zip(quantiles, qs or [None] * len(quantiles))]
+        rows += [_row(f"distinct {c}", v, v, v, 'exact') for c, v in zip(distinct, counts)]
+        return _frame(rows, start, 1.0)
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    total = estimated_rows(conn, table)
+    counted = False
+    if method == 'reservoir' and not total:
+        # views have no catalog count; a reservoir reads every row anyway
+        total = _fetchone(conn, f"SELECT COUNT(*) FROM {source}")[0]
+        counted = True
+    if method == 'reservoir' or not total:
+        percent = 100.0
+    else:
+        percent = min(100.0, 100.0 * sample_rows / total)
+    sample = _sample_clause(conn, method, percent, sample_rows, seed)
+
+    # One pass over the sample: the sample is materialized once and both the
+    # value statistics and each column's frequency profile are read from it.
+    # Quantiles are read on a grid so the DKW band (known only once the
+    # sample size is) can be looked up afterwards.
+    grid = sorted({i / QUANTILE_GRID for i in range(QUANTILE_GRID + 1)} | set(quantiles))
+    columns = ', '.join([value] + [_quote(c) for c in distinct])
+    parts = [f"""(SELECT COUNT(*), COUNT({value}), MIN({value}), MAX({value}), AVG({value}),
+                         STDDEV_SAMP({value}), {_quantile_sql(conn, value, grid, True)} FROM s) AS v"""]
+    for i, c in enumerate(distinct):
+        parts.append(f"""(SELECT COUNT(*), COUNT(*) FILTER (WHERE k = 1) FROM
+                          (SELECT {_quote(c)}, COUNT(*) AS k FROM s WHERE {_quote(c)} IS NOT NULL
+                           GROUP BY {_quote(c)}) AS f{i}) AS d{i}""")
+    query = f"WITH s AS MATERIALIZED (SELECT {columns} FROM {source} {sample}) SELECT * FROM {', '.join(parts)}"
+    n, non_null, lo, hi, mean, std, qs, *profiles = _fetchone(conn, query)
+    if not n:
+        raise ValueError(f"Sample of {table} is empty; raise sample_rows or use exact=True")
+    # Postgres returns NUMERIC aggregates as Decimal
+    mean, std = (None if v is None else float(v) for v in (mean, std))
+
+    fraction = min(percent / 100 if method != 'reservoir' else n / total, 1.0)
+    at = dict(zip(grid, qs or [None] * len(grid)))
+    # DKW: with this probability every sample quantile is within eps (in rank) of the true one
+    eps = math.sqrt(math.log(2 / (1 - confidence)) / (2 * non_null)) if non_null else 1.0
+    # a reservoir holds the whole table only when it came back short of sample_rows
+    complete = n < sample_rows if method == 'reservoir' else fraction >= 1
+    if complete:
+        eps = 0.0
+
+    rows = []
+    if total and (method == 'reservoir' or not postgres):
+        # DuckDB's catalog count is exact (and a reservoir has a fixed size):
+        # take the rows from the catalog and scale the non-null share of the sample
+        share = non_null / n
+        margin = z * math.sqrt(share * (1 - share) / n * max(0.0, 1 - n / total)) * total
+        rows.append(_row('rows', total, total, total, 'count' if counted else 'catalog'))
+        rows.append(_row('non_null', share * total, max(share * total - margin, non_null),
+                         min(share * total + margin, total), 'sample'))
+    else:
+        for name, count in (('rows', n), ('non_null', non_null)):
+            estimate = count / fraction
+            margin = z * math.sqrt(count * (1 - fraction)) / fraction
+            rows.append(_row(name, estimate, max(estimate - margin, count), estimate + margin, 'sample'))
+    rows.append(_row('min', lo, lo if complete else None, lo, 'sample (upper bound)'))
+    rows.append(_row('max', hi, hi, hi if complete else None, 'sample (lower bound)'))
+    if mean is not None and std is not None and non_null > 1:
+        population = non_null / fraction
+        margin = z * std / math.sqrt(non_null) * math.sqrt(max(0.0, 1 - non_null / population))
+        rows.append(_row('mean', mean, mean - margin, mean + margin, 'sample'))
+        spread = 0.0 if complete else z / math.sqrt(2 * (non_null - 1))
+        rows.append(_row('std', std, std * max(0.0, 1 - spread), std * (1 + spread), 'sample'))
+    else:
+        rows.append(_row('mean', mean, None, None, 'sample'))
+        rows.append(_row('std', std, None, None, 'sample'))
+    for q in quantiles:
+        low_q = max([g for g in grid if g <= q - eps] or [q if eps == 0 else 0.0])
+        high_q = min([g for g in grid if g >= q + eps] or [q if eps == 0 else 1.0])
+        rows.append(_row(f"p{q * 100:g}", at[q], at[low_q], at[high_q],
+                         'sample' if postgres else 'sample + t-digest'))
+    profiles = [profiles[i:i + 2] for i in range(0, len(profiles), 2)]
+    rows += _distinct_estimates(conn, table, distinct, profiles, total, z, complete)
+    return _frame(rows, start, fraction)
+
+
+def _distinct_estimates(conn, table, columns, profiles, total, z, complete):
+    """
+    Distinct counts without COUNT(DISTINCT) over the full table.
+
+    A column none of whose sampled values occurs only once is taken as fully
+    seen (Chao1 = distinct values in the sample); typical for codes like
+    iso_code or year. Other columns use a full-table HyperLogLog (DuckDB) or
+    the planner's pg_stats estimate (Postgres), never below the sample count.
+    """
+    rows = []
+    sketch = []
+    for c, (seen, singletons) in zip(columns, profiles):
+        if complete or not singletons:
+            rows.append(_row(f"distinct {c}", seen, seen, seen, 'exact' if complete else 'sample (chao1)'))
+        else:
+            rows.append(None)
+            sketch.append((len(rows) - 1, c, seen))
+    if not sketch:
+        return rows
+
+    if _is_postgres(conn):
+        with conn.cursor() as cur:
+            cur.execute("SELECT attname, n_distinct FROM pg_stats WHERE tablename = %s", [table])
+            stats = dict(cur.fetchall())
+        for i, c, seen in sketch:
+            n_distinct = stats.get(c)
+            if n_distinct is None:
+                rows[i] = _row(f"distinct {c}", seen, seen, None, 'seen in sample (run ANALYZE)')
+                continue
+            # negative n_distinct is a fraction of the row count
+            estimate = -n_distinct * total if n_distinct < 0 and total else n_distinct
+            rows[i] = _row(f"distinct {c}", max(estimate, seen), seen, None, 'pg_stats')
+        return rows
+
+    select = ', '.join(f"approx_count_distinct({_quote(c)})" for _, c, _ in sketch)
+    estimates = _fetchone(conn, f"SELECT {select} FROM {_quote(table)}")
+    for (i, c, seen), estimate in zip(sketch, estimates):
+        margin = z * HLL_RSE * estimate
+        rows[i] = _row(f"distinct {c}", max(estimate, seen), max(estimate - margin, seen),
+                       estimate + margin, 'hyperloglog')
+    return rows
+
+
+def _frame(rows, start, fraction):
+    df = pd.DataFrame(rows, columns=['statistic', 'estimate', 'low', 'high', 'method'])
+    df.attrs['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    df.attrs['fraction'] = fraction
+    return df
+
+
+def print_summary(summary):
+    """Print a summarize() result with its bounds."""
+    def fmt(v):
+        if v is None or (isinstance(v, float) and math.isnan(v)):
+            return '-'
+        return f"{v:,.0f}" if abs(v) >= 1000 or float(v).is_integer() else f"{v:,.3f}"
+
+    exact = (summary['method'] == 'exact').all()
+    label = 'exact' if exact else f"approximate, {summary.attrs.get('fraction', 1) * 100:.3g}% sample"
+    print(f"({label}, {summary.attrs.get('elapsed_ms', 0):,.0f} ms)")
+    for r in summary.itertuples():
+        if exact:
+            print(f"  {r.statistic:<24} {fmt(r.estimate):>16}")
+        else:
+            print(f"  {r.statistic:<24} {fmt(r.estimate):>16}  [{fmt(r.low)}, {fmt(r.high)}]  {r.method}")
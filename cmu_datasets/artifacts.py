@@ -0,0 +1,213 @@
+"""
+Content-Addressed Artifact Store
+
+Keeps every derived file the build produces, keyed two ways:
+- objects/<ab>/<sha256>           file contents, stored once per distinct content
+- builds/<target>/<key>.json      for one input key (hash of a target's inputs
+                                  and transform code): output path -> object
+- manifest.json                   readable path -> object it currently holds
+
+A build whose input key was seen before (a rerun after reverting an input,
+another branch, a second job) restores its outputs from the store instead
+of recomputing them, and an output whose content is unchanged is not
+rewritten at all. Readable paths stay regular files (manifest entries, not
+symlinks): several scripts write their outputs in place, which would write
+through a link into the shared object.
+
+Concurrent jobs building the same target and key take a per-key lock, so
+one computes and the others restore its result.
+
+Usage:
+    store = ArtifactStore()
+    with store.lock(target, key):
+        outputs = store.lookup(target, key)
+        if outputs:
+            store.restore(outputs)
+        else:
+            run_the_job()
+            store.record(target, key, output_paths)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from cmu_datasets.paths import REPO_ROOT
+
+STORE_DIR = REPO_ROOT / '.cache' / 'artifacts'
+
+
+def file_digest(path):
+    """SHA-256 of a file's content."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _tmp_name(name):
+    # unique per process and thread: jobs may write the same object at once
+    return f"{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(_tmp_name(path.name))
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _read_json(path, default):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+class ArtifactStore:
+    """Objects by content hash, build manifests by input key, and a path manifest."""
+
+    def __init__(self, root=STORE_DIR, digest=None):
+        """
+        Args:
+            root: Store directory.
+            digest: relpath -> SHA-256 function for files under REPO_ROOT
+                (e.g. a cached one); defaults to hashing the file.
+        """
+        self.root = root
+        self._digest = digest or (lambda relpath: file_digest(REPO_ROOT / relpath))
+
+    def object_path(self, digest):
+        return self.root / 'objects' / digest[:2] / digest
+
+    def _build_path(self, target, key):
+        return self.root / 'builds' / target / f"{key}.json"
+
+    @contextmanager
+    def lock(self, target, key=None):
+        """Exclusive lock on (target, key) across threads and processes (POSIX; no-op elsewhere)."""
+        name = f"{target}-{key}" if key else target
+        path = self.root / 'locks' / f"{name}.lock"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(path, 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def put(self, relpath):
+        """Add a file under REPO_ROOT to the store (once per content); returns its digest."""
+        digest = self._digest(relpath)
+        target = self.object_path(digest)
+        if target.exists():
+            os.utime(target)  # recently put: gc leaves it to the build recording it
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(_tmp_name(digest))
+            shutil.copyfile(REPO_ROOT / relpath, tmp)
+            os.replace(tmp, target)
+        return digest
+
+    def record(self, target, key, outputs):
+        """Store a successful build's outputs under its input key; returns {path: digest}."""
+        entries = {relpath: self.put(relpath) for relpath in outputs}
+        _write_json(self._build_path(target, key), {'target': target, 'key': key,
+                                                   'created': time.time(), 'outputs': entries})
+        self._update_manifest(target, key, entries)
+        return entries
+
+    def lookup(self, target, key):
+        """{path: digest} of an earlier build with this key, or None if any object is gone."""
+        build = _read_json(self._build_path(target, key), None)
+        if not build:
+            return None
+        outputs = build['outputs']
+        if not all(self.object_path(d).exists() for d in outputs.values()):
+            return None
+        return outputs
+
+    def restore(self, outputs, target=None, key=None):
+        """
+        Make each readable path hold its object's content.
+
+        Paths already holding the right content are left alone (not rewritten).
+
+        Returns:
+            int: Number of files written.
+        """
+        written = 0
+        for relpath, digest in outputs.items():
+            path = REPO_ROOT / relpath
+            if path.exists() and path.stat().st_size == self.object_path(digest).stat().st_size \
+                    and self._digest(relpath) == digest:
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(_tmp_name(f".{path.name}"))
+            shutil.copyfile(self.object_path(digest), tmp)
+            os.replace(tmp, path)
+            written += 1
+        if target is not None:
+            self._update_manifest(target, key, outputs)
+            self._build_path(target, key).touch()  # recently used: gc keeps it
+        return written
+
+    def manifest(self):
+        """{readable path: {'digest', 'target', 'key'}} for everything the store put in place."""
+        return _read_json(self.root / 'manifest.json', {})
+
+    def _update_manifest(self, target, key, outputs):
+        with self.lock('manifest'):
+            manifest = self.manifest()
+            for relpath, digest in outputs.items():
+                manifest[relpath] = {'digest': digest, 'target': target, 'key': key}
+            _write_json(self.root / 'manifest.json', manifest)
+
+    def gc(self, keep=3, grace=3600):
+        """
+        Keep the `keep` newest builds per target and drop objects nothing refers to.
+
+        Builds run without a store-wide lock, so an object put by a build
+        that has not recorded it yet looks unreferenced: objects modified in
+        the last `grace` seconds and in-flight .tmp files are left alone.
+
+        Returns:
+            tuple: (builds removed, objects removed, bytes freed).
+        """
+        cutoff = time.time() - grace
+        with self.lock('manifest'):
+            referenced = {entry['digest'] for entry in self.manifest().values()}
+        builds_removed = 0
+        for target_dir in (self.root / 'builds').glob('*'):
+            builds = sorted(target_dir.glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True)
+            for i, path in enumerate(builds):
+                if i < keep:
+                    referenced.update(_read_json(path, {}).get('outputs', {}).values())
+                else:
+                    path.unlink()
+                    builds_removed += 1
+        objects_removed = freed = 0
+        for path in (self.root / 'objects').glob('*/*'):
+            if path.name in referenced or path.suffix == '.tmp':
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime < cutoff:
+                freed += stat.st_size
+                path.unlink()
+                objects_removed += 1
+        return builds_removed, objects_removed, freed
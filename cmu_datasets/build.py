@@ -0,0 +1,388 @@
+"""
+Dataset Build Graph
+
+Declares every generated dataset as a target with its inputs and outputs,
+and rebuilds only what changed:
+
+    python -m cmu_datasets build                 # everything that is stale
+    python -m cmu_datasets build titanic-duckdb  # one target (+ what it needs)
+    python -m cmu_datasets build --dry-run       # show what would run
+    python -m cmu_datasets build --force -j 2
+
+- a target's dependencies are the targets producing its inputs
+- a target is up to date when its outputs exist and the content hash of
+  its inputs (data files, its script and every cmu_datasets module the
+  script imports, directly or through other modules, read from its import
+  statements) is the one recorded after its last successful run; file
+  hashes are cached by size and mtime, so unchanged files are not re-read
+- independent targets run in parallel, each in its own process via
+  `python -m cmu_datasets <command>`, with output in .cache/build/<target>.log
+- outputs go into the artifact store (cmu_datasets.artifacts) under the
+  input key; a stale target whose key was built before is restored from
+  the store instead of rerun, and concurrent builds of one key run once
+- a target whose input is missing, or whose dependency failed, is skipped
+
+State lives in .cache/build.json; delete it (or pass --force) to rebuild
+everything. `--gc` trims the artifact store to the newest builds.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from cmu_datasets.artifacts import ArtifactStore, file_digest
+from cmu_datasets.commands import COMMANDS
+from cmu_datasets.paths import REPO_ROOT
+
+STATE_PATH = REPO_ROOT / '.cache' / 'build.json'
+LOG_DIR = REPO_ROOT / '.cache' / 'build'
+
+# fresh: delete the outputs before running (scripts that CREATE TABLE into an existing file)
+Target = namedtuple('Target', ['command', 'inputs', 'outputs', 'fresh'])
+
+_TITANIC_FORMATS = [
+    'titanic_semicolon.csv', 'titanic_pipe.csv', 'titanic.tsv',
+    'titanic_records.json', 'titanic_index.json', 'titanic_values.json',
+    'titanic_split.json', 'titanic_table.json', 'titanic.parquet', 'titanic.feather',
+    'titanic.pkl', 'titanic.xlsx', 'titanic_multi.xlsx',
+]
+
+# Paths are relative to the repository root. Inputs list data files; the
+# cmu_datasets modules a target's script imports are added by input_key().
+TARGETS = {
+    'weo-simple': Target(
+        'weo-etl',
+        inputs=['data/weo-2025-04-full.xls', 'data/country_info.csv'],
+        outputs=['clean/weo-simple.csv', 'clean/weo-simple.parquet'],
+        fresh=False),
+    'weo-metrics': Target(
+        'weo-metrics',
+        inputs=['data/weo-2025-04-full.xls', 'clean/weo/countries.csv', 'clean/weo/indicators.csv'],
+        outputs=['clean/weo/metrics.csv'],
+        fresh=False),
+    'weo-duckdb': Target(
+        'weo-load',
+        inputs=['clean/weo/countries.csv', 'clean/weo/indicators.csv', 'clean/weo/metrics.csv'],
+        outputs=['clean/weo/weo.duckdb'],
+        fresh=False),
+    'titanic-formats': Target(
+        'titanic-convert',
+        inputs=['clean/titanic/titanic.csv'],
+        outputs=[f'clean/titanic/{name}' for name in _TITANIC_FORMATS],
+        fresh=False),
+    'titanic-duckdb': Target(
+        'titanic-duckdb',
+        inputs=['clean/titanic/titanic.csv', 'clean/titanic/titanic_restaurant.csv',
+                'clean/titanic/titanic_luggage.csv'],
+        outputs=['titanic.duckdb', 'titanic_direct.duckdb', 'titanic_safe.duckdb'],
+        fresh=True),
+    'elections-duckdb': Target(
+        'elections',
+        inputs=['assignments/elections/candidates.csv', 'assignments/elections/elections.csv',
+                'assignments/elections/parties.csv', 'assignments/elections/results.csv'],
+        outputs=['assignments/elections/elections.duckdb'],
+        fresh=False),
+}
+
+
+def helper_modules(script):
+    """
+    The cmu_datasets modules a script imports, directly or through other
+    cmu_datasets modules (function-level imports included), as repo-relative paths.
+    """
+    found, stack = set(), [script]
+    while stack:
+        try:
+            tree = ast.parse((REPO_ROOT / stack.pop()).read_text(encoding='utf-8'))
+        except (OSError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            else:
+                continue
+            for name in names:
+                if name.split('.')[0] != 'cmu_datasets':
+                    continue
+                base = name.replace('.', '/')
+                for relpath in (f"{base}.py", f"{base}/__init__.py"):
+                    if relpath not in found and (REPO_ROOT / relpath).is_file():
+                        found.add(relpath)
+                        stack.append(relpath)
+    return sorted(found)
+
+
+def dependencies(targets=TARGETS):
+    """{target: set of targets producing its inputs}; raises ValueError on clashes or cycles."""
+    producers = {}
+    for name, target in targets.items():
+        for output in target.outputs:
+            if output in producers:
+                raise ValueError(f"{output} is an output of both {producers[output]} and {name}")
+            producers[output] = name
+    deps = {name: {producers[i] for i in target.inputs if i in producers} - {name}
+            for name, target in targets.items()}
+
+    # Cycle check (depth-first, three colours)
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'active':
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = 'active'
+        for dep in deps[name]:
+            visit(dep, path + [name])
+        state[name] = 'done'
+
+    for name in targets:
+        visit(name, [])
+    return deps
+
+
+def with_dependencies(names, deps):
+    """The targets in `names` plus everything they depend on."""
+    selected, stack = set(), list(names)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(deps[name])
+    return selected
+
+
+class BuildState:
+    """File digests (cached by size / mtime) and each target's last input hash."""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.files = data.get('files', {})
+        self.targets = data.get('targets', {})
+        self._lock = threading.Lock()  # the artifact store hashes from worker threads
+
+    def digest(self, relpath):
+        """SHA-256 of a file's content; None if it does not exist."""
+        path = REPO_ROOT / relpath
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        cached = self.files.get(relpath)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = file_digest(path)
+        with self._lock:
+            self.files[relpath] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def input_key(self, target):
+        """(hash over the target's script, its helper modules and inputs, [missing inputs])."""
+        script = COMMANDS[target.command].script
+        paths = [script, *helper_modules(script), *target.inputs]
+        sha, missing = hashlib.sha256(), []
+        for relpath in sorted(set(paths)):
+            digest = self.digest(relpath)
+            if digest is None:
+                missing.append(relpath)
+            sha.update(f"{relpath}\0{digest}\n".encode())
+        return sha.hexdigest(), missing
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with self._lock:
+            files = dict(self.files)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'files': files, 'targets': self.targets}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def run_target(name, target, key=None, store=None, reuse=True):
+    """
+    Bring one target's outputs in line with `key`.
+
+    With a store, outputs built earlier for the same key are restored
+    instead of recomputed (unless reuse=False); a fresh run's outputs are
+    recorded under the key.
+
+    Returns:
+        tuple: ('restored' or 'ran', returncode, seconds).
+    """
+    start = time.perf_counter()
+    if store is None:
+        return ('ran', _run_command(name, target), time.perf_counter() - start)
+    with store.lock(name, key):
+        # another job may have built this key while we waited for the lock
+        outputs = store.lookup(name, key) if reuse else None
+        if outputs is not None:
+            store.restore(outputs, name, key)
+            return ('restored', 0, time.perf_counter() - start)
+        returncode = _run_command(name, target)
+        if returncode == 0 and all((REPO_ROOT / o).exists() for o in target.outputs):
+            store.record(name, key, target.outputs)
+    return ('ran', returncode, time.perf_counter() - start)
+
+
+def _run_command(name, target):
+    """Run a target's command in a child process, output to its log; returns the exit code."""
+    if target.fresh:
+        for output in target.outputs:
+            (REPO_ROOT / output).unlink(missing_ok=True)
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.getenv('PYTHONPATH')])))
+    with open(LOG_DIR / f"{name}.log", 'w', encoding='utf-8') as log:
+        proc = subprocess.run([sys.executable, '-m', 'cmu_datasets', target.command],
+                              cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode
+
+
+def _log_tail(name, lines=5):
+    try:
+        with open(LOG_DIR / f"{name}.log", encoding='utf-8', errors='replace') as f:
+            return f.read().rstrip().splitlines()[-lines:]
+    except OSError:
+        return []
+
+
+def build(names=None, jobs=None, force=False, dry_run=False, use_store=True, targets=TARGETS):
+    """
+    Bring targets up to date, running independent ones in parallel.
+
+    Args:
+        names: Targets to build (default: all), plus their dependencies.
+        jobs: Parallel targets (default: CPU count).
+        force: Rebuild even if the inputs are unchanged.
+        dry_run: Only report what would run.
+        use_store: Restore / record outputs through the artifact store.
+            --force always recomputes, but still records the result.
+
+    Returns:
+        dict: Target -> 'ok', 'restored', 'up to date', 'would run', 'failed'
+        or 'skipped: <reason>'.
+    """
+    deps = dependencies(targets)
+    unknown = [n for n in (names or []) if n not in targets]
+    if unknown:
+        raise ValueError(f"Unknown targets {unknown}; choose from {', '.join(targets)}")
+    pending = with_dependencies(names or list(targets), deps)
+    state = BuildState()
+    store = ArtifactStore(digest=state.digest) if use_store else None
+    results, keys, running = {}, {}, {}
+    succeeded = ('ok', 'restored', 'up to date', 'would run')
+
+    def ready(name):
+        return all(dep in results for dep in deps[name])
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        while pending or running:
+            for name in sorted(n for n in pending if ready(n)):
+                pending.discard(name)
+                target = targets[name]
+                failed = [dep for dep in deps[name] if results.get(dep) not in succeeded]
+                if failed:
+                    results[name] = f"skipped: {', '.join(sorted(failed))} failed"
+                    print(f"[skip] {name}: {', '.join(sorted(failed))} failed")
+                    continue
+                key, missing = state.input_key(target)
+                upstream_runs = any(results.get(dep) == 'would run' for dep in deps[name])
+                if missing and not upstream_runs:
+                    results[name] = f"skipped: missing {', '.join(missing)}"
+                    print(f"[skip] {name}: missing input {', '.join(missing)}")
+                    continue
+                outputs_exist = all((REPO_ROOT / output).exists() for output in target.outputs)
+                if not force and not upstream_runs and outputs_exist and state.targets.get(name) == key:
+                    results[name] = 'up to date'
+                    print(f"[ -- ] {name}: up to date")
+                    continue
+                cached = store is not None and not force and not upstream_runs and store.lookup(name, key)
+                if dry_run:
+                    results[name] = 'would run'
+                    plan = "restore from the artifact store" if cached else f"python -m cmu_datasets {target.command}"
+                    print(f"[plan] {name}: {plan}")
+                    continue
+                print(f"[{'hit ' if cached else 'run '}] {name}")
+                keys[name] = key
+                running[pool.submit(run_target, name, target, key, store, not force)] = name
+
+            if not running:
+                if pending and not any(ready(n) for n in pending):
+                    raise RuntimeError(f"Build stalled with {sorted(pending)} pending")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                how, returncode, seconds = future.result()
+                missing = [o for o in targets[name].outputs if not (REPO_ROOT / o).exists()]
+                if returncode == 0 and not missing:
+                    results[name] = 'restored' if how == 'restored' else 'ok'
+                    state.targets[name] = keys[name]
+                    print(f"[ ok ] {name} ({how}, {seconds:.1f}s)")
+                else:
+                    results[name] = 'failed'
+                    state.targets.pop(name, None)
+                    reason = f"exit {returncode}" if returncode else f"did not write {', '.join(missing)}"
+                    print(f"[FAIL] {name} ({reason}); log: {LOG_DIR / (name + '.log')}")
+                    for line in _log_tail(name):
+                        print(f"       {line}")
+                # record progress as we go, so an interrupted build keeps finished targets
+                state.save()
+    if not dry_run:
+        state.save()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m cmu_datasets build',
+                                     description="Rebuild the generated datasets whose inputs changed")
+    parser.add_argument('targets', nargs='*', help=f"targets (default: all): {', '.join(TARGETS)}")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="parallel targets (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the inputs are unchanged")
+    parser.add_argument('--dry-run', action='store_true', help="show what would run")
+    parser.add_argument('--list', action='store_true', help="list targets with their dependencies")
+    parser.add_argument('--no-store', action='store_true', help="don't restore from / record into the artifact store")
+    parser.add_argument('--gc', type=int, metavar='KEEP', default=None,
+                        help="keep the KEEP newest stored builds per target, delete unreferenced objects, and exit")
+    args = parser.parse_args(argv)
+
+    if args.gc is not None:
+        builds, objects, freed = ArtifactStore().gc(keep=args.gc)
+        print(f"Removed {builds} builds and {objects} objects ({freed / 1e6:,.1f} MB)")
+        return 0
+
+    if args.list:
+        deps = dependencies()
+        for name, target in TARGETS.items():
+            after = f"  (after {', '.join(sorted(deps[name]))})" if deps[name] else ''
+            print(f"{name:<18} python -m cmu_datasets {target.command}{after}")
+        return 0
+
+    start = time.perf_counter()
+    results = build(args.targets, jobs=args.jobs, force=args.force, dry_run=args.dry_run,
+                    use_store=not args.no_store)
+    counts = {}
+    for status in results.values():
+        status = status.split(':')[0]
+        counts[status] = counts.get(status, 0) + 1
+    summary = ', '.join(f"{n} {status}" for status, n in counts.items())
+    print(f"\n{summary} in {time.perf_counter() - start:.1f}s")
+    return 1 if 'failed' in results.values() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
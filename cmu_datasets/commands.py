@@ -0,0 +1,116 @@
+"""
+Command Dispatcher
+
+One entry point for the repository's scripts:
+
+    python -m cmu_datasets                       # list the commands
+    python -m cmu_datasets weo-eda
+    python -m cmu_datasets weo-vintages data/ --workers 4
+    python -m cmu_datasets elections-check
+
+A command names a script (relative to the repository root), the directory
+it runs in, and optionally a function to call instead of the script's
+__main__ block; relative paths in the arguments are taken from that
+directory. Nothing beyond the standard library is imported until a
+command runs, and the scripts import their heavy dependencies (pandas,
+janitor, plotting) only where they are used, so short jobs are not
+dominated by startup. `python -X importtime -m cmu_datasets <command>`
+shows what a command loads; benchmarks/import_time.py compares them all.
+"""
+
+import os
+import runpy
+import sys
+from collections import namedtuple
+
+from cmu_datasets.paths import REPO_ROOT
+
+Command = namedtuple('Command', ['script', 'cwd', 'function', 'help'])
+
+COMMANDS = {
+    'weo-etl': Command('etl/weo.py', '.', None,
+                       "WEO export -> clean/weo-simple.csv / .parquet"),
+    'weo-metrics': Command('etl/weo_metrics.py', '.', None,
+                           "WEO export -> clean/weo/metrics.csv (observations for the loaders)"),
+    'weo-vintages': Command('etl/weo_vintages.py', '.', None,
+                            "merge every WEO vintage into one long Parquet table"),
+    'weo-load': Command('clean/weo/weo.py', 'clean/weo', None,
+                        "load the clean WEO CSVs into weo.duckdb"),
+    'weo-load-postgres': Command('clean/weo/weo_postgres.py', 'clean/weo', None,
+                                 "load the clean WEO CSVs into PostgreSQL"),
+    'weo-eda': Command('clean/weo/eda.py', '.', None,
+                       "WEO exploratory report from weo.duckdb"),
+    'weo-eda-db': Command('clean/weo/eda_db.py', '.', None,
+                          "WEO exploratory report from PostgreSQL"),
+    'titanic-convert': Command('etl/titanic_convert.py', '.', None,
+                               "write titanic.csv in every supported file format"),
+    'titanic-duckdb': Command('duck_etl.py', '.', None,
+                              "build titanic.duckdb from the titanic CSVs"),
+    'elections': Command('assignments/elections/elections.py', '.', None,
+                         "build elections.duckdb and check it"),
+    'elections-check': Command('assignments/elections/elections.py', '.', 'test_database_connection',
+                               "show recent winners from elections.duckdb"),
+    'scrape': Command('scrape.py', '.', None,
+                      "scrape the example pages (cached)"),
+    'india-schools': Command('scrap.py', '.', None,
+                             "download and reshape the India school table"),
+    'build': Command('cmu_datasets/build.py', '.', None,
+                     "rebuild the generated datasets whose inputs changed (see --help)"),
+    'parquet-codecs': Command('cmu_datasets/parquet.py', '.', None,
+                              "benchmark Parquet codecs / encodings per column of a file"),
+    'bench-tables': Command('benchmarks/table_extraction.py', '.', None,
+                            "HTML table extraction benchmark"),
+    'bench-imports': Command('benchmarks/import_time.py', '.', None,
+                             "import time of every command"),
+    'bench-backends': Command('benchmarks/weo_backends.py', '.', None,
+                              "WEO EDA queries on DuckDB vs PostgreSQL vs pandas at 1x-100x scale"),
+}
+
+
+def script_path(name):
+    return REPO_ROOT / COMMANDS[name].script
+
+
+def run(name, argv=()):
+    """
+    Run a command in its working directory.
+
+    Args:
+        name: Key of COMMANDS.
+        argv: Arguments for the script (sys.argv[1:]), or for the function.
+
+    Returns:
+        int: Exit status (a function returning False counts as a failure).
+    """
+    if name not in COMMANDS:
+        raise ValueError(f"Unknown command {name!r}; run `python -m cmu_datasets` for the list")
+    command = COMMANDS[name]
+    script = str(script_path(name))
+    os.chdir(REPO_ROOT / command.cwd)
+    sys.argv = [script, *argv]
+    if command.function is None:
+        runpy.run_path(script, run_name='__main__')
+        return 0
+    namespace = runpy.run_path(script, run_name=os.path.splitext(os.path.basename(script))[0])
+    result = namespace[command.function](*argv)
+    return 1 if result is False else 0
+
+
+def print_commands():
+    width = max(len(name) for name in COMMANDS)
+    print("usage: python -m cmu_datasets <command> [args...]\n")
+    for name, command in COMMANDS.items():
+        print(f"  {name:<{width}}  {command.help}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help', 'help'):
+        print_commands()
+        return 0
+    name, args = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"Unknown command: {name}\n")
+        print_commands()
+        return 2
+    return run(name, args)
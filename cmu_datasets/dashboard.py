@@ -0,0 +1,217 @@
+"""
+Dashboard Backend
+
+Small, pre-aggregated data slices for Streamlit / plotly charts:
+- regional GDP per capita, G7 growth series (weo.duckdb)
+- titanic survival by class (and by class and sex)
+
+Every view is computed once per dataset generation (file modification time
+and size) and kept in a process-wide cache, so page interactions read a few
+hundred cached rows instead of querying or reloading the database. When the
+file is rebuilt, the next request sees a new generation and recomputes.
+
+Usage (in a Streamlit page):
+    from cmu_datasets import dashboard
+    st.plotly_chart(px.line(dashboard.g7_growth(), x='year', y='value', color='name'))
+"""
+
+import os
+import threading
+from functools import wraps
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from cmu_datasets.duck import close_readers, get_manager
+from cmu_datasets.paths import TITANIC_PARQUET, WEO_DB, WEO_OBSERVATIONS
+
+MAX_POINTS = 500
+
+
+def dataset_generation(path):
+    """Identify a version of a data file by modification time and size."""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ViewCache:
+    """Process-wide cache of view results, invalidated per dataset generation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # (view, args) -> (generation, result)
+        self._generations = {}  # path -> generation last seen
+
+    def get(self, key, path, compute):
+        generation = dataset_generation(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                return entry[1]
+            rebuilt = self._generations.get(path, generation) != generation
+            if rebuilt:
+                # Drop every view of the old file
+                for stale in [k for k in self._entries if k[1] == path]:
+                    del self._entries[stale]
+            self._generations[path] = generation
+        if rebuilt and str(path).endswith('.duckdb'):
+            close_readers(path)  # reopen the database on next use
+
+        result = compute()
+        with self._lock:
+            self._entries[key] = (generation, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+_cache = ViewCache()
+
+
+def cached_view(path):
+    """Cache a view function's result per dataset generation of `path`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, str(path), args, tuple(sorted(kwargs.items())))
+            # Return a copy so chart code can't mutate the cached frame
+            return _cache.get(key, str(path), lambda: func(*args, **kwargs)).copy()
+        return wrapper
+    return decorator
+
+
+def clear_cache():
+    """Forget every cached view (e.g. from a Streamlit 'refresh' button)."""
+    _cache.clear()
+
+
+def downsample(df, x, y, max_points=MAX_POINTS, group=None):
+    """
+    Reduce a series to at most about `max_points` points per group.
+
+    Keeps the minimum and maximum of each x-bucket, so spikes stay visible.
+
+    Args:
+        df: Long DataFrame.
+        x: Column along the x axis (sorted within each group).
+        y: Value column.
+        max_points: Target number of points per series.
+        group: Optional column identifying separate series.
+
+    Returns:
+        pandas.DataFrame: Down-sampled rows of `df`.
+    """
+    if group is None:
+        groups = [df]
+    else:
+        groups = [g for _, g in df.groupby(group, sort=False, observed=True)]
+    keep = []
+    for g in groups:
+        g = g.sort_values(x)
+        if len(g) <= max_points:
+            keep.append(g)
+            continue
+        buckets = np.arange(len(g)) * (max_points // 2) // len(g)
+        values = g[y].to_numpy()
+        picks = pd.DataFrame({'bucket': buckets, 'value': values, 'pos': np.arange(len(g))})
+        picks = picks.dropna(subset=['value'])
+        lo = picks.loc[picks.groupby('bucket')['value'].idxmin(), 'pos']
+        hi = picks.loc[picks.groupby('bucket')['value'].idxmax(), 'pos']
+        keep.append(g.iloc[np.unique(np.concatenate([lo.to_numpy(), hi.to_numpy()]))])
+    return pd.concat(keep, ignore_index=True) if keep else df.iloc[0:0]
+
+
+def _weo_query(sql, params=None):
+    return get_manager(WEO_DB).query_df(sql, params)
+
+
+# ============================================================================
+# WEO VIEWS
+# ============================================================================
+
+@cached_view(WEO_DB)
+def regional_gdp_per_capita():
+    """Average / min / max GDP per capita by region for the latest year."""
+    return _weo_query(f"""
+        SELECT c.region7,
+               AVG(i.value) AS avg_gdp_per_capita,
+               MIN(i.value) AS min_gdp_per_capita,
+               MAX(i.value) AS max_gdp_per_capita,
+               COUNT(*) AS country_count
+        FROM {WEO_OBSERVATIONS} i
+        JOIN countries c ON i.iso_code = c.iso_code
+        WHERE i.subject_code = 'NGDPDPC'
+          AND i.year = (SELECT MAX(year) FROM {WEO_OBSERVATIONS} WHERE subject_code = 'NGDPDPC')
+          AND c.region7 IS NOT NULL
+        GROUP BY c.region7
+        ORDER BY avg_gdp_per_capita DESC
+    """)
+
+
+@cached_view(WEO_DB)
+def g7_growth(since=2010, max_points=MAX_POINTS):
+    """Real GDP growth (%) per G7 country and year."""
+    data = _weo_query(f"""
+        SELECT c.name, i.year, i.value
+        FROM {WEO_OBSERVATIONS} i
+        JOIN countries c ON i.iso_code = c.iso_code
+        WHERE i.subject_code = 'NGDP_RPCH'
+          AND c.group_g7 = true
+          AND i.year >= ?
+        ORDER BY c.name, i.year
+    """, [since])
+    return downsample(data, 'year', 'value', max_points, group='name')
+
+
+@cached_view(WEO_DB)
+def indicator_series(subject_code, iso_codes, max_points=MAX_POINTS):
+    """One indicator's yearly series for a few countries (iso_codes is a tuple)."""
+    placeholders = ', '.join('?' for _ in iso_codes)
+    data = _weo_query(f"""
+        SELECT c.name, i.year, i.value
+        FROM {WEO_OBSERVATIONS} i
+        JOIN countries c ON i.iso_code = c.iso_code
+        WHERE i.subject_code = ?
+          AND i.iso_code IN ({placeholders})
+        ORDER BY c.name, i.year
+    """, [subject_code, *iso_codes])
+    return downsample(data, 'year', 'value', max_points, group='name')
+
+
+# ============================================================================
+# TITANIC VIEWS
+# ============================================================================
+
+def _titanic_query(sql):
+    return duckdb.query(sql.replace('{titanic}', f"read_parquet('{TITANIC_PARQUET}')")).df()
+
+
+@cached_view(TITANIC_PARQUET)
+def titanic_survival_by_class():
+    """Passengers, survivors and survival rate per class."""
+    return _titanic_query("""
+        SELECT class,
+               COUNT(*) AS passengers,
+               SUM(survived) AS survivors,
+               ROUND(AVG(survived) * 100, 1) AS survival_rate
+        FROM {titanic}
+        GROUP BY class
+        ORDER BY class
+    """)
+
+
+@cached_view(TITANIC_PARQUET)
+def titanic_survival_by_class_and_sex():
+    """Survival rate per class and sex."""
+    return _titanic_query("""
+        SELECT class, sex,
+               COUNT(*) AS passengers,
+               ROUND(AVG(survived) * 100, 1) AS survival_rate
+        FROM {titanic}
+        GROUP BY class, sex
+        ORDER BY class, sex
+    """)
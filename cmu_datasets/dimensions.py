@@ -0,0 +1,115 @@
+"""
+Country Dimension
+
+Country metadata held once, addressed by an integer surrogate key (the
+`country_id` of clean/weo/countries.csv):
+- name and ISO lookup indexes are built once, so encoding a fact table's
+  country names / ISO codes to keys is a single hash lookup per value
+- fact tables carry only the key; metadata columns are attached by
+  position lookup (numpy take) when a step actually needs them, instead of
+  merging every metadata column onto every fact row
+
+Usage:
+    countries = CountryDimension.from_csv('clean/weo/countries.csv')
+    facts['country_id'] = countries.encode(names=facts['country'])
+    subset = countries.attach(subset, ['region7', 'group_g7'])
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _lookup_index(column):
+    """Value -> row position Series over a column (blank rows skipped, first row wins)."""
+    column = column.reset_index(drop=True)
+    column = column[column.notna() & ~column.duplicated()]
+    return pd.Series(column.index.to_numpy(), index=pd.Index(column.to_numpy()))
+
+
+class CountryDimension:
+    """Country metadata with integer keys and name / ISO lookup indexes."""
+
+    def __init__(self, frame, key='country_id', name='name', iso='iso_code'):
+        """
+        Args:
+            frame: One row per country. Rows get keys 1..n if `key` is missing.
+            key: Surrogate key column.
+            name: Country name column.
+            iso: ISO code column (optional in `frame`).
+        """
+        frame = frame.reset_index(drop=True)
+        if key not in frame.columns:
+            frame.insert(0, key, np.arange(1, len(frame) + 1))
+        if frame[key].duplicated().any():
+            raise ValueError(f"Duplicate {key} values in country dimension")
+        self.frame = frame
+        self.key = key
+        self.name = name
+        self.iso = iso if iso in frame.columns else None
+
+        keys = frame[key].to_numpy(dtype='int64')
+        # Dense key -> row position array, so key lookups are a numpy take
+        self._position = np.full(keys.max() + 1 if len(keys) else 1, -1, dtype='int64')
+        self._position[keys] = np.arange(len(keys))
+        self._keys = keys
+        self.name_index = _lookup_index(frame[name])
+        self.iso_index = _lookup_index(frame[self.iso]) if self.iso else None
+
+    @classmethod
+    def from_csv(cls, path, **options):
+        return cls(pd.read_csv(path), **options)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def encode(self, names=None, isos=None):
+        """
+        Map country names or ISO codes to surrogate keys.
+
+        Returns:
+            numpy.ndarray: int64 keys, -1 where the country is unknown.
+        """
+        if (names is None) == (isos is None):
+            raise ValueError("Pass exactly one of names= or isos=")
+        if isos is not None and self.iso_index is None:
+            raise ValueError("This dimension has no ISO column")
+        index = self.name_index if names is not None else self.iso_index
+        values = pd.Index(names if names is not None else isos)
+        # Look each distinct value up once, then broadcast back to the rows
+        codes, uniques = pd.factorize(values)
+        found = index.index.get_indexer(uniques)
+        positions = np.where(found >= 0, index.to_numpy()[found], -1)
+        keys = np.where(positions >= 0, self._keys[positions], -1)
+        return np.where(codes >= 0, keys[codes], -1)
+
+    def positions(self, keys):
+        """Row positions in the dimension for an array of keys (-1 = unknown)."""
+        keys = np.asarray(keys, dtype='int64')
+        valid = (keys >= 0) & (keys < len(self._position))
+        out = np.full(keys.shape, -1, dtype='int64')
+        out[valid] = self._position[keys[valid]]
+        return out
+
+    def lookup(self, keys, column):
+        """Metadata values for an array of keys (missing where the key is unknown)."""
+        positions = self.positions(keys)
+        source = self.frame[column]
+        values = source.take(np.maximum(positions, 0)).reset_index(drop=True)
+        if (positions < 0).any():
+            values = values.where(pd.Series(positions >= 0))
+        return values
+
+    def attach(self, facts, columns, key=None):
+        """
+        Return `facts` with metadata columns added by key.
+
+        Args:
+            facts: DataFrame with a key column.
+            columns: Dimension columns to attach.
+            key: Key column in `facts` (default: the dimension's key name).
+        """
+        keys = facts[key or self.key].to_numpy()
+        facts = facts.copy()
+        for column in columns:
+            facts[column] = self.lookup(keys, column).to_numpy()
+        return facts
@@ -0,0 +1,155 @@
+"""
+DuckDB Connection Manager
+
+Opens one shared database instance per DuckDB file and hands out cursors:
+- read-only managers let several analysts / Streamlit workers query the
+  same file at once (no write lock is taken)
+- every thread gets its own cursor on the shared instance, so queries from
+  different threads run in parallel instead of queueing on one connection
+- writes go through a single writer guarded by a lock and a transaction
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+import duckdb
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+class DuckDBManager:
+    """Shared DuckDB database instance with per-thread cursors."""
+
+    def __init__(self, path, read_only=True, threads=None):
+        """
+        Args:
+            path: Path to the .duckdb file.
+            read_only: Open the file without taking the write lock.
+            threads: Number of DuckDB worker threads (default: all cores).
+        """
+        self.path = os.path.abspath(path)
+        self.read_only = read_only
+        self.threads = threads
+        self._conn = None
+        self._open_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        """The shared database instance, opened on first use."""
+        if self._conn is None:
+            with self._open_lock:
+                if self._conn is None:
+                    if self.read_only and not os.path.exists(self.path):
+                        raise FileNotFoundError(f"Database not found at {self.path}")
+                    config = {}
+                    if self.threads:
+                        config['threads'] = self.threads
+                    self._conn = duckdb.connect(self.path, read_only=self.read_only, config=config)
+        return self._conn
+
+    def cursor(self):
+        """Return the calling thread's cursor, creating it on first use."""
+        cur = getattr(self._local, 'cursor', None)
+        if cur is None:
+            cur = self.connection.cursor()
+            self._local.cursor = cur
+        return cur
+
+    def execute(self, sql, params=None):
+        """Run a statement on the calling thread's cursor."""
+        if params is None:
+            return self.cursor().execute(sql)
+        return self.cursor().execute(sql, params)
+
+    def query_df(self, sql, params=None):
+        """Run a query and return the result as a DataFrame."""
+        return self.execute(sql, params).df()
+
+    @contextmanager
+    def writer(self):
+        """
+        Serialize write access to the database.
+
+        Yields a cursor inside a transaction that is committed on success and
+        rolled back on error. Only one writer runs at a time per manager.
+        """
+        if self.read_only:
+            raise PermissionError(f"{self.path} was opened read-only")
+        with self._write_lock:
+            cur = self.connection.cursor()
+            cur.execute("BEGIN TRANSACTION")
+            try:
+                yield cur
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            finally:
+                cur.close()
+
+    def close(self):
+        """Close the shared instance and all cursors created from it."""
+        with self._open_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._local = threading.local()
+
+
+def get_manager(path, read_only=True, threads=None):
+    """
+    Return the process-wide manager for a DuckDB file.
+
+    DuckDB refuses to open the same file twice with different settings, so a
+    file can only be shared in one mode at a time within a process.
+
+    Args:
+        path: Path to the .duckdb file.
+        read_only: Open the file without taking the write lock.
+        threads: Number of DuckDB worker threads (default: all cores).
+
+    Returns:
+        DuckDBManager: The shared manager for the file.
+    """
+    key = os.path.abspath(path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is not None and manager.read_only != read_only and manager._conn is None:
+            # Not open yet (or already closed), so the mode can still change
+            manager = None
+        if manager is None:
+            manager = DuckDBManager(key, read_only=read_only, threads=threads)
+            _managers[key] = manager
+        elif manager.read_only != read_only:
+            mode = "read-only" if manager.read_only else "read-write"
+            raise ValueError(f"{key} is already open {mode} in this process; close it first")
+        return manager
+
+
+def connect_readonly(path, threads=None):
+    """Return a per-thread read-only cursor on a DuckDB file."""
+    return get_manager(path, read_only=True, threads=threads).cursor()
+
+
+def close_readers(path):
+    """
+    Close the read-only manager of a DuckDB file, if one is open, so the next
+    query sees a rebuilt file. A read-write manager is this process's writer
+    and already sees its own changes, so it is left open.
+    """
+    with _managers_lock:
+        manager = _managers.get(os.path.abspath(path))
+    if manager is not None and manager.read_only:
+        manager.close()
+
+
+def close_all():
+    """Close every manager opened through get_manager()."""
+    with _managers_lock:
+        for manager in _managers.values():
+            manager.close()
+        _managers.clear()
@@ -0,0 +1,204 @@
+"""
+Async Scraper Engine
+
+Fetches many pages concurrently while staying polite to each server:
+- one shared aiohttp session, so connections are reused
+- bounded concurrency overall and per host
+- a token-bucket rate limiter per host (replaces hand-placed time.sleep)
+- retry with exponential backoff for timeouts, 429 and 5xx responses
+- an optional HTTPCache, so fresh pages skip the network and stale ones
+  are revalidated instead of downloaded again
+
+Pages are handed to a parse function (e.g. a BeautifulSoup extraction) in a
+worker thread so parsing one page does not stall the downloads.
+
+Usage:
+    results = fetch_pages(urls, parse=parse_table, rate=1.0)
+"""
+
+import asyncio
+import random
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Educational Web Scraper - Python 2 CMU Course Project"
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+FetchResult = namedtuple('FetchResult', ['url', 'status', 'text', 'data', 'error', 'attempts'])
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` requests per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Fetcher:
+    """Concurrent, rate-limited page fetcher built on one aiohttp session."""
+
+    def __init__(self, concurrency=10, per_host=2, rate=1.0, burst=1,
+                 retries=3, backoff=0.5, timeout=30, headers=None, cache=None):
+        """
+        Args:
+            concurrency: Maximum requests in flight overall.
+            per_host: Maximum requests in flight to any one host.
+            rate: Requests per second allowed per host.
+            burst: Requests a host may receive back to back before the rate applies.
+            retries: Extra attempts after a failed request.
+            backoff: Base delay in seconds, doubled on every retry.
+            timeout: Total seconds allowed per request.
+            headers: Request headers (defaults to the course User-Agent).
+            cache: Optional HTTPCache used for lookups and revalidation.
+        """
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+        self.cache = cache
+        self._session = None
+        self._limit = None
+        self._hosts = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                              timeout=self.timeout)
+        self._limit = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        self._session = None
+
+    def _host_limits(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = (asyncio.Semaphore(self.per_host), TokenBucket(self.rate, self.burst))
+        return self._hosts[host]
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def get(self, url, headers=None):
+        """
+        Fetch one URL, retrying transient failures.
+
+        Returns:
+            tuple: (status, headers, body bytes, attempts)
+        """
+        host_limit, bucket = self._host_limits(url)
+        attempt = 0
+        while True:
+            async with self._limit, host_limit:
+                await bucket.acquire()
+                try:
+                    async with self._session.get(url, headers=headers) as response:
+                        body = await response.read()
+                        if response.status in RETRY_STATUSES and attempt < self.retries:
+                            delay = self._retry_delay(attempt, response)
+                        else:
+                            return response.status, response.headers, body, attempt + 1
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    if attempt >= self.retries:
+                        raise
+                    delay = self._retry_delay(attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_cached(self, url):
+        """Like get(), but served from or revalidated against the cache."""
+        if self.cache is None:
+            return await self.get(url)
+
+        cached, fresh = self.cache.lookup(url, self.headers)
+        if fresh:
+            return cached.status, cached.headers, cached.content, 0
+
+        conditional = self.cache.conditional_headers(cached) if cached is not None else None
+        status, headers, body, attempts = await self.get(url, conditional)
+        if status == 304 and cached is not None:
+            cached = self.cache.refresh(url, self.headers, cached, headers)
+            return cached.status, cached.headers, cached.content, attempts
+        self.cache.store(url, self.headers, status, headers, body)
+        return status, headers, body, attempts
+
+    async def fetch(self, url, parse=None):
+        """Fetch a URL and optionally parse its text in a worker thread."""
+        try:
+            status, headers, body, attempts = await self.get_cached(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return FetchResult(url, None, None, None, e, self.retries + 1)
+
+        text = body.decode(_charset(headers), errors="replace")
+        data, error = None, None
+        if parse is not None and status < 400:
+            try:
+                data = await asyncio.to_thread(parse, text)
+            except Exception as e:
+                error = e
+        return FetchResult(url, status, text, data, error, attempts)
+
+    async def fetch_all(self, urls, parse=None):
+        """Fetch every URL concurrently; results come back in input order."""
+        return await asyncio.gather(*(self.fetch(url, parse) for url in urls))
+
+
+def _charset(headers):
+    content_type = headers.get("Content-Type", "")
+    for part in content_type.split(";"):
+        part = part.strip()
+        if part.lower().startswith("charset="):
+            return part.split("=", 1)[1].strip('"') or "utf-8"
+    return "utf-8"
+
+
+def fetch_pages(urls, parse=None, **options):
+    """
+    Fetch a list of pages from synchronous code.
+
+    Args:
+        urls: URLs to fetch.
+        parse: Optional function turning page text into data (e.g. a DataFrame).
+        **options: Passed to Fetcher (concurrency, per_host, rate, retries, ...).
+
+    Returns:
+        list[FetchResult]: One result per URL, in input order.
+    """
+    async def run():
+        async with Fetcher(**options) as fetcher:
+            return await fetcher.fetch_all(urls, parse)
+
+    return asyncio.run(run())
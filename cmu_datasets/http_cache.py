@@ -0,0 +1,244 @@
+"""
+On-disk HTTP Response Cache
+
+Keeps downloaded pages between runs so scrapers don't hit the network on
+every iteration:
+- entries are keyed by URL plus the request headers that change the response
+- bodies are stored zlib-compressed in a single SQLite file
+- fresh entries (younger than the TTL) are served without any request
+- stale entries are revalidated with If-None-Match / If-Modified-Since, so an
+  unchanged page costs a 304 instead of a full download
+- the cache is size-bounded; least recently used entries are evicted first
+
+Usage:
+    cache = HTTPCache()
+    response = cache.get("https://www.cmu.edu/")
+    response.text
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_PATH = os.path.join('.cache', 'http.sqlite')
+
+# Request headers that can change the response body and so belong in the key
+VARY_HEADERS = ('accept', 'accept-encoding', 'accept-language', 'cookie', 'authorization')
+
+# Response headers describing the transfer, not the decoded body that is stored
+TRANSFER_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class CachedResponse:
+    """A response served from (or just written to) the cache."""
+
+    def __init__(self, url, status, headers, content, stored_at, from_cache):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.stored_at = stored_at
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        content_type = self.headers.get('Content-Type', self.headers.get('content-type', ''))
+        charset = 'utf-8'
+        for part in content_type.split(';'):
+            part = part.strip()
+            if part.lower().startswith('charset='):
+                charset = part.split('=', 1)[1].strip('"') or charset
+        return self.content.decode(charset, errors='replace')
+
+    def __repr__(self):
+        source = 'cache' if self.from_cache else 'network'
+        return f"<CachedResponse {self.status} {self.url} from {source}>"
+
+
+class HTTPCache:
+    """Persistent, size-bounded HTTP response cache with conditional revalidation."""
+
+    def __init__(self, path=DEFAULT_PATH, ttl=3600, max_bytes=256 * 1024 * 1024, level=6):
+        """
+        Args:
+            path: SQLite file holding the cache (directories are created).
+            ttl: Seconds an entry is served without revalidation. 0 always revalidates.
+            max_bytes: Upper bound on the total compressed body size.
+            level: zlib compression level for stored bodies.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.level = level
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._db.commit()
+
+    @staticmethod
+    def key(url, headers=None):
+        """Cache key for a URL and the response-changing request headers."""
+        vary = sorted((k.lower(), str(v)) for k, v in (headers or {}).items() if k.lower() in VARY_HEADERS)
+        return hashlib.sha256(json.dumps([url, vary]).encode('utf-8')).hexdigest()
+
+    def lookup(self, url, headers=None):
+        """
+        Find a cached response.
+
+        Returns:
+            tuple: (CachedResponse or None, is_fresh)
+        """
+        key = self.key(url, headers)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, False
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        status, raw_headers, body, stored_at = row
+        response = CachedResponse(url, status, json.loads(raw_headers), zlib.decompress(body),
+                                  stored_at, from_cache=True)
+        return response, time.time() - stored_at < self.ttl
+
+    @staticmethod
+    def conditional_headers(response):
+        """Revalidation headers for a cached response."""
+        headers = {}
+        etag = _header(response.headers, 'ETag')
+        last_modified = _header(response.headers, 'Last-Modified')
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def store(self, url, headers, status, response_headers, content):
+        """
+        Store a response; returns it wrapped as a CachedResponse.
+
+        `content` is the decoded body, so the headers describing how it was
+        transferred (Content-Encoding, Content-Length) are dropped.
+        """
+        response_headers = {k: v for k, v in dict(response_headers).items() if k.lower() not in TRANSFER_HEADERS}
+        now = time.time()
+        response = CachedResponse(url, status, response_headers, content, now, from_cache=False)
+        cache_control = _header(response_headers, 'Cache-Control').lower()
+        if status != 200 or 'no-store' in cache_control:
+            return response
+
+        body = zlib.compress(content, self.level)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.key(url, headers), url, status, json.dumps(response_headers), body, len(body),
+                 _header(response_headers, 'ETag') or None,
+                 _header(response_headers, 'Last-Modified') or None, now, now),
+            )
+            self._evict()
+            self._db.commit()
+        return response
+
+    def refresh(self, url, headers, response, response_headers=None):
+        """Mark a cached response as revalidated (after a 304)."""
+        merged = dict(response.headers)
+        for name in ('ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Date'):
+            value = _header(response_headers or {}, name)
+            if value:
+                merged = {k: v for k, v in merged.items() if k.lower() != name.lower()}
+                merged[name] = value
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET headers = ?, stored_at = ?, accessed_at = ? WHERE key = ?",
+                (json.dumps(merged), now, now, self.key(url, headers)),
+            )
+            self._db.commit()
+        return CachedResponse(url, response.status, merged, response.content, now, from_cache=True)
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        expired = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            expired.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", expired)
+
+    def get(self, url, headers=None, session=None, timeout=30):
+        """
+        GET a URL through the cache with `requests`.
+
+        Args:
+            url: URL to fetch.
+            headers: Request headers.
+            session: Optional requests.Session for connection reuse.
+            timeout: Seconds to wait for the server.
+
+        Returns:
+            CachedResponse: The fresh, revalidated or newly downloaded response.
+            Like requests.get, an error status is returned rather than raised
+            (check `status`); only 200 responses are cached.
+        """
+        import requests
+
+        headers = dict(headers or {})
+        cached, fresh = self.lookup(url, headers)
+        if cached is not None and fresh:
+            return cached
+
+        request_headers = dict(headers)
+        if cached is not None:
+            request_headers.update(self.conditional_headers(cached))
+        response = (session or requests).get(url, headers=request_headers, timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            return self.refresh(url, headers, cached, response.headers)
+        return self.store(url, headers, response.status_code, response.headers, response.content)
+
+    def clear(self):
+        """Delete every cached response."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._db.execute("VACUUM")
+
+    def close(self):
+        self._db.close()
+
+
+def _header(headers, name):
+    """Case-insensitive header lookup on a plain dict or a multidict."""
+    value = headers.get(name)
+    if value is None:
+        lower = name.lower()
+        for k, v in headers.items():
+            if k.lower() == lower:
+                return v
+        return ''
+    return value
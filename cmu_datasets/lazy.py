@@ -0,0 +1,423 @@
+"""
+Lazy Queries
+
+A small lazy frame over the project's datasets. Filters, projections,
+aggregations, sorting and limits are recorded, not run; collect() compiles
+the whole chain into a single DuckDB SQL query over the Parquet / CSV file
+or .duckdb table, so only the final (usually small) result is materialized.
+
+Usage:
+    from cmu_datasets.lazy import col, titanic, weo
+
+    (titanic()
+        .filter(col('age') >= 18)
+        .group_by('class', 'sex')
+        .agg(passengers=('*', 'count'), survival_rate=('survived', 'mean'))
+        .sort('class', 'sex')
+        .collect())
+
+    weo().filter(subject_code='NGDPDPC', year=2024).count()
+"""
+
+import threading
+
+import duckdb
+
+from cmu_datasets.duck import get_manager
+from cmu_datasets.paths import TITANIC_PARQUET, WEO_DB, WEO_OBSERVATIONS
+from cmu_datasets.profiling import traced
+
+AGGREGATES = {
+    'count': 'COUNT({})',
+    'sum': 'SUM({})',
+    'mean': 'AVG({})',
+    'avg': 'AVG({})',
+    'min': 'MIN({})',
+    'max': 'MAX({})',
+    'median': 'MEDIAN({})',
+    'std': 'STDDEV_SAMP({})',
+    'var': 'VAR_SAMP({})',
+    'nunique': 'COUNT(DISTINCT {})',
+    'first': 'FIRST({})',
+    'last': 'LAST({})',
+}
+
+
+def quote(name):
+    """Quote a column / table identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+# ============================================================================
+# EXPRESSIONS
+# ============================================================================
+
+class Expr:
+    """A SQL expression with positional (?) parameters, built with Python operators."""
+
+    __hash__ = None
+
+    def __init__(self, sql, params=()):
+        self.sql = sql
+        self.params = tuple(params)
+
+    def __repr__(self):
+        return f"Expr({self.sql!r}, {self.params!r})"
+
+    def _binary(self, op, other, reverse=False):
+        other = as_expr(other)
+        left, right = (other, self) if reverse else (self, other)
+        return Expr(f"({left.sql} {op} {right.sql})", left.params + right.params)
+
+    def __eq__(self, other):
+        if other is None:
+            return self.is_null()
+        return self._binary('=', other)
+
+    def __ne__(self, other):
+        if other is None:
+            return self.not_null()
+        return self._binary('<>', other)
+
+    def __lt__(self, other):
+        return self._binary('<', other)
+
+    def __le__(self, other):
+        return self._binary('<=', other)
+
+    def __gt__(self, other):
+        return self._binary('>', other)
+
+    def __ge__(self, other):
+        return self._binary('>=', other)
+
+    def __and__(self, other):
+        return self._binary('AND', other)
+
+    def __or__(self, other):
+        return self._binary('OR', other)
+
+    def __invert__(self):
+        return Expr(f"(NOT {self.sql})", self.params)
+
+    def __add__(self, other):
+        return self._binary('+', other)
+
+    def __radd__(self, other):
+        return self._binary('+', other, reverse=True)
+
+    def __sub__(self, other):
+        return self._binary('-', other)
+
+    def __rsub__(self, other):
+        return self._binary('-', other, reverse=True)
+
+    def __mul__(self, other):
+        return self._binary('*', other)
+
+    def __rmul__(self, other):
+        return self._binary('*', other, reverse=True)
+
+    def __truediv__(self, other):
+        return self._binary('/', other)
+
+    def __rtruediv__(self, other):
+        return self._binary('/', other, reverse=True)
+
+    def isin(self, values):
+        values = list(values)
+        if not values:
+            return Expr('FALSE')
+        return Expr(f"({self.sql} IN ({', '.join('?' for _ in values)}))", self.params + tuple(values))
+
+    def between(self, low, high):
+        low, high = as_expr(low), as_expr(high)
+        return Expr(f"({self.sql} BETWEEN {low.sql} AND {high.sql})", self.params + low.params + high.params)
+
+    def is_null(self):
+        return Expr(f"({self.sql} IS NULL)", self.params)
+
+    def not_null(self):
+        return Expr(f"({self.sql} IS NOT NULL)", self.params)
+
+    def like(self, pattern):
+        return Expr(f"({self.sql} LIKE ?)", self.params + (pattern,))
+
+
+def col(name):
+    """A column reference."""
+    return Expr(quote(name))
+
+
+def lit(value):
+    """A literal value, passed as a query parameter."""
+    return Expr('?', (value,))
+
+
+def sql(text, *params):
+    """A raw SQL expression, e.g. sql("year % 10 = 0")."""
+    return Expr(f"({text})", params)
+
+
+def as_expr(value):
+    return value if isinstance(value, Expr) else lit(value)
+
+
+def _aggregate(spec):
+    """('column', 'func') or Expr -> Expr."""
+    if isinstance(spec, Expr):
+        return spec
+    column, func = spec
+    if func not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate {func!r}; use one of {', '.join(AGGREGATES)}")
+    target = '*' if column == '*' else quote(column)
+    if column == '*' and func != 'count':
+        raise ValueError(f"'*' only works with count, not {func!r}")
+    return Expr(AGGREGATES[func].format(target))
+
+
+# ============================================================================
+# QUERY PLAN
+# ============================================================================
+
+class _Select:
+    """One SELECT level of a plan; operations that don't fit start a new level."""
+
+    def __init__(self, source):
+        self.source = source  # Expr for the FROM clause
+        self.columns = None  # list of (Expr, alias or None); None = *
+        self.where = []
+        self.group = None
+        self.order = None
+        self.limit = None
+        self.distinct = False
+
+    def copy(self):
+        new = _Select(self.source)
+        new.__dict__.update({k: (list(v) if isinstance(v, list) else v) for k, v in self.__dict__.items()})
+        return new
+
+    @property
+    def plain(self):
+        """Only a source and filters so far: anything can still be added."""
+        return self.columns is None and self.group is None and self.limit is None and not self.distinct
+
+    def compile(self):
+        params = []
+        if self.columns is None:
+            select = '*'
+        else:
+            parts = []
+            for expr, alias in self.columns:
+                parts.append(expr.sql if alias is None else f"{expr.sql} AS {quote(alias)}")
+                params.extend(expr.params)
+            select = ', '.join(parts)
+        text = f"SELECT {'DISTINCT ' if self.distinct else ''}{select} FROM {self.source.sql}"
+        params.extend(self.source.params)
+        if self.where:
+            text += ' WHERE ' + ' AND '.join(e.sql for e in self.where)
+            for e in self.where:
+                params.extend(e.params)
+        if self.group:
+            text += ' GROUP BY ' + ', '.join(quote(c) for c in self.group)
+        if self.order:
+            text += ' ORDER BY ' + ', '.join(f"{quote(c)}{' DESC' if desc else ''}" for c, desc in self.order)
+        if self.limit is not None:
+            text += f' LIMIT {int(self.limit)}'
+        return text, params
+
+
+class LazyFrame:
+    """A recorded query over one table or file; nothing runs until collect()."""
+
+    def __init__(self, source, database=None, _query=None, _depth=0):
+        """
+        Args:
+            source: FROM clause (e.g. "read_parquet('titanic.parquet')" or a quoted table name).
+            database: .duckdb file holding the table (None: an in-memory connection).
+        """
+        self.database = database
+        self._query = _query or _Select(Expr(source))
+        self._depth = _depth
+
+    def _derive(self, plain=False):
+        """A copy of the current level, or a new level over it."""
+        if plain and not self._query.plain:
+            text, params = self._query.compile()
+            depth = self._depth + 1
+            query = _Select(Expr(f"({text}) AS _q{depth}", params))
+            return LazyFrame(None, self.database, query, depth)
+        return LazyFrame(None, self.database, self._query.copy(), self._depth)
+
+    def filter(self, *predicates, **equals):
+        """Keep rows matching every predicate (Expr) and column=value pair."""
+        frame = self._derive(plain=True)
+        conditions = list(predicates) + [col(name) == value for name, value in equals.items()]
+        frame._query.where.extend(as_expr(c) if not isinstance(c, str) else sql(c) for c in conditions)
+        return frame
+
+    def select(self, *columns, **expressions):
+        """Keep these columns (names or Expr) and add named expressions."""
+        frame = self._derive(plain=True)
+        frame._query.columns = (
+            [(col(c) if isinstance(c, str) else c, None) for c in columns]
+            + [(as_expr(e), name) for name, e in expressions.items()]
+        )
+        return frame
+
+    def with_columns(self, **expressions):
+        """Keep every column and add named expressions."""
+        frame = self._derive(plain=True)
+        frame._query.columns = [(Expr('*'), None)] + [(as_expr(e), name) for name, e in expressions.items()]
+        return frame
+
+    def group_by(self, *keys):
+        return GroupBy(self, keys)
+
+    def agg(self, **aggregates):
+        """Aggregate the whole table: agg(n=('*', 'count'), avg_age=('age', 'mean'))."""
+        return GroupBy(self, ()).agg(**aggregates)
+
+    def sort(self, *columns, descending=False):
+        """Order by columns; prefix a name with '-' to sort it descending."""
+        frame = self._derive(plain=self._query.limit is not None)
+        frame._query.order = [
+            (c[1:], True) if c.startswith('-') else (c, descending) for c in columns
+        ]
+        return frame
+
+    def limit(self, n):
+        frame = self._derive()
+        current = frame._query.limit
+        frame._query.limit = n if current is None else min(current, n)
+        return frame
+
+    def distinct(self):
+        frame = self._derive(plain=self._query.limit is not None)
+        frame._query.distinct = True
+        return frame
+
+    def to_sql(self):
+        """The compiled query and its parameters."""
+        return self._query.compile()
+
+    def __repr__(self):
+        text, params = self.to_sql()
+        return f"<LazyFrame {text}{f' {params}' if params else ''}>"
+
+    def _execute(self, text, params):
+        cursor = _cursor(self.database)
+        return cursor.execute(text, params) if params else cursor.execute(text)
+
+    def collect(self):
+        """Run the query and return the result as a DataFrame."""
+        return self._execute(*self.to_sql()).df()
+
+    def arrow(self):
+        """Run the query and return the result as an Arrow table."""
+        return self._execute(*self.to_sql()).arrow()
+
+    def head(self, n=5):
+        return self.limit(n).collect()
+
+    def count(self):
+        """Number of rows the query returns."""
+        text, params = self.to_sql()
+        return self._execute(f"SELECT COUNT(*) FROM ({text}) AS _count", params).fetchone()[0]
+
+    def columns(self):
+        """Result column names (runs the query with LIMIT 0)."""
+        text, params = self.to_sql()
+        cursor = self._execute(f"SELECT * FROM ({text}) AS _columns LIMIT 0", params)
+        return [d[0] for d in cursor.description]
+
+    def explain(self):
+        """DuckDB's physical plan for the compiled query."""
+        text, params = self.to_sql()
+        return '\n'.join(str(r[-1]) for r in self._execute("EXPLAIN " + text, params).fetchall())
+
+
+class GroupBy:
+    def __init__(self, frame, keys):
+        self.frame = frame
+        self.keys = list(keys)
+
+    def agg(self, **aggregates):
+        """Named aggregates: agg(survivors=('survived', 'sum'), n=('*', 'count'))."""
+        if not aggregates:
+            raise ValueError("agg() needs at least one named aggregate")
+        frame = self.frame._derive(plain=True)
+        frame._query.columns = (
+            [(col(k), None) for k in self.keys]
+            + [(_aggregate(spec), name) for name, spec in aggregates.items()]
+        )
+        frame._query.group = self.keys or None
+        frame._query.order = None
+        return frame
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+_memory = None
+_memory_lock = threading.Lock()
+_local = threading.local()
+
+
+def _cursor(database):
+    """A per-thread cursor: the shared read-only instance, or an in-memory one for files."""
+    if database is not None:
+        return traced(get_manager(database).cursor())
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                _memory = duckdb.connect()
+    cursor = getattr(_local, 'cursor', None)
+    if cursor is None:
+        cursor = _local.cursor = _memory.cursor()
+    return traced(cursor)
+
+
+def scan_parquet(path):
+    return LazyFrame(f"read_parquet({_string(path)})")
+
+
+def scan_csv(path, **options):
+    """CSV file; keyword options go to DuckDB's read_csv (e.g. delim='|')."""
+    args = ''.join(f", {k} = {_string(v) if isinstance(v, str) else v}" for k, v in options.items())
+    return LazyFrame(f"read_csv({_string(path)}{args})")
+
+
+def scan_table(database, table):
+    """A table in a .duckdb file (opened read-only and shared)."""
+    return LazyFrame(quote(table), database=str(database))
+
+
+def scan(path, table=None):
+    """Lazy frame over a .parquet, .csv or .duckdb file (table required for .duckdb)."""
+    path = str(path)
+    if path.endswith('.duckdb'):
+        if table is None:
+            raise ValueError("Pass table= for a .duckdb file")
+        return scan_table(path, table)
+    if path.endswith('.parquet'):
+        return scan_parquet(path)
+    if path.endswith(('.csv', '.tsv', '.txt')):
+        return scan_csv(path)
+    raise ValueError(f"Don't know how to scan {path}")
+
+
+def titanic():
+    """The cleaned titanic passenger list (clean/titanic/titanic.parquet)."""
+    return scan_parquet(TITANIC_PARQUET)
+
+
+def weo(table=WEO_OBSERVATIONS):
+    """A table of clean/weo/weo.duckdb: the observations (default), countries or indicators."""
+    return scan_table(WEO_DB, table)
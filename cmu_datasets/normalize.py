@@ -0,0 +1,171 @@
+"""
+Sentinel and Boolean Normalization
+
+Cleans loader columns without going through Python strings row by row:
+- flags:   'True' / 'yes' / 'Y' / '1' / 1 / True -> True; false spellings,
+           missing values and unknown spellings -> False
+- text:    missing-value sentinels ('', '--', 'n/a', 'NULL', ...) -> null
+- numbers: sentinels -> null, then parsed as float64
+
+Each column is dictionary-encoded once in Arrow (one hashing pass), the
+spelling tables are looked up once per *distinct* value, and the result is
+gathered through the dictionary indices with one NumPy take. The work is
+linear in the rows with a per-row cost of an integer index, and the frame
+is copied once for all normalized columns.
+
+Usage (both WEO loaders):
+    countries_df = normalize(countries_df, text=['region7', 'econ_group'],
+                             flags=['group_g7', 'group_european_union', 'group_asean5'])
+    metrics_df = normalize(metrics_df, numbers=['value'])
+    rows = sql_rows(countries_df)    # tuples with None for missing, for execute_values
+"""
+
+import numpy as np
+
+# Compared after strip() and lower()
+SENTINELS = frozenset(['', '--', '-', '.', '...', 'n/a', 'na', 'nan', 'none', 'null'])
+TRUE = frozenset(['true', 't', 'yes', 'y', '1', '1.0'])
+FALSE = frozenset(['false', 'f', 'no', 'n', '0', '0.0'])
+
+
+def _key(value):
+    return str(value).strip().lower()
+
+
+def _arrow(values):
+    """Arrow array from a pandas Series, NumPy array, list or Arrow (chunked) array."""
+    import pyarrow as pa
+
+    if isinstance(values, pa.ChunkedArray):
+        return values.combine_chunks()
+    if isinstance(values, pa.Array):
+        return values
+    if hasattr(values, 'dtype') and hasattr(values, 'index'):
+        try:
+            return pa.Array.from_pandas(values)
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            # object column mixing types (True next to 'yes'): compare as strings
+            return pa.Array.from_pandas(values.astype(str).where(values.notna()))
+    return pa.array(values, from_pandas=True)
+
+
+def _lookup(array, table, missing):
+    """
+    Map every row through `table`, a function called once per distinct value.
+
+    Returns:
+        NumPy array of the results, with `missing` for null rows.
+    """
+    import pyarrow.compute as pc
+
+    encoded = array.dictionary_encode()
+    dictionary = encoded.dictionary.to_pylist()
+    lut = np.array([table(value) for value in dictionary] + [missing])
+    indices = pc.fill_null(encoded.indices, len(dictionary)).to_numpy(zero_copy_only=False)
+    return lut[indices]
+
+
+def _is_text(array):
+    import pyarrow as pa
+
+    return pa.types.is_string(array.type) or pa.types.is_large_string(array.type)
+
+
+def to_bool(values, default=False):
+    """Boolean NumPy array; missing and unrecognized spellings become `default`."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    array = _arrow(values)
+    if pa.types.is_boolean(array.type):
+        return pc.fill_null(array, default).to_numpy(zero_copy_only=False)
+    if pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+        numbers = array.to_numpy(zero_copy_only=False).astype(float)
+        flags = numbers != 0
+        flags[np.isnan(numbers)] = default
+        return flags
+
+    def spelling(value):
+        key = _key(value)
+        return True if key in TRUE else False if key in FALSE else default
+
+    return _lookup(array, spelling, default).astype(bool)
+
+
+def null_sentinels(values):
+    """Arrow array with sentinel spellings replaced by null (non-text columns pass through)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    array = _arrow(values)
+    if not _is_text(array):
+        return array
+    sentinel = _lookup(array, lambda value: _key(value) in SENTINELS, True)
+    return pc.if_else(pa.array(sentinel), pa.nulls(len(array), array.type), array)
+
+
+def to_float(values):
+    """float64 Arrow array; sentinels and unparseable strings become null."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    array = null_sentinels(values)
+    if not _is_text(array):
+        return pc.cast(array, pa.float64())
+    try:
+        return pc.cast(array, pa.float64())
+    except pa.ArrowInvalid:
+        pass
+
+    # stray spellings: parse each distinct string once
+    def parse(value):
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+
+    parsed = _lookup(array, parse, np.nan).astype(float)
+    return pa.array(parsed, from_pandas=True)
+
+
+def normalize(frame, text=(), flags=(), numbers=()):
+    """
+    Normalize columns of a DataFrame or Arrow table (returns the same kind).
+
+    Args:
+        text: Columns whose sentinel spellings become null.
+        flags: Columns converted to bool (missing / unknown -> False).
+        numbers: Columns parsed as float64 (sentinels / unparseable -> null).
+    """
+    import pyarrow as pa
+
+    present = set(frame.column_names if hasattr(frame, 'column_names') else frame.columns)
+    columns = {}
+    for name in (c for c in text if c in present):
+        columns[name] = null_sentinels(frame[name])
+    for name in (c for c in flags if c in present):
+        columns[name] = pa.array(to_bool(frame[name]))
+    for name in (c for c in numbers if c in present):
+        columns[name] = to_float(frame[name])
+
+    if hasattr(frame, 'column_names'):
+        for name, array in columns.items():
+            frame = frame.set_column(frame.column_names.index(name), name, array)
+        return frame
+    return frame.assign(**{name: array.to_pandas().set_axis(frame.index)
+                           for name, array in columns.items()})
+
+
+def sql_rows(frame):
+    """List of row tuples with Python values and None for missing (DataFrame or Arrow table)."""
+    names = frame.column_names if hasattr(frame, 'column_names') else frame.columns
+    return list(zip(*(_arrow(frame[name]).to_pylist() for name in names)))
+
+
+# clean/weo CSVs, shared by both loaders: normalize(df, **WEO_COLUMNS['countries'])
+WEO_COLUMNS = {
+    'countries': {'text': ['iso_code', 'name', 'region7', 'econ_group'],
+                  'flags': ['group_g7', 'group_european_union', 'group_asean5']},
+    'indicators': {'text': ['subject_code', 'description', 'notes', 'units', 'scale']},
+    'metrics': {'numbers': ['value']},
+}
@@ -0,0 +1,312 @@
+"""
+Parquet Codec Selection
+
+Chooses compression and encoding per column before writing a Parquet file:
+- every column is written on its own with each candidate: codecs (zstd,
+  gzip at several levels, snappy, lz4, none) x encodings (dictionary,
+  plain, and the type's delta / byte-stream-split encodings)
+- each candidate's size and read time (median of a few reads) is measured
+  on a sample of the rows
+- a policy weighs size against the codec's decode cost and picks one
+  candidate per column
+- the choice is stored in the file's key-value metadata, so readers can see
+  how the file was written and reruns can reuse it without benchmarking
+
+Policies weigh the log of each candidate's size and decode cost relative to
+the best for that column: 'smallest', 'balanced' (default) and 'fast-read',
+or a dict such as {'size': 1.0, 'read': 2.0}. CMU_PARQUET_POLICY sets the
+default. Decode cost comes from a fixed per-codec table rather than the
+timed reads, which vary from run to run, so the same data always gets the
+same choice; the measured read times are reported alongside.
+
+Usage:
+    choice = write_parquet(df, 'clean/titanic/titanic.parquet')
+    read_choice('clean/titanic/titanic.parquet')
+
+    python -m cmu_datasets parquet-codecs clean/titanic/titanic.parquet --policy smallest
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+CODECS = {
+    'zstd': (1, 3, 9, 19),
+    'gzip': (1, 6, 9),
+    'snappy': (None,),
+    'lz4': (None,),
+    'none': (None,),
+}
+
+POLICIES = {
+    'smallest': {'size': 1.0, 'read': 0.0},
+    'balanced': {'size': 1.0, 'read': 1.0},
+    'fast-read': {'size': 0.25, 'read': 1.0},
+}
+
+# Relative decode time per byte of output, as Arrow's codecs typically run
+DECODE_COST = {'none': 1.0, 'snappy': 1.2, 'lz4': 1.2, 'zstd': 1.6, 'gzip': 3.0, 'brotli': 3.5}
+
+METADATA_KEY = b'cmu_datasets.parquet'
+SAMPLE_ROWS = 100_000
+REPEATS = 5
+
+
+def encodings_for(dtype):
+    """Parquet encodings worth trying for an Arrow type ('DICTIONARY' = dictionary pages)."""
+    import pyarrow as pa
+
+    if pa.types.is_floating(dtype):
+        return ['DICTIONARY', 'PLAIN', 'BYTE_STREAM_SPLIT']
+    if pa.types.is_integer(dtype) or pa.types.is_date32(dtype) or pa.types.is_timestamp(dtype):
+        return ['DICTIONARY', 'PLAIN', 'DELTA_BINARY_PACKED']
+    if pa.types.is_string(dtype) or pa.types.is_large_string(dtype):
+        return ['DICTIONARY', 'PLAIN', 'DELTA_LENGTH_BYTE_ARRAY', 'DELTA_BYTE_ARRAY']
+    return ['DICTIONARY', 'PLAIN']
+
+
+def resolve_policy(policy=None):
+    """Policy name or {'size': w, 'read': w} -> weights."""
+    policy = policy or os.getenv('CMU_PARQUET_POLICY', 'balanced')
+    if isinstance(policy, dict):
+        return {'size': float(policy.get('size', 0.0)), 'read': float(policy.get('read', 0.0))}
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; use one of {', '.join(POLICIES)} or a weights dict")
+    return POLICIES[policy]
+
+
+def _to_arrow(data):
+    import pyarrow as pa
+
+    if isinstance(data, pa.Table):
+        return data
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+
+def _sample(table, rows):
+    """Up to `rows` rows as 8 evenly spaced runs (keeps the sort order's runs intact)."""
+    import pyarrow as pa
+
+    if table.num_rows <= rows:
+        return table
+    step, run = table.num_rows // 8, rows // 8
+    return pa.concat_tables([table.slice(i * step, run) for i in range(8)])
+
+
+def _write_options(column, codec, level, encoding):
+    options = {'compression': {column: codec}, 'use_dictionary': encoding == 'DICTIONARY'}
+    if level is not None:
+        options['compression_level'] = {column: level}
+    if encoding not in ('DICTIONARY', 'PLAIN'):
+        options['column_encoding'] = {column: encoding}
+    return options
+
+
+def _supports(single, encoding):
+    """Whether pyarrow can write the one-column table with this encoding."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    column = single.column_names[0]
+    try:
+        pq.write_table(single.slice(0, 1), pa.BufferOutputStream(), **_write_options(column, 'none', None, encoding))
+    except (pa.ArrowException, OSError):  # unsupported encodings surface as either
+        return False
+    return True
+
+
+def benchmark_columns(data, codecs=CODECS, sample_rows=SAMPLE_ROWS, repeats=REPEATS):
+    """
+    Size and read time of every (codec, level, encoding) candidate, column by column.
+
+    Args:
+        data: pyarrow.Table or pandas.DataFrame.
+        codecs: {codec: levels} to try (None = the codec's default level).
+        sample_rows: Rows to benchmark on (evenly spaced runs of the table).
+        repeats: Reads per candidate; the median is kept.
+
+    Returns:
+        list of dict: column, codec, level, encoding, bytes, read_ms, write_ms.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = _sample(_to_arrow(data), sample_rows)
+    results = []
+    for column in table.column_names:
+        single = table.select([column])
+        for encoding in encodings_for(single.schema.field(column).type):
+            if not _supports(single, encoding):
+                continue
+            for codec, levels in codecs.items():
+                for level in levels:
+                    sink = pa.BufferOutputStream()
+                    start = time.perf_counter()
+                    pq.write_table(single, sink, **_write_options(column, codec, level, encoding))
+                    write_ms = (time.perf_counter() - start) * 1000
+                    buffer = sink.getvalue()
+                    reads = []
+                    for _ in range(repeats):
+                        start = time.perf_counter()
+                        pq.read_table(pa.BufferReader(buffer))
+                        reads.append((time.perf_counter() - start) * 1000)
+                    results.append({'column': column, 'codec': codec, 'level': level, 'encoding': encoding,
+                                    'bytes': buffer.size, 'read_ms': statistics.median(reads),
+                                    'write_ms': write_ms})
+    return results
+
+
+def _decode_cost(codec):
+    """DECODE_COST of a codec; codecs not in the table count as the slowest."""
+    return DECODE_COST.get(codec, max(DECODE_COST.values()))
+
+
+def choose(results, policy=None):
+    """
+    Pick one candidate per column.
+
+    Score = w_size * log(bytes / smallest) + w_read * log(cost / cheapest),
+    both relative to the best candidate for that column, with cost the
+    codec's DECODE_COST. Ties go to the smaller file, then to the earlier
+    codec, level and encoding in the benchmark's order, so the choice only
+    depends on the sizes.
+
+    Returns:
+        dict: column -> {codec, level, encoding, bytes, read_ms}.
+    """
+    weights = resolve_policy(policy)
+    by_column = {}
+    for row in results:
+        by_column.setdefault(row['column'], []).append(row)
+    choice = {}
+    for column, rows in by_column.items():
+        smallest = min(r['bytes'] for r in rows)
+        cheapest = min(_decode_cost(r['codec']) for r in rows)
+
+        def score(i):
+            r = rows[i]
+            return (weights['size'] * math.log(r['bytes'] / smallest)
+                    + weights['read'] * math.log(_decode_cost(r['codec']) / cheapest), r['bytes'], i)
+
+        best = rows[min(range(len(rows)), key=score)]
+        choice[column] = {k: best[k] for k in ('codec', 'level', 'encoding', 'bytes')}
+        choice[column]['read_ms'] = round(best['read_ms'], 3)
+    return choice
+
+
+def read_choice(path):
+    """The codec choice recorded in a Parquet file's metadata (None if it has none)."""
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(path).metadata or {}
+    if METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[METADATA_KEY])
+
+
+def _reusable_choice(path, table, weights):
+    """The choice recorded in an existing file at `path`, if made for the same columns and policy."""
+    try:
+        recorded = read_choice(path)
+    except (OSError, ValueError):
+        return None
+    if not recorded or recorded.get('weights') != weights:
+        return None
+    columns = recorded.get('columns', {})
+    types = recorded.get('types', {})
+    if list(columns) != table.column_names:
+        return None
+    if any(types.get(f.name) != str(f.type) for f in table.schema):
+        return None
+    return columns
+
+
+def write_parquet(data, path, policy=None, choice=None, reuse=True, **options):
+    """
+    Write a Parquet file with per-column codecs and encodings chosen by `policy`.
+
+    Args:
+        data: pyarrow.Table or pandas.DataFrame (the index is not written).
+        path: Output file.
+        policy: Policy name or weights dict (default: $CMU_PARQUET_POLICY or 'balanced').
+        choice: A choice from choose() / read_choice()['columns'] to apply without benchmarking.
+        reuse: Reuse the choice recorded in an existing file at `path` when it
+            was made for the same columns, types and policy.
+        **options: Passed to pyarrow.parquet.write_table (e.g. row_group_size).
+
+    Returns:
+        dict: The per-column choice that was applied.
+    """
+    import pyarrow.parquet as pq
+
+    table = _to_arrow(data)
+    weights = resolve_policy(policy)
+    if choice is None and reuse and os.path.exists(path):
+        choice = _reusable_choice(path, table, weights)
+    if choice is None:
+        choice = choose(benchmark_columns(table), weights)
+
+    columns = table.column_names
+    levels = {c: choice[c]['level'] for c in columns if choice[c]['level'] is not None}
+    encodings = {c: choice[c]['encoding'] for c in columns
+                 if choice[c]['encoding'] not in ('DICTIONARY', 'PLAIN')}
+    record = {'weights': weights, 'columns': choice,
+              'types': {f.name: str(f.type) for f in table.schema}}
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps(record).encode()
+    pq.write_table(
+        table.replace_schema_metadata(metadata), path,
+        compression={c: choice[c]['codec'] for c in columns},
+        compression_level=levels or None,
+        use_dictionary=[c for c in columns if choice[c]['encoding'] == 'DICTIONARY'],
+        column_encoding=encodings or None,
+        **options,
+    )
+    return choice
+
+
+def print_choice(choice, results=None):
+    """Per-column table of the choice (and, with results, the default snappy + dictionary size)."""
+    default = {}
+    for r in results or []:
+        if r['codec'] == 'snappy' and r['encoding'] == 'DICTIONARY':
+            default[r['column']] = r['bytes']
+    width = max(len(c) for c in choice)
+    print(f"{'column':<{width}}  {'codec':<10} {'encoding':<24} {'bytes':>10} {'read ms':>8}"
+          + ("  vs snappy+dict" if default else ''))
+    for column, c in choice.items():
+        codec = c['codec'] + (f"-{c['level']}" if c['level'] is not None else '')
+        line = f"{column:<{width}}  {codec:<10} {c['encoding']:<24} {c['bytes']:>10,} {c['read_ms']:>8.2f}"
+        if column in default:
+            line += f"  {c['bytes'] / default[column]:>6.0%}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Parquet codecs / encodings per column")
+    parser.add_argument('path', help="Parquet or CSV file")
+    parser.add_argument('--policy', default=None, help=f"{', '.join(POLICIES)} (default: balanced)")
+    parser.add_argument('--output', help="write the file with the chosen settings")
+    args = parser.parse_args(argv)
+
+    import pyarrow.csv
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(args.path) if args.path.endswith('.parquet') else pyarrow.csv.read_csv(args.path)
+    start = time.perf_counter()
+    results = benchmark_columns(table)
+    choice = choose(results, args.policy)
+    print(f"{len(results)} candidates over {table.num_columns} columns in {time.perf_counter() - start:.1f}s\n")
+    print_choice(choice, results)
+    if args.output:
+        write_parquet(table, args.output, policy=args.policy, choice=choice)
+        print(f"\nWrote {args.output} ({os.path.getsize(args.output):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
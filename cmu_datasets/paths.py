@@ -0,0 +1,20 @@
+"""
+Project Paths
+
+Absolute locations of the datasets, so code works from any working directory.
+"""
+
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+WEO_DIR = REPO_ROOT / 'clean' / 'weo'
+WEO_DB = WEO_DIR / 'weo.duckdb'
+# Long-format observations (iso_code, subject_code, year, value), as loaded by clean/weo/weo*.py
+WEO_OBSERVATIONS = 'metrics'
+
+TITANIC_DIR = REPO_ROOT / 'clean' / 'titanic'
+TITANIC_PARQUET = TITANIC_DIR / 'titanic.parquet'
+
+ELECTIONS_DIR = REPO_ROOT / 'assignments' / 'elections'
+ELECTIONS_DB = ELECTIONS_DIR / 'elections.duckdb'
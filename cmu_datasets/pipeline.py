@@ -0,0 +1,214 @@
+"""
+ETL Pipelines With Stage Tracing
+
+Splits a linear ETL script into named stages and records, for each stage:
+- elapsed wall time
+- process RSS after the stage and peak RSS so far
+- optionally, the deep memory footprint of the DataFrames going in and
+  coming out (--frame-memory; it scans every object column, so it is off
+  unless asked for)
+
+Runs can be saved as a baseline (JSON) and later runs compared against it;
+stages that got slower than the tolerance are flagged.
+
+Usage:
+    pipeline = Pipeline("weo")
+
+    @pipeline.stage("read export")
+    def read_export(_):
+        return pd.read_csv(...)
+
+    if __name__ == "__main__":
+        pipeline.main()   # --baseline / --save-baseline / --tolerance / --frame-memory
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from cmu_datasets.profiling import get_tracer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss():
+    """Resident set size of this process in bytes (None if unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def frame_bytes(obj):
+    """
+    Deep memory footprint of a DataFrame / Series / array, or of those held
+    in a tuple stage output (None for other objects).
+    """
+    if isinstance(obj, tuple):
+        sizes = [size for size in map(frame_bytes, obj) if size is not None]
+        return sum(sizes) if sizes else None
+    if hasattr(obj, 'memory_usage'):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(obj, 'nbytes') and hasattr(obj, 'dtype'):
+        return int(obj.nbytes)
+    return None
+
+
+def _mb(value):
+    return f"{value / 1024 ** 2:,.1f}" if value is not None else "-"
+
+
+class Pipeline:
+    """An ordered list of named stages, each taking and returning one object."""
+
+    def __init__(self, name, frame_memory=False):
+        """
+        Args:
+            name: Pipeline name (reports, traces, baselines).
+            frame_memory: Measure the deep memory of each stage's input and
+                output (memory_usage(deep=True) scans every object column).
+        """
+        self.name = name
+        self.frame_memory = frame_memory
+        self.stages = []
+        self.results = []
+
+    def stage(self, name):
+        """Register the decorated function as the next stage."""
+        def decorator(func):
+            self.stages.append((name, func))
+            return func
+        return decorator
+
+    def run(self, data=None, verbose=True):
+        """
+        Run every stage in order, tracing each one.
+
+        Args:
+            data: Input to the first stage.
+            verbose: Print the stage report at the end.
+
+        Returns:
+            The last stage's output.
+        """
+        self.results = []
+        tracer = get_tracer()
+        measure = frame_bytes if self.frame_memory else (lambda obj: None)
+        for name, func in self.stages:
+            bytes_in = measure(data)
+            start = time.perf_counter()
+            data = func(data)
+            elapsed = (time.perf_counter() - start) * 1000
+            result = {
+                'stage': name,
+                'elapsed_ms': round(elapsed, 3),
+                'rss_bytes': current_rss(),
+                'peak_rss_bytes': peak_rss(),
+                'frame_bytes_in': bytes_in,
+                'frame_bytes_out': measure(data),
+            }
+            if hasattr(data, 'shape'):
+                result['shape'] = list(data.shape)
+            self.results.append(result)
+            if tracer is not None:
+                tracer.emit({'type': 'stage', 'pipeline': self.name, 'name': name,
+                             'wall_ms': result['elapsed_ms'], **result})
+        if verbose:
+            self.report()
+        return data
+
+    def report(self, flags=None):
+        """Print per-stage time and memory."""
+        flags = flags or {}
+        print(f"\nPipeline '{self.name}'")
+        print(f"{'Stage':<28} {'ms':>10} {'RSS MB':>9} {'Peak MB':>9} {'In MB':>8} {'Out MB':>8}")
+        print("-" * 78)
+        for r in self.results:
+            flag = f"  <-- {flags[r['stage']]}" if r['stage'] in flags else ""
+            print(f"{r['stage']:<28} {r['elapsed_ms']:>10.1f} {_mb(r['rss_bytes']):>9} "
+                  f"{_mb(r['peak_rss_bytes']):>9} {_mb(r['frame_bytes_in']):>8} "
+                  f"{_mb(r['frame_bytes_out']):>8}{flag}")
+        total = sum(r['elapsed_ms'] for r in self.results)
+        print(f"{'total':<28} {total:>10.1f}")
+
+    def save_baseline(self, path):
+        """Write the last run's results as a baseline file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'pipeline': self.name, 'stages': self.results}, f, indent=2)
+
+    def compare(self, path, tolerance=0.25, min_ms=50):
+        """
+        Compare the last run against a saved baseline.
+
+        Args:
+            path: Baseline JSON written by save_baseline().
+            tolerance: Allowed relative slowdown (0.25 = 25%).
+            min_ms: Ignore stages faster than this in both runs (timer noise).
+
+        Returns:
+            dict: stage name -> description, for every regressed stage.
+        """
+        with open(path, encoding='utf-8') as f:
+            baseline = {s['stage']: s for s in json.load(f)['stages']}
+        flags = {}
+        for r in self.results:
+            old = baseline.get(r['stage'])
+            if old is None:
+                continue
+            if max(old['elapsed_ms'], r['elapsed_ms']) < min_ms:
+                continue
+            if r['elapsed_ms'] > old['elapsed_ms'] * (1 + tolerance):
+                ratio = r['elapsed_ms'] / max(old['elapsed_ms'], 1e-9)
+                flags[r['stage']] = f"{ratio:.1f}x slower than baseline"
+            old_peak, new_peak = old.get('peak_rss_bytes'), r.get('peak_rss_bytes')
+            if old_peak and new_peak and new_peak > old_peak * (1 + tolerance):
+                flags[r['stage']] = (flags.get(r['stage'], '') + ' peak RSS up').strip()
+        return flags
+
+    def main(self, argv=None, data=None):
+        """Command-line entry point: run, then optionally compare / save a baseline."""
+        parser = argparse.ArgumentParser(description=f"Run the {self.name} pipeline")
+        parser.add_argument('--baseline', help="compare against this baseline JSON")
+        parser.add_argument('--save-baseline', help="write this run's timings here")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="allowed slowdown before a stage is flagged (default 0.25)")
+        parser.add_argument('--frame-memory', action='store_true',
+                            help="also measure each stage's DataFrame memory (slower)")
+        args = parser.parse_args(argv)
+        if args.frame_memory:
+            self.frame_memory = True
+
+        output = self.run(data, verbose=args.baseline is None)
+        if args.baseline:
+            flags = self.compare(args.baseline, args.tolerance)
+            self.report(flags)
+            if flags:
+                print(f"\n{len(flags)} stage(s) regressed against {args.baseline}")
+        if args.save_baseline:
+            self.save_baseline(args.save_baseline)
+            print(f"\nBaseline saved to {args.save_baseline}")
+        return output
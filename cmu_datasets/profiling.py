@@ -0,0 +1,419 @@
+"""
+Query Profiling
+
+Records how long every database statement and load step takes and writes
+the results as JSON lines, one trace per record:
+- DuckDB connections / cursors and psycopg2 connections are wrapped so each
+  statement logs wall time, rows returned and approximate bytes transferred
+- optionally, statements slower than a threshold get their plan attached:
+  EXPLAIN ANALYZE for plain SELECTs, EXPLAIN (not executed) for anything
+  else, such as WITH ... INSERT
+- `step()` times a named load step (e.g. "load countries")
+
+Tracing is off unless enabled, so scripts can wrap connections
+unconditionally:
+    CMU_TRACE_FILE=traces.jsonl python clean/weo/weo.py
+    CMU_TRACE_EXPLAIN=1         # attach plans (off by default: ANALYZE re-runs the statement)
+    CMU_TRACE_SLOW_MS=200       # plan threshold (default 500)
+
+Usage:
+    conn = traced(duckdb.connect('weo.duckdb'))
+    with step("load metrics"):
+        conn.execute("INSERT INTO metrics SELECT * FROM metrics_df")
+"""
+
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+SAMPLE_ROWS = 1000
+
+_EXPLAINABLE = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+_WRITES = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE|COPY|CREATE|DROP|ALTER|TRUNCATE)\b', re.IGNORECASE)
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+
+
+def explain_prefix(sql):
+    """
+    'EXPLAIN ANALYZE' for a read-only query, 'EXPLAIN' for a statement that
+    writes (a WITH ... INSERT would run twice under ANALYZE), None for the rest.
+    """
+    sql = _COMMENTS.sub(' ', sql)
+    if not _EXPLAINABLE.match(sql):
+        return None
+    return 'EXPLAIN' if _WRITES.search(sql) else 'EXPLAIN ANALYZE'
+
+
+class Tracer:
+    """Collects trace records and appends them to a JSON-lines file."""
+
+    def __init__(self, path=None, slow_ms=500, explain=False, script=None):
+        """
+        Args:
+            path: JSON-lines file to append to (None keeps records in memory only).
+            slow_ms: Statements at least this slow get a plan (when `explain` is on).
+            explain: Capture plans for slow statements; EXPLAIN ANALYZE runs a
+                slow query a second time, so this is off unless asked for.
+            script: Name recorded on every trace (defaults to the running script).
+        """
+        self.path = path
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.script = script or os.path.basename(sys.argv[0] or 'interactive')
+        self.records = []
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        record = {'ts': round(time.time(), 3), 'script': self.script, **record}
+        with self._lock:
+            self.records.append(record)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, default=str) + '\n')
+
+    def summary(self, top=10):
+        """Print the slowest statements and steps recorded so far."""
+        slowest = sorted(self.records, key=lambda r: r.get('wall_ms', 0), reverse=True)[:top]
+        print(f"{'Type':<6} {'ms':>10} {'Rows':>10}  Statement / step")
+        print("-" * 70)
+        for r in slowest:
+            label = r.get('name') or ' '.join(r.get('sql', '').split())[:45]
+            rows = r.get('rows')
+            print(f"{r['type']:<6} {r.get('wall_ms', 0):>10.1f} {rows if rows is not None else '':>10}  {label}")
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """The process-wide tracer, or None when tracing is disabled."""
+    global _tracer
+    if _tracer is None and os.getenv('CMU_TRACE_FILE'):
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(os.getenv('CMU_TRACE_FILE'),
+                                 slow_ms=float(os.getenv('CMU_TRACE_SLOW_MS', 500)),
+                                 explain=os.getenv('CMU_TRACE_EXPLAIN') == '1')
+    return _tracer
+
+
+def enable(path=None, slow_ms=500, explain=False):
+    """Turn tracing on from code (e.g. in a notebook); returns the tracer."""
+    global _tracer
+    with _tracer_lock:
+        _tracer = Tracer(path, slow_ms=slow_ms, explain=explain)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    with _tracer_lock:
+        _tracer = None
+
+
+@contextmanager
+def step(name, **details):
+    """Time a named load step."""
+    tracer = get_tracer()
+    if tracer is None:
+        yield
+        return
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = repr(e)
+        raise
+    finally:
+        record = {'type': 'step', 'name': name,
+                  'wall_ms': round((time.perf_counter() - start) * 1000, 3), **details}
+        if error:
+            record['error'] = error
+        tracer.emit(record)
+
+
+def estimate_bytes(rows):
+    """Approximate payload size of fetched rows (tuples), sampling large results."""
+    if not rows:
+        return 0
+    sample = rows[:SAMPLE_ROWS]
+    size = 0
+    for row in sample:
+        for value in (row if isinstance(row, (tuple, list)) else (row,)):
+            if isinstance(value, (str, bytes)):
+                size += len(value)
+            elif value is not None:
+                size += 8
+    return int(size * len(rows) / len(sample))
+
+
+def _frame_bytes(df):
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def _ms(start):
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+# ============================================================================
+# DUCKDB
+# ============================================================================
+
+def _register_frames(conn, sql, frame):
+    """Register DataFrames / Arrow tables named in `sql` from the caller's scope."""
+    registered = []
+    for name in set(re.findall(r'[A-Za-z_][A-Za-z0-9_]*', sql)):
+        obj = frame.f_locals.get(name, frame.f_globals.get(name))
+        if obj is None or type(obj).__module__.split('.')[0] not in ('pandas', 'pyarrow', 'polars'):
+            continue
+        conn.register(name, obj)
+        registered.append(name)
+    return registered
+
+
+class TracedDuckDB:
+    """DuckDB connection / cursor wrapper that traces every execute()."""
+
+    _FETCHES = {
+        'fetchone': lambda r: 0 if r is None else 1,
+        'fetchall': len,
+        'fetchmany': len,
+        'fetchdf': len,
+        'df': len,
+        'fetch_df': len,
+        'fetchnumpy': lambda r: len(next(iter(r.values()))) if r else 0,
+        'arrow': lambda r: r.num_rows,
+        'fetch_arrow_table': lambda r: r.num_rows,
+        'to_arrow_table': lambda r: r.num_rows,
+    }
+
+    def __init__(self, conn, tracer):
+        self._conn = conn
+        self._tracer = tracer
+        self._pending = None
+
+    def __getattr__(self, name):
+        attr = getattr(self._conn, name)
+        if name in self._FETCHES and self._pending is not None:
+            return self._traced_fetch(name, attr)
+        return attr
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def cursor(self):
+        return TracedDuckDB(self._conn.cursor(), self._tracer)
+
+    def execute(self, sql, params=None):
+        self._flush()
+        start = time.perf_counter()
+        try:
+            self._run(sql, params)
+        except Exception as exc:
+            # DuckDB resolves DataFrames by name in the *calling* frame, which is
+            # now this wrapper; register the caller's frames and retry
+            import duckdb
+
+            if not isinstance(exc, duckdb.CatalogException):
+                raise
+            registered = _register_frames(self._conn, sql, sys._getframe(1))
+            if not registered:
+                raise
+            try:
+                self._run(sql, params)
+            finally:
+                for name in registered:
+                    self._conn.unregister(name)
+        self._pending = {'type': 'query', 'backend': 'duckdb', 'sql': sql,
+                         'exec_ms': _ms(start), 'wall_ms': _ms(start), 'rows': None, 'bytes': None,
+                         '_params': params}
+        return self
+
+    def _run(self, sql, params):
+        if params is None:
+            self._conn.execute(sql)
+        else:
+            self._conn.execute(sql, params)
+
+    def _traced_fetch(self, name, method):
+        def fetch(*args, **kwargs):
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            record = self._pending
+            if record is not None:
+                record['fetch_ms'] = _ms(start)
+                record['wall_ms'] = round(record['exec_ms'] + record['fetch_ms'], 3)
+                record['rows'] = self._FETCHES[name](result)
+                if hasattr(result, 'memory_usage'):
+                    record['bytes'] = _frame_bytes(result)
+                elif hasattr(result, 'nbytes'):
+                    record['bytes'] = int(result.nbytes)
+                elif isinstance(result, list):
+                    record['bytes'] = estimate_bytes(result)
+                elif isinstance(result, tuple):
+                    record['bytes'] = estimate_bytes([result])
+                self._flush()
+            return result
+        return fetch
+
+    def _flush(self):
+        record, self._pending = self._pending, None
+        if record is None:
+            return
+        params = record.pop('_params')
+        tracer = self._tracer
+        prefix = explain_prefix(record['sql']) if tracer.explain and record['wall_ms'] >= tracer.slow_ms else None
+        if prefix:
+            try:
+                # a cursor of its own: its own transaction, so a failing plan
+                # cannot abort the caller's
+                explain = self._conn.cursor()
+                sql = f"{prefix} " + record['sql']
+                rows = (explain.execute(sql) if params is None else explain.execute(sql, params)).fetchall()
+                record['plan'] = '\n'.join(str(r[-1]) for r in rows)
+                explain.close()
+            except Exception as e:
+                record['plan_error'] = repr(e)
+        tracer.emit(record)
+
+    def close(self):
+        self._flush()
+        self._conn.close()
+
+
+# ============================================================================
+# POSTGRES (psycopg2)
+# ============================================================================
+
+_cursor_classes = {}
+
+
+def _postgres_cursor_class(tracer):
+    """A psycopg2 cursor class bound to `tracer`."""
+    if id(tracer) in _cursor_classes:
+        return _cursor_classes[id(tracer)]
+
+    import psycopg2.extensions
+
+    class TracedCursor(psycopg2.extensions.cursor):
+        _tracer = tracer
+        _pending = None
+
+        def execute(self, sql, vars=None):
+            self._flush()
+            start = time.perf_counter()
+            result = super().execute(sql, vars)
+            query = sql if isinstance(sql, str) else str(sql)
+            self._pending = {'type': 'query', 'backend': 'postgres', 'sql': query,
+                             'exec_ms': _ms(start), 'wall_ms': _ms(start),
+                             'rows': self.rowcount if self.rowcount >= 0 else None,
+                             'bytes': 0 if self.description else None, '_vars': vars}
+            if self.description is None:
+                self._flush()
+            return result
+
+        def _fetched(self, rows, start):
+            record = self._pending
+            if record is not None:
+                record['fetch_ms'] = round(record.get('fetch_ms', 0) + _ms(start), 3)
+                record['wall_ms'] = round(record['exec_ms'] + record['fetch_ms'], 3)
+                record['bytes'] += estimate_bytes(rows)
+            return rows
+
+        def fetchone(self):
+            start = time.perf_counter()
+            row = super().fetchone()
+            self._fetched([row] if row is not None else [], start)
+            return row
+
+        def fetchmany(self, size=None):
+            start = time.perf_counter()
+            rows = super().fetchmany(size) if size is not None else super().fetchmany()
+            return self._fetched(rows, start)
+
+        def fetchall(self):
+            start = time.perf_counter()
+            rows = self._fetched(super().fetchall(), start)
+            self._flush()
+            return rows
+
+        def _flush(self):
+            record, self._pending = self._pending, None
+            if record is None:
+                return
+            vars = record.pop('_vars')
+            prefix = None
+            if self._tracer.explain and record['wall_ms'] >= self._tracer.slow_ms:
+                prefix = explain_prefix(record['sql'])
+            if prefix:
+                self._explain(record, prefix, vars)
+            self._tracer.emit(record)
+
+        def _explain(self, record, prefix, vars):
+            """Attach the plan, inside a savepoint so a failure leaves the caller's transaction usable."""
+            conn = self.connection
+            status = conn.get_transaction_status()
+            if status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                return
+            # inside the caller's transaction: a savepoint; none open: our own, rolled back
+            savepoint = not conn.autocommit and status != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            own = not conn.autocommit and not savepoint
+            options = '(ANALYZE, FORMAT JSON)' if prefix == 'EXPLAIN ANALYZE' else '(FORMAT JSON)'
+            with psycopg2.extensions.cursor(conn) as explain:
+                if savepoint:
+                    explain.execute("SAVEPOINT cmu_trace_explain")
+                try:
+                    explain.execute(f"EXPLAIN {options} " + record['sql'], vars)
+                    record['plan'] = explain.fetchone()[0]
+                except Exception as e:
+                    record['plan_error'] = repr(e)
+                    if savepoint:
+                        explain.execute("ROLLBACK TO SAVEPOINT cmu_trace_explain")
+                if savepoint:
+                    explain.execute("RELEASE SAVEPOINT cmu_trace_explain")
+            if own:
+                conn.rollback()
+
+        def close(self):
+            self._flush()
+            super().close()
+
+    _cursor_classes[id(tracer)] = TracedCursor
+    return TracedCursor
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def traced(conn, tracer=None):
+    """
+    Wrap a DuckDB or psycopg2 connection so its statements are traced.
+
+    Returns the connection unchanged when tracing is disabled.
+    """
+    tracer = tracer or get_tracer()
+    if tracer is None:
+        return conn
+    module = type(conn).__module__
+    if module.startswith('psycopg2'):
+        conn.cursor_factory = _postgres_cursor_class(tracer)
+        return conn
+    return TracedDuckDB(conn, tracer)
+
+
+@atexit.register
+def _print_summary():
+    tracer = _tracer
+    if tracer is not None and tracer.records and os.getenv('CMU_TRACE_SUMMARY'):
+        tracer.summary()
@@ -0,0 +1,431 @@
+"""
+Compact Record Containers
+
+Struct-of-arrays tables for the project's entities, for services that keep
+a whole catalog in memory:
+- each field is one typed column: NumPy numbers / bools / dates, dictionary
+  codes for repeated labels, and one Arrow buffer for free text
+- rows are `__slots__` views (table + position) over those columns, so a
+  row holds no data of its own
+- scan() iterates with a single reused view: no per-row allocation
+
+Tables: Passengers, Countries, Indicators, Observations, Candidates,
+Elections; rows: Passenger, Country, Indicator, Observation, Candidate,
+Election. record_type() defines one for any other query result.
+
+Usage:
+    from cmu_datasets.paths import TITANIC_PARQUET
+    from cmu_datasets.records import Passengers
+
+    passengers = Passengers.from_frame(pd.read_parquet(TITANIC_PARQUET))
+    for p in passengers.scan():
+        if p.survived and p.age < 10:
+            ...
+    adults = passengers.take(passengers.column('age') >= 18)
+
+Records pay for NumPy and pyarrow imports, so they are for results that
+are large or already in Arrow (duck_etl.py's joins). Short jobs that print
+a handful of rows, such as the elections-check winners, iterate the
+fetchall() tuples instead.
+"""
+
+import numpy as np
+
+# field kinds -> NumPy dtype (None: stored specially)
+KINDS = {
+    'bool': 'bool',
+    'int8': 'int8',
+    'int16': 'int16',
+    'int32': 'int32',
+    'int64': 'int64',
+    'float32': 'float32',
+    'float64': 'float64',
+    'date': 'datetime64[D]',
+    'category': None,  # dictionary codes + labels
+    'str': None,  # Arrow string array
+}
+
+
+def _code_dtype(n_categories):
+    for dtype in ('int8', 'int16', 'int32'):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return 'int64'
+
+
+class _Column:
+    """One field's storage; `get(i)` returns a Python value (None if missing)."""
+
+    __slots__ = ('kind', 'values', 'mask', 'categories', 'get')
+
+    def __init__(self, kind, values, mask=None, categories=None):
+        self.kind = kind
+        self.values = values
+        self.mask = mask if mask is not None and mask.any() else None
+        self.categories = categories
+        self.get = self._getter()
+
+    @classmethod
+    def from_series(cls, kind, series):
+        import pandas as pd
+
+        _check_kind(kind)
+        if kind == 'category':
+            categorical = pd.Categorical(series)
+            categories = np.asarray(categorical.categories, dtype=object)
+            return cls(kind, categorical.codes.astype(_code_dtype(len(categories))), categories=categories)
+        if kind == 'str':
+            return cls(kind, _arrow_strings(series))
+        missing = series.isna().to_numpy()
+        if kind == 'date':
+            text = series.astype(object).where(~missing, 'NaT').to_numpy()
+            return cls(kind, text.astype('datetime64[D]'))
+        if kind.startswith('float'):
+            return cls(kind, series.to_numpy(dtype=KINDS[kind], na_value=np.nan))
+        filled = series.where(~missing, 0) if missing.any() else series
+        return cls(kind, filled.to_numpy().astype(KINDS[kind]), mask=missing)
+
+    @classmethod
+    def from_arrow(cls, kind, array):
+        """Build from an Arrow array without going through pandas."""
+        import pyarrow as pa
+
+        _check_kind(kind)
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        if kind == 'str':
+            return cls(kind, array.cast(pa.string()))
+        if kind == 'category':
+            encoded = array.cast(pa.string()).dictionary_encode()
+            categories = np.asarray(encoded.dictionary.to_pylist(), dtype=object)
+            codes = _arrow_numpy(encoded.indices, _code_dtype(len(categories)), fill=-1)
+            return cls(kind, codes, categories=categories)
+        missing = _null_mask(array)
+        if kind == 'date':
+            days = _arrow_numpy(array.cast(pa.date32()).cast(pa.int32()), 'int32')
+            values = days.astype('datetime64[D]')
+            values[missing] = np.datetime64('NaT')
+            return cls(kind, values)
+        if kind.startswith('float'):
+            return cls(kind, _arrow_numpy(array, KINDS[kind], fill=np.nan))
+        return cls(kind, _arrow_numpy(array, KINDS[kind]), mask=missing)
+
+    def _getter(self):
+        """A function i -> Python value (None if missing), specialized to the kind."""
+        values, mask, categories = self.values, self.mask, self.categories
+        if self.kind == 'category':
+            labels = list(categories) + [None]  # code -1 -> None
+            return lambda i: labels[values[i]]
+        if self.kind == 'str':
+            return lambda i: values[int(i)].as_py()
+        if self.kind == 'date':
+            return lambda i: None if np.isnat(values[i]) else values[i].item()
+        if mask is not None:
+            return lambda i: None if mask[i] else values[i].item()
+        return lambda i: values[i].item()
+
+    def take(self, indices):
+        if self.kind == 'str':
+            import pyarrow as pa
+            return _Column(self.kind, self.values.take(pa.array(indices)))
+        mask = self.mask[indices] if self.mask is not None else None
+        return _Column(self.kind, self.values[indices], mask, self.categories)
+
+    def vector(self):
+        if self.kind == 'category':
+            import pandas as pd
+
+            return pd.Categorical.from_codes(self.values, self.categories)
+        if self.kind == 'str':
+            return self.values
+        if self.mask is not None:
+            return np.ma.masked_array(self.values, self.mask)
+        return self.values
+
+    def series(self):
+        import pandas as pd
+
+        if self.kind == 'category':
+            return pd.Series(self.vector())
+        if self.kind == 'str':
+            return self.values.to_pandas()
+        if self.mask is not None:
+            dtype = 'boolean' if self.kind == 'bool' else self.kind.capitalize()
+            return pd.Series(pd.array(self.values, dtype=dtype)).mask(self.mask)
+        return pd.Series(self.values)
+
+    @property
+    def nbytes(self):
+        size = self.values.nbytes + (self.mask.nbytes if self.mask is not None else 0)
+        if self.categories is not None:
+            size += sum(len(str(c)) + 49 for c in self.categories)
+        return size
+
+
+def _null_mask(array):
+    """True where an Arrow array is null, read from its validity bitmap."""
+    validity = array.buffers()[0]
+    if validity is None or array.null_count == 0:
+        return np.zeros(len(array), dtype=bool)
+    bits = np.unpackbits(np.frombuffer(validity, dtype='uint8'), bitorder='little')
+    return bits[array.offset:array.offset + len(array)] == 0
+
+
+def _arrow_numpy(array, dtype, fill=0):
+    """
+    Copy an Arrow array to NumPy through its data buffer, nulls set to `fill`.
+
+    Array.to_numpy() and fill_null() import pandas; this keeps query-backed
+    tables usable in short jobs that never touch pandas.
+    """
+    import pyarrow as pa
+
+    storage = 'uint8' if dtype == 'bool' else dtype
+    if pa.types.is_boolean(array.type):
+        array = array.cast(pa.uint8())
+    array = array.cast(pa.from_numpy_dtype(np.dtype(storage)))
+    data = np.frombuffer(array.buffers()[1], dtype=storage)[array.offset:array.offset + len(array)].copy()
+    if array.null_count:
+        data[_null_mask(array)] = fill
+    return data.astype(dtype, copy=False)
+
+
+def _check_kind(kind):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown field kind {kind!r}; use one of {', '.join(KINDS)}")
+
+
+def _arrow_strings(series):
+    import pyarrow as pa
+
+    try:
+        array = pa.array(series, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = pa.array(series.astype(str).where(series.notna(), None), type=pa.string(), from_pandas=True)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    return array
+
+
+def _row_class(name, fields):
+    """A __slots__ view class with one read-only property per field."""
+    def make_getter(field):
+        return property(lambda self: self._records._getters[field](self._index))
+
+    namespace = {field: make_getter(field) for field in fields}
+    namespace['__slots__'] = ()
+    return type(name, (RowView,), namespace)
+
+
+class RowView:
+    """A row of a Records table: the table and a position, nothing else."""
+
+    __slots__ = ('_records', '_index')
+
+    def __init__(self, records, index):
+        self._records = records
+        self._index = index
+
+    def as_tuple(self):
+        getters = self._records._getters
+        return tuple(getters[f](self._index) for f in self._records.fields)
+
+    def as_dict(self):
+        return dict(zip(self._records.fields, self.as_tuple()))
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __eq__(self, other):
+        return isinstance(other, RowView) and self.as_tuple() == other.as_tuple()
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"{type(self).__name__}({values})"
+
+
+class Records:
+    """A struct-of-arrays table; subclasses set `fields` ({name: kind}) and `row_name`."""
+
+    fields = {}
+    row_name = 'Record'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.Row = _row_class(cls.row_name, tuple(cls.fields))
+
+    def __init__(self, columns, length):
+        self._columns = columns
+        self._getters = {f: c.get for f, c in columns.items()}
+        self._length = length
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a DataFrame holding (at least) every field."""
+        missing = [f for f in cls.fields if f not in df.columns]
+        if missing:
+            raise ValueError(f"{cls.__name__} needs columns {missing}")
+        return cls({f: _Column.from_series(kind, df[f]) for f, kind in cls.fields.items()}, len(df))
+
+    @classmethod
+    def from_arrow(cls, table):
+        """Build from an Arrow table; text fields keep their Arrow buffers."""
+        missing = [f for f in cls.fields if f not in table.column_names]
+        if missing:
+            raise ValueError(f"{cls.__name__} needs columns {missing}")
+        return cls({f: _Column.from_arrow(kind, table.column(f)) for f, kind in cls.fields.items()}, table.num_rows)
+
+    @classmethod
+    def from_query(cls, result):
+        """Build from an executed DuckDB query (cursor or relation)."""
+        for name in ('to_arrow_table', 'fetch_arrow_table', 'arrow'):
+            fetch = getattr(result, name, None)
+            if fetch is not None:
+                break
+        table = fetch()
+        if not hasattr(table, 'num_rows'):  # RecordBatchReader on newer DuckDB
+            table = table.read_all()
+        return cls.from_arrow(table)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(np.arange(self._length)[index])
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"{type(self).__name__} index {index} out of range")
+        return self.Row(self, index)
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self.Row(self, i)
+
+    def scan(self):
+        """Iterate with one reused row view (don't keep the rows it yields)."""
+        view = self.Row(self, 0)
+        for i in range(self._length):
+            view._index = i
+            yield view
+
+    def column(self, name):
+        """A field as one vector: NumPy array, pandas Categorical or Arrow array."""
+        return self._columns[name].vector()
+
+    def take(self, selection):
+        """Rows at integer positions or where a boolean mask is True."""
+        selection = np.asarray(selection)
+        indices = np.flatnonzero(selection) if selection.dtype == bool else selection
+        return type(self)({f: c.take(indices) for f, c in self._columns.items()}, len(indices))
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({f: c.series() for f, c in self._columns.items()})
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the columns."""
+        return sum(c.nbytes for c in self._columns.values())
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self._length:,} rows, {self.nbytes / 1024:,.1f} KiB>"
+
+
+def record_type(row_name, fields, table_name=None):
+    """Define a Records table class for an ad-hoc query result."""
+    return type(table_name or f"{row_name}s", (Records,), {'fields': dict(fields), 'row_name': row_name})
+
+
+# ============================================================================
+# PROJECT ENTITIES
+# ============================================================================
+
+class Passengers(Records):
+    """clean/titanic/titanic.csv"""
+    row_name = 'Passenger'
+    fields = {
+        'passenger_id': 'str',
+        'survived': 'bool',
+        'sex': 'category',
+        'age': 'float64',
+        'sibsp': 'int8',
+        'parch': 'int8',
+        'fare': 'float64',
+        'class': 'category',
+        'embark_town': 'category',
+    }
+
+
+class Countries(Records):
+    """clean/weo/countries.csv"""
+    row_name = 'Country'
+    fields = {
+        'country_id': 'int16',
+        'iso_code': 'str',
+        'name': 'str',
+        'region7': 'category',
+        'econ_group': 'category',
+        'group_g7': 'bool',
+        'group_european_union': 'bool',
+        'group_asean5': 'bool',
+    }
+
+
+class Indicators(Records):
+    """clean/weo/indicators.csv (indicator definitions)"""
+    row_name = 'Indicator'
+    fields = {
+        'indicator_id': 'int16',
+        'subject_code': 'str',
+        'description': 'str',
+        'notes': 'str',
+        'units': 'category',
+        'scale': 'category',
+    }
+
+
+class Observations(Records):
+    """WEO observations (the long metrics table)"""
+    row_name = 'Observation'
+    fields = {
+        'iso_code': 'category',
+        'subject_code': 'category',
+        'year': 'int16',
+        'value': 'float64',
+    }
+
+
+class Candidates(Records):
+    """assignments/elections/candidates.csv"""
+    row_name = 'Candidate'
+    fields = {
+        'candidate_id': 'str',
+        'name': 'str',
+        'date_of_birth': 'date',
+        'date_of_death': 'date',
+        'birth_city': 'str',
+        'birth_state': 'category',
+    }
+
+
+class Elections(Records):
+    """assignments/elections/elections.csv"""
+    row_name = 'Election'
+    fields = {
+        'election_id': 'str',
+        'election_year': 'int16',
+        'us_population_estimate': 'int64',
+    }
+
+
+Passenger = Passengers.Row
+Country = Countries.Row
+Indicator = Indicators.Row
+Observation = Observations.Row
+Candidate = Candidates.Row
+Election = Elections.Row
@@ -0,0 +1,124 @@
+"""
+Wide-to-Long Reshape
+
+Melts wide tables whose column names follow a `<level><sep><category>`
+grammar (e.g. `primary_boys`, `secondary_girls`) and splits the names in
+the same step:
+- the header is parsed once, not once per output row
+- `level`, `category` and `variable` come out as categoricals built from
+  integer codes, so no per-row Python strings are created
+- values are taken from the wide block in one ravel instead of melt + split
+- CSV input can be streamed in chunks for large tables
+
+Usage:
+    df_long = melt_split(df, id_vars='state_ut')
+    df_long = melt_csv('schools.csv', id_vars='state_ut', chunksize=100_000)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def parse_columns(columns, id_vars, sep='_', names=('level', 'category')):
+    """
+    Parse the value-column names into categorical code arrays.
+
+    Args:
+        columns: All column names of the wide table.
+        id_vars: Identifier columns kept as-is.
+        sep: Separator between the name parts (split at the last ones, so
+            `upper_primary_boys` is ('upper_primary', 'boys')).
+        names: Names for the parts.
+
+    Returns:
+        dict: 'value_cols', plus (codes, categories) for 'variable' and each name.
+
+    Raises:
+        ValueError: If a value column does not contain `sep`.
+    """
+    id_vars = [id_vars] if isinstance(id_vars, str) else list(id_vars)
+    value_cols = [c for c in columns if c not in id_vars]
+    parts = [str(c).rsplit(sep, len(names) - 1) for c in value_cols]
+    bad = [c for c, p in zip(value_cols, parts) if len(p) != len(names)]
+    if bad:
+        raise ValueError(f"Columns do not match the '<{sep.join(names)}>' pattern: {bad}")
+
+    grammar = {'value_cols': value_cols, 'id_vars': id_vars, 'names': tuple(names)}
+    grammar['variable'] = (np.arange(len(value_cols)), pd.Index(value_cols))
+    for i, name in enumerate(names):
+        codes, categories = pd.factorize(pd.Index([p[i] for p in parts]))
+        grammar[name] = (codes, categories)
+    return grammar
+
+
+def _melt_block(df, grammar, value_name):
+    n = len(df)
+    value_cols = grammar['value_cols']
+    out = {}
+    for col in grammar['id_vars']:
+        out[col] = np.tile(df[col].to_numpy(), len(value_cols))
+    codes, categories = grammar['variable']
+    out['variable'] = pd.Categorical.from_codes(np.repeat(codes, n), categories=categories)
+    # Column-major ravel gives pd.melt's order: every row of column 1, then column 2, ...
+    out[value_name] = df[value_cols].to_numpy().ravel(order='F')
+    for name in grammar['names']:
+        codes, categories = grammar[name]
+        out[name] = pd.Categorical.from_codes(np.repeat(codes, n), categories=categories)
+    return pd.DataFrame(out)
+
+
+def melt_split(df, id_vars, sep='_', names=('level', 'category'), value_name='value'):
+    """
+    Melt a wide DataFrame and split its column names into categoricals.
+
+    Equivalent to `pd.melt(df, id_vars)` followed by
+    `variable.str.rsplit(sep, n=len(names) - 1, expand=True)`, without the
+    intermediate object frame.
+
+    Args:
+        df: Wide DataFrame.
+        id_vars: Identifier column(s).
+        sep: Separator between the name parts.
+        names: Names for the parts.
+        value_name: Name of the value column.
+
+    Returns:
+        pandas.DataFrame: id_vars, variable, value, and one column per name.
+    """
+    grammar = parse_columns(df.columns, id_vars, sep, names)
+    return _melt_block(df, grammar, value_name)
+
+
+def melt_csv(source, id_vars, sep='_', names=('level', 'category'), value_name='value',
+             chunksize=100_000, rename=None, **read_csv_options):
+    """
+    Stream a wide CSV and melt it chunk by chunk.
+
+    Args:
+        source: CSV path, URL or buffer.
+        id_vars: Identifier column(s) (after `rename`).
+        sep: Separator between the name parts.
+        names: Names for the parts.
+        value_name: Name of the value column.
+        chunksize: Rows read per chunk.
+        rename: Optional function applied to the header names (e.g. cleanup).
+        **read_csv_options: Passed to pandas.read_csv.
+
+    Returns:
+        pandas.DataFrame: Long table with categorical name parts. Rows are
+        grouped by chunk, so the order differs from one pd.melt over the file.
+    """
+    grammar = None
+    pieces = []
+    for chunk in pd.read_csv(source, chunksize=chunksize, **read_csv_options):
+        if rename is not None:
+            chunk.columns = [rename(c) for c in chunk.columns]
+        if grammar is None:
+            grammar = parse_columns(chunk.columns, id_vars, sep, names)
+        pieces.append(_melt_block(chunk, grammar, value_name))
+    if not pieces:
+        raise ValueError("CSV has no data rows")
+    if len(pieces) == 1:
+        return pieces[0]
+    # Chunks share categories, so concatenation keeps the categoricals
+    return pd.concat(pieces, ignore_index=True)
@@ -0,0 +1,257 @@
+"""
+Cross-Indicator Screening
+
+Puts any number of WEO indicators side by side, one row per country:
+- load():        one query for all the indicators, aligned in NumPy into a
+                 (countries, indicators) matrix; no self-join per indicator
+- correlation(): Pearson / Spearman correlation matrix of the indicators,
+                 each pair over the countries that have both values
+- screen():      multi-criteria filter ({'NGDPDPC': ('>', 30000), 'LUR': ('<', 5)})
+- to_frame():    the matrix (or the screened rows) as a DataFrame
+
+The year spec is an int (the same year for every indicator), 'latest' (each
+indicator's latest year with data) or a dict {subject_code: int | 'latest'}.
+
+Correlations use pairwise-complete sums computed as matrix products over the
+0-filled values and the presence mask, so a correlation matrix over dozens
+of indicators is a handful of (indicators x countries) @ (countries x
+indicators) products. Spearman ranks each pair within the countries it
+shares, from one sort per indicator. Screens compare the whole matrix
+against one threshold vector per operator.
+
+Usage:
+    matrix = load(conn, ['NGDPDPC', 'LUR', 'PCPIPCH', 'GGXWDG_NGDP'], year=2024)
+    correlation(matrix)
+    to_frame(matrix, rows=screen(matrix, {'NGDPDPC': ('>', 30000), 'LUR': ('<', 5)}))
+"""
+
+import operator
+from collections import namedtuple
+
+import numpy as np
+
+from cmu_datasets.paths import WEO_OBSERVATIONS
+
+# values: (countries, subjects) float64, NaN where missing; years: the year used per subject
+Matrix = namedtuple('Matrix', ['values', 'countries', 'subjects', 'years'])
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+
+def _year_targets(subjects, year):
+    """{subject: int | 'latest'} from a year spec."""
+    if isinstance(year, dict):
+        return {s: year.get(s, 'latest') for s in subjects}
+    return {s: year for s in subjects}
+
+
+def query(subjects, year='latest', table=WEO_OBSERVATIONS, placeholder='?'):
+    """
+    One statement fetching every requested indicator (long format).
+
+    Years are filtered in SQL when every indicator has a fixed year;
+    'latest' is resolved in align().
+
+    Returns:
+        tuple: (sql, params)
+    """
+    targets = _year_targets(subjects, year)
+    marks = ', '.join(placeholder for _ in subjects)
+    sql = f"""
+        SELECT iso_code, subject_code, year, value
+        FROM {table}
+        WHERE subject_code IN ({marks}) AND value IS NOT NULL"""
+    params = list(subjects)
+    years = set(targets.values())
+    if 'latest' not in years:
+        sql += f" AND year IN ({', '.join(placeholder for _ in years)})"
+        params += sorted(years)
+    return sql, params
+
+
+def align(df, subjects, year='latest'):
+    """
+    Scatter long rows (iso_code, subject_code, year, value) into a Matrix in one pass.
+
+    Rows of other years (or subjects) are skipped; each subject's 'latest'
+    year is the last year it has any value.
+    """
+    import pandas as pd
+
+    subjects = list(subjects)
+    targets = _year_targets(subjects, year)
+    # column of each row's subject, -1 for subjects not asked for
+    column = pd.Index(subjects).get_indexer(np.asarray(df['subject_code'], dtype=object))
+    years = np.asarray(df['year'], dtype=np.int64)
+    known = column >= 0
+
+    target = np.full(len(subjects), -1, dtype=np.int64)
+    for j, s in enumerate(subjects):
+        if targets[s] != 'latest':
+            target[j] = targets[s]
+    latest = np.full(len(subjects), -1, dtype=np.int64)
+    np.maximum.at(latest, column[known], years[known])
+    target = np.where(target >= 0, target, latest)
+
+    keep = known & (years == target[np.where(known, column, 0)])
+    countries, row = np.unique(np.asarray(df['iso_code'], dtype=object)[keep].astype(str), return_inverse=True)
+    values = np.full((len(countries), len(subjects)), np.nan)
+    cell = row.ravel() * len(subjects) + column[keep]
+    if len(cell) and np.bincount(cell).max() > 1:
+        raise ValueError("More than one value per country, indicator and year")
+    values.ravel()[cell] = np.asarray(df['value'], dtype=np.float64)[keep]
+    return Matrix(values, countries, subjects, [int(y) if y >= 0 else None for y in target])
+
+
+def load(conn, subjects, year='latest', table=WEO_OBSERVATIONS):
+    """
+    Fetch and align indicators from a DuckDB or psycopg2 connection.
+
+    Returns:
+        Matrix
+    """
+    if type(conn).__module__.startswith('psycopg2'):
+        import pandas as pd
+
+        sql, params = query(subjects, year, table, placeholder='%s')
+        df = pd.read_sql(sql, conn, params=params)
+    else:
+        sql, params = query(subjects, year, table, placeholder='?')
+        df = conn.execute(sql, params).df()
+    return align(df, subjects, year)
+
+
+def _pairwise_ranks(values, present):
+    """
+    Average ranks of every column within every pair's common rows.
+
+    Returns:
+        numpy.ndarray: (subjects, subjects, countries); [i, j] holds column
+        i ranked over the rows where i and j are both present (0 elsewhere).
+
+    Each column is sorted once; the rank of a tie group among the rows
+    shared with column j is the count of shared rows in the groups before
+    it plus the middle of its own, for every j at once.
+    """
+    n_rows, n_cols = values.shape
+    ranks = np.zeros((n_cols, n_cols, n_rows))
+    shared = present.astype(np.float64)
+    for i in range(n_cols):
+        rows = np.flatnonzero(present[:, i])
+        if not len(rows):
+            continue
+        order = rows[np.argsort(values[rows, i], kind='stable')]
+        ordered = values[order, i]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        in_group = np.add.reduceat(shared[order], starts, axis=0)          # (groups, subjects)
+        group_rank = np.cumsum(in_group, axis=0) - in_group + (in_group + 1) / 2
+        group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(order)]))
+        ranks[i][:, order] = (group_rank[group] * shared[order]).T
+    return ranks
+
+
+def correlation(matrix, method='pearson', min_periods=3):
+    """
+    Correlation of every pair of indicators over the countries having both.
+
+    Args:
+        method: 'pearson', or 'spearman' (Pearson of the ranks within the
+            countries the pair shares, as DataFrame.corr does).
+        min_periods: Fewer common countries than this gives NaN.
+
+    Returns:
+        pandas.DataFrame: subjects x subjects.
+    """
+    import pandas as pd
+
+    if method == 'pearson':
+        corr = _pearson(matrix.values, min_periods)
+    elif method == 'spearman':
+        corr = _spearman(matrix.values, min_periods)
+    else:
+        raise ValueError(f"Unknown method {method!r}; use 'pearson' or 'spearman'")
+    return pd.DataFrame(corr, index=matrix.subjects, columns=matrix.subjects)
+
+
+def _pearson(values, min_periods):
+    """Pearson correlation from pairwise-complete sums over the presence mask."""
+    present = (~np.isnan(values)).astype(np.float64)
+    x = np.where(present > 0, values, 0.0)
+    # centre columns: keeps the pairwise sums well conditioned
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = np.where(present > 0, x - x.sum(axis=0) / present.sum(axis=0), 0.0)
+
+    n = present.T @ present                 # common countries per pair
+    sx = x.T @ present                      # sum of x_i where x_j is present too
+    sxx = (x * x).T @ present               # sum of x_i^2 where x_j is present too
+    sxy = x.T @ x
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sx.T / n
+        var = sxx - sx * sx / n
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < min_periods] = np.nan
+    return np.clip(corr, -1, 1)
+
+
+def _spearman(values, min_periods):
+    """Pearson correlation of each pair's ranks over the pair's common rows."""
+    present = ~np.isnan(values)
+    x = _pairwise_ranks(values, present)          # [i, j]: i ranked within (i, j)
+    y = x.transpose(1, 0, 2)                      # [i, j]: j ranked within (i, j)
+    n = present.T.astype(np.float64) @ present
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (n + 1) / 2                        # mean rank, ties included
+        cov = (x * y).sum(axis=2) - n * mean * mean
+        var_x = (x * x).sum(axis=2) - n * mean * mean
+        corr = cov / np.sqrt(var_x * var_x.T)
+    corr[n < min_periods] = np.nan
+    return np.clip(corr, -1, 1)
+
+
+def screen(matrix, criteria):
+    """
+    Rows passing every criterion.
+
+    Args:
+        criteria: {subject_code: (op, threshold)} with op in '>', '>=', '<', '<=';
+            a country missing a screened indicator does not pass.
+
+    Returns:
+        numpy.ndarray: boolean row mask.
+    """
+    column = {s: j for j, s in enumerate(matrix.subjects)}
+    passed = np.ones(len(matrix.countries), dtype=bool)
+    screened = np.zeros(len(matrix.subjects), dtype=bool)
+    thresholds = {op: np.full(len(matrix.subjects), np.nan) for op in OPERATORS}
+    for subject, (op, threshold) in criteria.items():
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op!r}; use one of {', '.join(OPERATORS)}")
+        thresholds[op][column[subject]] = threshold
+        screened[column[subject]] = True
+    values = matrix.values
+    with np.errstate(invalid='ignore'):
+        for op, limit in thresholds.items():
+            used = ~np.isnan(limit)
+            if used.any():
+                passed &= OPERATORS[op](values[:, used], limit[used]).all(axis=1)
+    passed &= ~np.isnan(values[:, screened]).any(axis=1)
+    return passed
+
+
+def to_frame(matrix, rows=None, names=None):
+    """
+    DataFrame with iso_code and one column per indicator.
+
+    Args:
+        rows: Optional boolean mask (e.g. from screen()).
+        names: Optional {subject_code: column name}.
+    """
+    import pandas as pd
+
+    names = names or {}
+    values, countries = matrix.values, matrix.countries
+    if rows is not None:
+        values, countries = values[rows], countries[rows]
+    df = pd.DataFrame(values, columns=[names.get(s, s) for s in matrix.subjects])
+    df.insert(0, 'iso_code', countries)
+    return df
@@ -0,0 +1,211 @@
+"""
+Observation Summary Tables
+
+Small summary tables that the WEO loaders keep up to date while they insert
+observations, so data-availability reports read a few hundred rows instead
+of re-aggregating the observations table:
+- obs_stats          one row per (year, subject_code, iso_code)
+- obs_stats_year     one row per year: observations, countries, subjects
+- obs_stats_country  one row per country: observations, first / last year
+
+Every row holds a count and running moments (n, mean, m2, min, max; the
+variance is m2 / (n - 1)). Batches are merged with the parallel variance
+formula in INSERT ... ON CONFLICT DO UPDATE statements that run in the
+loader's transaction, so the summaries commit or roll back together with
+the observations. Works on DuckDB connections and psycopg2 cursors.
+
+Usage (inside the loader's transaction):
+    create_summary_tables(conn)
+    for chunk in chunks:
+        insert(chunk)
+        update_summaries(conn, chunk)
+"""
+
+import pandas as pd
+
+from cmu_datasets.paths import WEO_OBSERVATIONS
+
+TABLES = ['obs_stats', 'obs_stats_year', 'obs_stats_country']
+
+_MOMENTS = """
+    n BIGINT NOT NULL,
+    mean DOUBLE PRECISION,
+    m2 DOUBLE PRECISION,
+    min_value DOUBLE PRECISION,
+    max_value DOUBLE PRECISION
+"""
+
+DDL = [
+    f"""CREATE TABLE obs_stats (
+        year INTEGER NOT NULL,
+        subject_code VARCHAR(20) NOT NULL,
+        iso_code VARCHAR(3) NOT NULL,
+        {_MOMENTS},
+        PRIMARY KEY (year, subject_code, iso_code)
+    )""",
+    f"""CREATE TABLE obs_stats_year (
+        year INTEGER PRIMARY KEY,
+        countries INTEGER NOT NULL,
+        subjects INTEGER NOT NULL,
+        {_MOMENTS}
+    )""",
+    f"""CREATE TABLE obs_stats_country (
+        iso_code VARCHAR(3) PRIMARY KEY,
+        first_year INTEGER,
+        last_year INTEGER,
+        {_MOMENTS}
+    )""",
+]
+
+
+# SET clause merging a batch's moments (EXCLUDED) into the stored ones (t)
+_MERGE = """
+    n = t.n + EXCLUDED.n,
+    mean = (t.n * t.mean + EXCLUDED.n * EXCLUDED.mean) / (t.n + EXCLUDED.n),
+    m2 = t.m2 + EXCLUDED.m2
+         + (EXCLUDED.mean - t.mean) * (EXCLUDED.mean - t.mean) * t.n * EXCLUDED.n / (t.n + EXCLUDED.n),
+    min_value = LEAST(t.min_value, EXCLUDED.min_value),
+    max_value = GREATEST(t.max_value, EXCLUDED.max_value)"""
+
+
+def _rollup(key):
+    """FROM / moments of the staged cells grouped by `key` (m2 centred on the group mean)."""
+    moments = """SUM(b.n), MIN(g.mean), SUM(b.m2 + b.n * (b.mean - g.mean) * (b.mean - g.mean)),
+               MIN(b.min_value), MAX(b.max_value)"""
+    source = f"""_stats_batch b
+        JOIN (SELECT {key}, SUM(n * mean) / SUM(n) AS mean FROM _stats_batch GROUP BY {key}) g
+          ON g.{key} = b.{key}"""
+    return moments, source
+
+
+_YEAR_MOMENTS, _YEAR_SOURCE = _rollup('year')
+_COUNTRY_MOMENTS, _COUNTRY_SOURCE = _rollup('iso_code')
+
+# The rollups run before obs_stats is updated: a (year, country) or
+# (year, subject) pair is new when obs_stats has no cell for it yet
+UPSERTS = [
+    f"""INSERT INTO obs_stats_year AS t (year, countries, subjects, n, mean, m2, min_value, max_value)
+        SELECT b.year,
+               COUNT(DISTINCT CASE WHEN NOT EXISTS (
+                   SELECT 1 FROM obs_stats s WHERE s.year = b.year AND s.iso_code = b.iso_code)
+                   THEN b.iso_code END),
+               COUNT(DISTINCT CASE WHEN NOT EXISTS (
+                   SELECT 1 FROM obs_stats s WHERE s.year = b.year AND s.subject_code = b.subject_code)
+                   THEN b.subject_code END),
+               {_YEAR_MOMENTS}
+        FROM {_YEAR_SOURCE}
+        GROUP BY b.year
+        ON CONFLICT (year) DO UPDATE SET
+            countries = t.countries + EXCLUDED.countries,
+            subjects = t.subjects + EXCLUDED.subjects,
+            {_MERGE}""",
+    f"""INSERT INTO obs_stats_country AS t (iso_code, first_year, last_year, n, mean, m2, min_value, max_value)
+        SELECT b.iso_code, MIN(b.year), MAX(b.year), {_COUNTRY_MOMENTS}
+        FROM {_COUNTRY_SOURCE}
+        GROUP BY b.iso_code
+        ON CONFLICT (iso_code) DO UPDATE SET
+            first_year = LEAST(t.first_year, EXCLUDED.first_year),
+            last_year = GREATEST(t.last_year, EXCLUDED.last_year),
+            {_MERGE}""",
+    f"""INSERT INTO obs_stats AS t (year, subject_code, iso_code, n, mean, m2, min_value, max_value)
+        SELECT year, subject_code, iso_code, n, mean, m2, min_value, max_value
+        FROM _stats_batch
+        ON CONFLICT (year, subject_code, iso_code) DO UPDATE SET
+            {_MERGE}""",
+]
+
+
+def _is_postgres(db):
+    # traced cursors subclass the psycopg2 cursor
+    return any(cls.__module__.startswith('psycopg2') for cls in type(db).__mro__)
+
+
+def _execute(db, sql):
+    if _is_postgres(db) and hasattr(db, 'cursor'):
+        with db.cursor() as cur:
+            cur.execute(sql)
+    else:
+        db.execute(sql)
+
+
+def create_summary_tables(db):
+    """(Re)create the summary tables, empty. `db`: DuckDB connection or psycopg2 cursor."""
+    for table in reversed(TABLES):
+        _execute(db, f"DROP TABLE IF EXISTS {table}")
+    for ddl in DDL:
+        _execute(db, ddl)
+
+
+def batch_moments(observations):
+    """
+    Aggregate observation rows to one row per (year, subject_code, iso_code).
+
+    Args:
+        observations: DataFrame with year, subject_code, iso_code and value.
+
+    Returns:
+        pandas.DataFrame: year, subject_code, iso_code, n, mean, m2, min_value, max_value.
+    """
+    data = observations[['year', 'subject_code', 'iso_code', 'value']].dropna(subset=['value'])
+    # key columns are NOT NULL: a missing code is counted under ''
+    data = data.astype({'value': 'float64'}).fillna({'subject_code': '', 'iso_code': ''})
+    grouped = data.groupby(['year', 'subject_code', 'iso_code'], sort=False, observed=True)['value']
+    cells = grouped.agg(['count', 'mean', 'min', 'max'])
+    cells['m2'] = grouped.var(ddof=0).fillna(0.0) * cells['count']
+    cells = cells.rename(columns={'count': 'n', 'min': 'min_value', 'max': 'max_value'}).reset_index()
+    cells['year'] = cells['year'].astype('int64')
+    return cells[['year', 'subject_code', 'iso_code', 'n', 'mean', 'm2', 'min_value', 'max_value']]
+
+
+def update_summaries(db, observations):
+    """
+    Add a batch of newly inserted observations to the summary tables.
+
+    Runs inside the caller's transaction and does not commit.
+
+    Args:
+        db: DuckDB connection or psycopg2 cursor (the one inserting the rows).
+        observations: DataFrame with year, subject_code, iso_code and value.
+
+    Returns:
+        int: Number of (year, subject, country) cells touched.
+    """
+    cells = batch_moments(observations)
+    if cells.empty:
+        return 0
+    if _is_postgres(db):
+        from psycopg2.extras import execute_values
+
+        cursor = db.cursor() if hasattr(db, 'cursor') else db
+        cursor.execute("""CREATE TEMP TABLE IF NOT EXISTS _stats_batch (
+            year INTEGER, subject_code VARCHAR(20), iso_code VARCHAR(3), n BIGINT,
+            mean DOUBLE PRECISION, m2 DOUBLE PRECISION,
+            min_value DOUBLE PRECISION, max_value DOUBLE PRECISION) ON COMMIT DROP""")
+        cursor.execute("TRUNCATE _stats_batch")
+        execute_values(cursor, "INSERT INTO _stats_batch VALUES %s",
+                       list(cells.itertuples(index=False, name=None)))
+        for sql in UPSERTS:
+            cursor.execute(sql)
+        return len(cells)
+
+    db.register('_stats_cells', cells)
+    try:
+        db.execute("CREATE OR REPLACE TEMP TABLE _stats_batch AS SELECT * FROM _stats_cells")
+        for sql in UPSERTS:
+            db.execute(sql)
+        db.execute("DROP TABLE _stats_batch")
+    finally:
+        db.unregister('_stats_cells')
+    return len(cells)
+
+
+def rebuild_summaries(db, table=WEO_OBSERVATIONS):
+    """Recreate the summary tables from every row of an observations table."""
+    create_summary_tables(db)
+    if _is_postgres(db):
+        cursor = db.cursor() if hasattr(db, 'cursor') else db
+        cursor.execute(f"SELECT iso_code, subject_code, year, value FROM {table}")
+        observations = pd.DataFrame(cursor.fetchall(), columns=['iso_code', 'subject_code', 'year', 'value'])
+    else:
+        observations = db.execute(f"SELECT iso_code, subject_code, year, value FROM {table}").df()
+    return update_summaries(db, observations)
@@ -0,0 +1,249 @@
+"""
+HTML Table Extraction
+
+Turns HTML tables into DataFrames without building a BeautifulSoup tree:
+- the page is streamed through lxml's incremental HTML parser in chunks,
+  and elements are cleared as soon as a row is finished
+- rowspan / colspan cells are expanded into every row and column they cover
+- numeric columns come back typed (int / float, thousands separators and
+  blanks handled); everything else stays text
+- every matching table in the page is extracted in the same single pass
+
+Usage:
+    df = read_table(html)                      # first table
+    tables = read_tables(html, attrs={'class': 'standings'})
+"""
+
+import io
+import os
+import re
+
+import pandas as pd
+from lxml import etree
+
+CHUNK_SIZE = 64 * 1024
+
+_NUMBER = re.compile(r'^(?=[^\d]*\d)[+-]?(\d{1,3}(,\d{3})+|\d+)?(\.\d+)?([eE][+-]?\d+)?$')
+
+
+class _TableState:
+    """Rows and pending row spans for one table being parsed."""
+
+    def __init__(self, index, selected):
+        self.index = index
+        self.selected = selected
+        self.rows = []
+        self.cells = []
+        self.spans = {}  # column -> [rows remaining, value]
+
+    def end_cell(self, element):
+        if len(element):
+            text = ''.join(t.strip() for t in element.itertext())
+        else:
+            text = element.text.strip() if element.text else ''
+        if element.attrib:
+            self.cells.append((text, _span(element, 'rowspan'), _span(element, 'colspan')))
+        else:
+            self.cells.append((text, 1, 1))
+
+    def end_row(self):
+        row = []
+        col = 0
+        for text, rowspan, colspan in self.cells:
+            col = self._fill_spans(row, col)
+            for _ in range(colspan):
+                row.append(text)
+                if rowspan > 1:
+                    self.spans[col] = [rowspan - 1, text]
+                col += 1
+        self._fill_spans(row, col, trailing=True)
+        self.cells = []
+        if row:
+            self.rows.append(row)
+
+    def _fill_spans(self, row, col, trailing=False):
+        while col in self.spans or (trailing and any(c > col for c in self.spans)):
+            if col in self.spans:
+                span = self.spans[col]
+                row.append(span[1])
+                span[0] -= 1
+                if span[0] == 0:
+                    del self.spans[col]
+            else:
+                row.append('')
+            col += 1
+        return col
+
+
+def _span(element, name):
+    try:
+        return max(1, int(element.get(name, 1)))
+    except ValueError:
+        return 1
+
+
+def _matches(element_attrs, attrs):
+    if not attrs:
+        return True
+    for key, value in attrs.items():
+        actual = element_attrs.get(key)
+        if actual is None:
+            return False
+        if key == 'class':
+            if value not in actual.split():
+                return False
+        elif actual != value:
+            return False
+    return True
+
+
+class _ByteReader:
+    """Adapt HTML text, bytes or a text/binary file to a bytes `read()`."""
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        if isinstance(source, str) and ('<' in source or not os.path.exists(source)):
+            source = source.encode('utf-8')
+        if isinstance(source, bytes):
+            self._handle = io.BytesIO(source)
+        elif isinstance(source, (str, os.PathLike)):
+            self._handle = open(source, 'rb')
+        else:
+            self._handle = source
+        self._owned = self._handle is not source
+
+    def read(self, size=-1):
+        chunk = self._handle.read(min(size, self.chunk_size) if size > 0 else self.chunk_size)
+        return chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+    def close(self):
+        if self._owned:
+            self._handle.close()
+
+
+def convert_column(values):
+    """
+    Type a column of cell strings.
+
+    Blank cells become missing; a column whose other cells are all numbers
+    (optionally with thousands separators) becomes int64 / Int64 / float64.
+
+    Args:
+        values: Cell text for one column.
+
+    Returns:
+        pandas.Series: Typed column.
+    """
+    series = pd.Series(values, dtype=object)
+    blank = series.isin(['', '-', '–', '—'])
+    present = series[~blank]
+    if present.empty:
+        return series
+    try:
+        numbers = pd.to_numeric(present)
+    except (ValueError, TypeError):
+        if not present.str.match(_NUMBER).all():
+            return series
+        numbers = pd.to_numeric(present.str.replace(',', '', regex=False))
+    if pd.api.types.is_integer_dtype(numbers):
+        out = pd.Series(pd.NA, index=series.index, dtype='Int64')
+        out[~blank] = numbers
+        return out.astype('int64') if not blank.any() else out
+    out = pd.Series(float('nan'), index=series.index, dtype='float64')
+    out[~blank] = numbers
+    return out
+
+
+def _to_frame(rows, header, convert):
+    width = max(len(row) for row in rows)
+    rows = [row + [''] * (width - len(row)) for row in rows]
+    if header is not None and len(rows) > header:
+        columns = rows[header]
+        body = rows[header + 1:]
+    else:
+        columns = list(range(width))
+        body = rows
+    data = list(zip(*body)) if body else [[] for _ in columns]
+    frame = {}
+    for i, values in enumerate(data):
+        frame[i] = convert_column(list(values)) if convert else pd.Series(values, dtype=object)
+    df = pd.DataFrame(frame)
+    df.columns = columns
+    return df
+
+
+def read_tables(source, attrs=None, tables=None, header=0, convert=True, chunk_size=CHUNK_SIZE):
+    """
+    Extract HTML tables into DataFrames in one streaming pass.
+
+    Args:
+        source: HTML text or bytes, a file path, or an open file.
+        attrs: Only keep tables whose attributes match, e.g. {'id': 'results'}
+            or {'class': 'standings'} (class matches any one class name).
+        tables: Only keep tables at these positions (after `attrs` filtering).
+        header: Row used as column names (None for 0..n-1 column names).
+        convert: Type numeric columns instead of returning strings.
+        chunk_size: Bytes fed to the parser at a time.
+
+    Returns:
+        list[pandas.DataFrame]: One DataFrame per selected, non-empty table.
+    """
+    wanted = None if tables is None else set(tables)
+    reader = _ByteReader(source, chunk_size)
+    # Only table elements raise events; the rest of the page is parsed in C
+    events = etree.iterparse(reader, events=('start', 'end'), tag=('table', 'tr', 'td', 'th'),
+                             html=True, huge_tree=True)
+    stack = []
+    found = 0
+    results = []
+    try:
+        for event, element in events:
+            tag = element.tag
+            if event == 'start':
+                if tag == 'table':
+                    selected = _matches(element.attrib, attrs)
+                    index = found if selected else None
+                    if selected:
+                        found += 1
+                        selected = wanted is None or index in wanted
+                    stack.append(_TableState(index, selected))
+                continue
+            if not stack:
+                continue
+
+            table = stack[-1]
+            if tag == 'td' or tag == 'th':
+                if table.selected:
+                    table.end_cell(element)
+            elif tag == 'tr':
+                if table.selected:
+                    table.end_row()
+                element.clear()
+            else:
+                stack.pop()
+                if table.selected and table.rows:
+                    results.append((table.index, _to_frame(table.rows, header, convert)))
+                element.clear()
+                # Drop a finished top-level table and everything before it from the tree
+                parent = element.getparent()
+                if not stack and parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+    finally:
+        reader.close()
+
+    results.sort(key=lambda item: item[0])
+    return [df for _, df in results]
+
+
+def read_table(source, **options):
+    """
+    Extract the first matching HTML table.
+
+    Raises:
+        ValueError: If the page has no matching table.
+    """
+    found = read_tables(source, tables=[0], **options)
+    if not found:
+        raise ValueError("No matching <table> found")
+    return found[0]
@@ -0,0 +1,263 @@
+"""
+WEO Time-Series Kernels
+
+Derived statistics of level series (GDP, population, prices, ...) for every
+country at once:
+- yoy():           year-over-year growth (%)
+- cagr():          compound annual growth (%) over a trailing window of years
+- cagr_between():  compound annual growth (%) between two years
+- rolling_mean() / rolling_std(): trailing window mean / sample std dev
+- rank():          rank of every country within each year (1 = highest)
+
+A Panel holds one indicator as a (countries, years) float64 array with a
+column for every year in the range (NaN where there is no value), so a
+window of k years is always k columns and every kernel is a few array
+operations over all countries together. Rolling windows use cumulative sums
+of the non-missing values and counts, so any window length costs the same.
+
+The same statistics can be pushed down to the database instead:
+window_query() returns one SQL statement with window functions (DuckDB and
+PostgreSQL), with calendar-year RANGE frames so gaps match the Panel.
+
+Usage:
+    df = conn.execute(f"SELECT iso_code, year, value FROM {WEO_OBSERVATIONS} WHERE subject_code = 'NGDP_R'").df()
+    gdp = panel(df)
+    growth = yoy(gdp)
+    frame = to_frame(gdp, growth=growth, cagr_5y=cagr(gdp, 5), volatility_5y=rolling_std(growth, 5))
+
+    sql, params = window_query('NGDP_R', window=5)
+    conn.execute(sql, params).df()
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from cmu_datasets.paths import WEO_OBSERVATIONS
+
+# values: (countries, years) float64; countries: labels; years: consecutive ints
+Panel = namedtuple('Panel', ['values', 'countries', 'years'])
+
+
+def panel(df, country='iso_code', year='year', value='value'):
+    """
+    Scatter a long table (one row per country and year) into a Panel.
+
+    Args:
+        df: DataFrame (or dict of arrays) with country, year and value columns.
+
+    Returns:
+        Panel with countries sorted and a column for every year from the
+        first to the last.
+    """
+    countries, row = np.unique(np.asarray(df[country], dtype=object).astype(str), return_inverse=True)
+    years = np.asarray(df[year], dtype=np.int64)
+    first = int(years.min()) if len(years) else 0
+    span = int(years.max()) - first + 1 if len(years) else 0
+    values = np.full((len(countries), span), np.nan)
+    cell = row.ravel() * span + (years - first)
+    if len(cell) and np.bincount(cell).max() > 1:
+        raise ValueError("More than one value per country and year")
+    values.ravel()[cell] = np.asarray(df[value], dtype=np.float64)
+    return Panel(values, countries, np.arange(first, first + span))
+
+
+def _values(data):
+    return data.values if isinstance(data, Panel) else np.asarray(data, dtype=np.float64)
+
+
+def _like(data, values):
+    return data._replace(values=values) if isinstance(data, Panel) else values
+
+
+def _shift(values, periods):
+    """Columns moved right by `periods` (the value `periods` years earlier), NaN-filled."""
+    shifted = np.full_like(values, np.nan)
+    if periods < values.shape[1]:
+        shifted[:, periods:] = values[:, :values.shape[1] - periods]
+    return shifted
+
+
+def yoy(data):
+    """Growth (%) on the previous year; NaN where either year is missing or the base is 0."""
+    values = _values(data)
+    previous = _shift(values, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (values / previous - 1) * 100
+    growth[previous == 0] = np.nan
+    return _like(data, growth)
+
+
+def cagr(data, window):
+    """
+    Compound annual growth (%) over the `window` years ending in each year.
+
+    (x[t] / x[t - window]) ** (1 / window) - 1; NaN when either end is
+    missing, the start is 0 or the ratio is not positive (a sign change has
+    no CAGR).
+    """
+    values = _values(data)
+    start = _shift(values, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = values / start
+        growth = (np.power(ratio, 1.0 / window) - 1) * 100
+    growth[~((ratio > 0) & np.isfinite(ratio))] = np.nan
+    return _like(data, growth)
+
+
+def cagr_between(data, start, end):
+    """
+    Compound annual growth (%) per country from year `start` to year `end`.
+
+    Raises:
+        ValueError: Unless start < end and both years are in the panel.
+    """
+    if not isinstance(data, Panel):
+        raise TypeError("cagr_between needs a Panel (to locate the years)")
+    if not len(data.years) or not data.years[0] <= start < end <= data.years[-1]:
+        span = f"{data.years[0]}-{data.years[-1]}" if len(data.years) else "no years"
+        raise ValueError(f"cagr_between needs start < end within the panel's years ({span}); "
+                         f"got {start} to {end}")
+    first = int(data.years[0])
+    a, b = data.values[:, start - first], data.values[:, end - first]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = b / a
+        growth = (np.power(ratio, 1.0 / (end - start)) - 1) * 100
+    growth[~((ratio > 0) & np.isfinite(ratio))] = np.nan
+    return growth
+
+
+def _window_sums(values, window):
+    """Trailing-window count, sum and sum of squares of the non-missing values."""
+    present = ~np.isnan(values)
+    # centre each series first: the sum-of-squares difference stays accurate
+    with np.errstate(invalid='ignore'):
+        centre = np.nanmean(np.where(present.any(axis=1, keepdims=True), values, 0), axis=1, keepdims=True)
+    x = np.where(present, values - centre, 0.0)
+    padded = np.zeros((values.shape[0], values.shape[1] + 1, 3))
+    padded[:, 1:, 0] = np.cumsum(present, axis=1)
+    padded[:, 1:, 1] = np.cumsum(x, axis=1)
+    padded[:, 1:, 2] = np.cumsum(x * x, axis=1)
+    lagged = np.zeros_like(padded[:, 1:])
+    if window < values.shape[1]:
+        lagged[:, window:] = padded[:, 1:values.shape[1] - window + 1]
+    sums = padded[:, 1:] - lagged
+    return sums[..., 0], sums[..., 1], sums[..., 2], centre
+
+
+def rolling_mean(data, window, min_periods=None):
+    """Mean of the `window` years ending in each year (NaN with fewer than min_periods values)."""
+    values = _values(data)
+    count, total, _, centre = _window_sums(values, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count + centre
+    mean[count < (window if min_periods is None else min_periods)] = np.nan
+    return _like(data, mean)
+
+
+def rolling_std(data, window, min_periods=None):
+    """Sample standard deviation of the `window` years ending in each year (volatility)."""
+    values = _values(data)
+    count, total, squares, _ = _window_sums(values, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (squares - total * total / count) / (count - 1)
+    std = np.sqrt(np.maximum(variance, 0))
+    std[count < max(2, window if min_periods is None else min_periods)] = np.nan
+    return _like(data, std)
+
+
+def rank(data, ascending=False):
+    """
+    Rank of every country within each year (column); ties share the lowest rank.
+
+    Missing values get no rank (NaN). Returns a float array of ranks from 1.
+    """
+    values = _values(data)
+    keyed = np.where(np.isnan(values), np.inf, values if ascending else -values)
+    order = np.argsort(keyed, axis=0, kind='stable')
+    ordered = np.take_along_axis(keyed, order, axis=0)
+    position = np.arange(values.shape[0])[:, None]
+    # first position of each run of equal values
+    starts = np.vstack([np.ones((1, values.shape[1]), dtype=bool), ordered[1:] != ordered[:-1]])
+    tie_rank = np.maximum.accumulate(np.where(starts, position, 0), axis=0) + 1.0
+    ranks = np.empty_like(tie_rank)
+    np.put_along_axis(ranks, order, tie_rank, axis=0)
+    ranks[np.isnan(values)] = np.nan
+    return _like(data, ranks)
+
+
+def to_frame(base, dropna=True, **columns):
+    """
+    Long DataFrame (country, year, value, one column per named panel / array).
+
+    Args:
+        base: The level Panel.
+        dropna: Drop rows where the level value is missing.
+        **columns: Same-shape Panels or arrays, e.g. growth=yoy(base).
+    """
+    import pandas as pd
+
+    n_countries, n_years = base.values.shape
+    data = {
+        'iso_code': np.repeat(base.countries, n_years),
+        'year': np.tile(base.years, n_countries),
+        'value': base.values.ravel(),
+    }
+    for name, values in columns.items():
+        data[name] = _values(values).ravel()
+    df = pd.DataFrame(data)
+    if dropna:
+        df = df[~np.isnan(base.values.ravel())].reset_index(drop=True)
+    return df
+
+
+def window_query(subject_code, window=5, table=WEO_OBSERVATIONS, placeholder='?'):
+    """
+    The same statistics as window functions, for DuckDB or PostgreSQL.
+
+    Columns: iso_code, year, value, growth (yoy %), cagr (over `window`
+    years), rolling_mean, volatility (rolling std of growth) and
+    growth_rank (within the year, 1 = fastest).
+
+    Args:
+        table: Long observations table (iso_code, subject_code, year, value).
+        placeholder: '?' for DuckDB, '%s' for psycopg2.
+
+    Returns:
+        tuple: (sql, params)
+    """
+    span = window - 1
+    sql = f"""
+        WITH series AS (
+            SELECT iso_code, year, value,
+                   -- the value exactly 1 and `window` calendar years earlier (NULL across a gap)
+                   MAX(value) OVER (PARTITION BY iso_code ORDER BY year
+                                    RANGE BETWEEN 1 PRECEDING AND 1 PRECEDING) AS previous,
+                   MAX(value) OVER (PARTITION BY iso_code ORDER BY year
+                                    RANGE BETWEEN {window} PRECEDING AND {window} PRECEDING) AS window_start,
+                   AVG(value) OVER last_years AS rolling_mean,
+                   COUNT(value) OVER last_years AS window_count
+            FROM {table}
+            WHERE subject_code = {placeholder} AND value IS NOT NULL
+            WINDOW last_years AS (PARTITION BY iso_code ORDER BY year
+                                  RANGE BETWEEN {span} PRECEDING AND CURRENT ROW)
+        ),
+        growth AS (
+            SELECT *,
+                   CASE WHEN previous <> 0 THEN (value / previous - 1) * 100 END AS growth,
+                   CASE WHEN value / NULLIF(window_start, 0) > 0
+                        THEN (POWER(value / window_start, 1.0 / {window}) - 1) * 100 END AS cagr
+            FROM series
+        )
+        SELECT iso_code, year, value, growth, cagr,
+               CASE WHEN window_count = {window} THEN rolling_mean END AS rolling_mean,
+               CASE WHEN COUNT(growth) OVER last_years = {window}
+                    THEN STDDEV_SAMP(growth) OVER last_years END AS volatility,
+               CASE WHEN growth IS NOT NULL
+                    THEN RANK() OVER (PARTITION BY year ORDER BY growth DESC NULLS LAST) END AS growth_rank
+        FROM growth
+        WINDOW last_years AS (PARTITION BY iso_code ORDER BY year
+                              RANGE BETWEEN {span} PRECEDING AND CURRENT ROW)
+        ORDER BY iso_code, year
+    """
+    return sql, [subject_code]
@@ -0,0 +1,283 @@
+"""
+Batch Validation
+
+Checks whole tables against declared rules before a loader writes anything:
+- not_null(*columns)              missing values (blank strings count as missing)
+- unique(*columns)                duplicate keys (rows after the first)
+- in_range(column, low, high)     values outside [low, high]
+- references(column, table, key)  foreign keys missing from another table
+
+Each column is converted to an Arrow array once per table and every rule is
+a vectorized kernel over it: hashed key codes (combined and checked for
+repeats in NumPy), hash membership for foreign keys, and boolean masks for
+missing and out-of-range values. Checking a million observations costs a
+few array operations rather than a Python loop or one query per rule.
+
+A rule either fails the load (action='error', the default) or drops the
+offending rows (action='drop'); `report.keep(table)` is the row mask
+without them. Foreign keys are checked against the kept rows of the
+referenced table when it is validated first.
+
+Usage:
+    report = validate({'countries': countries_df, 'metrics': metrics_df}, WEO_RULES)
+    print(report)
+    report.raise_for_errors()
+    countries_df = countries_df[report.keep('countries')]
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+Rule = namedtuple('Rule', ['kind', 'columns', 'args', 'action'])
+
+# rows: offending row count; examples: a few offending values
+Violation = namedtuple('Violation', ['table', 'rule', 'columns', 'rows', 'examples', 'action'])
+
+EXAMPLES = 3
+
+
+class ValidationError(ValueError):
+    """Raised by ValidationReport.raise_for_errors(); `.report` holds the details."""
+
+    def __init__(self, report):
+        super().__init__(f"validation failed:\n{report}")
+        self.report = report
+
+
+def not_null(*columns, action='error'):
+    return Rule('not_null', columns, None, action)
+
+
+def unique(*columns, action='error'):
+    """Composite key over `columns`; rows with a missing key part are not compared (as in SQL)."""
+    return Rule('unique', columns, None, action)
+
+
+def in_range(column, low=None, high=None, action='error'):
+    return Rule('in_range', (column,), (low, high), action)
+
+
+def references(column, table, key=None, action='error'):
+    """Every non-missing `column` value appears in `table`.`key` (default: same name)."""
+    return Rule('references', (column,), (table, key or column), action)
+
+
+# ============================================================================
+# KERNELS
+# ============================================================================
+
+def _column(table, name):
+    """A DataFrame or Arrow table column as one Arrow array (NaN counts as missing)."""
+    import pyarrow as pa
+
+    if hasattr(table, 'column_names'):
+        return table.column(name).combine_chunks()
+    return pa.Array.from_pandas(table[name])
+
+
+def _is_text(array):
+    import pyarrow as pa
+
+    return pa.types.is_string(array.type) or pa.types.is_large_string(array.type)
+
+
+def _missing(array):
+    """Missing mask; blank strings count as missing."""
+    import pyarrow.compute as pc
+
+    missing = array.is_null(nan_is_null=True)
+    if _is_text(array):
+        missing = pc.or_kleene(missing, pc.equal(pc.utf8_trim_whitespace(array), ''))
+    return missing.to_numpy(zero_copy_only=False)
+
+
+def _codes(array):
+    """Dense integer codes of a column by hashing (equal values, equal codes; missing = 0)."""
+    import pyarrow.compute as pc
+
+    encoded = array.dictionary_encode()
+    codes = pc.fill_null(encoded.indices, -1).to_numpy(zero_copy_only=False).astype(np.int64) + 1
+    return codes, len(encoded.dictionary) + 1
+
+
+def _duplicates(arrays):
+    """Rows whose key (all columns) repeats an earlier row's."""
+    n = len(arrays[0])
+    missing = np.zeros(n, dtype=bool)
+    key, size = np.zeros(n, dtype=np.int64), 1
+    for array in arrays:
+        codes, cardinality = _codes(array)
+        if size * cardinality >= 2 ** 62:
+            # re-factorize so the combined key stays within int64
+            unique_keys, key = np.unique(key, return_inverse=True)
+            key, size = key.ravel(), len(unique_keys)
+        key, size = key * cardinality + codes, size * cardinality
+        missing |= array.is_null(nan_is_null=True).to_numpy(zero_copy_only=False)
+    first = np.unique(key, return_index=True)[1]
+    bad = np.ones(n, dtype=bool)
+    bad[first] = False
+    return bad & ~missing
+
+
+def _out_of_range(array, low, high):
+    values = array.to_numpy(zero_copy_only=False).astype(float)
+    bad = np.zeros(len(values), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        if low is not None:
+            bad |= values < low
+        if high is not None:
+            bad |= values > high
+    return bad
+
+
+def _missing_keys(array, keys):
+    """Non-missing values of `array` that are not among `keys` (hash lookup)."""
+    import pyarrow.compute as pc
+
+    if keys.type != array.type:
+        keys = keys.cast(array.type)
+    found = pc.is_in(array, value_set=keys).to_numpy(zero_copy_only=False)
+    return ~found & ~array.is_null(nan_is_null=True).to_numpy(zero_copy_only=False)
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+class ValidationReport:
+    """Violations per table and the rows each table keeps after 'drop' rules."""
+
+    def __init__(self):
+        self.violations = []
+        self.rows = {}
+        self._keep = {}
+
+    @property
+    def errors(self):
+        return [v for v in self.violations if v.action == 'error']
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def keep(self, table):
+        """Boolean row mask of `table` without the rows dropped by its rules."""
+        return self._keep[table]
+
+    def dropped(self, table):
+        return int((~self._keep[table]).sum())
+
+    def raise_for_errors(self):
+        if not self.ok:
+            raise ValidationError(self)
+
+    def __str__(self):
+        lines = []
+        for table, rows in self.rows.items():
+            found = [v for v in self.violations if v.table == table]
+            status = 'ok' if not found else f"{len(found)} rule(s) violated"
+            lines.append(f"  {table}: {rows:,} rows, {status}")
+            for v in found:
+                examples = ', '.join(repr(e) for e in v.examples)
+                verb = 'dropped' if v.action == 'drop' else 'rows'
+                lines.append(f"    {v.rule}({', '.join(v.columns)}): {v.rows:,} {verb}"
+                             + (f" (e.g. {examples})" if examples else ''))
+        return '\n'.join(lines)
+
+
+def validate(tables, rules):
+    """
+    Check tables against rules.
+
+    Args:
+        tables: {name: pandas.DataFrame or pyarrow.Table}.
+        rules: {name: [Rule, ...]}; tables are checked in this order.
+
+    Returns:
+        ValidationReport
+    """
+    report = ValidationReport()
+    for name, table_rules in rules.items():
+        table = tables[name]
+        arrays = {}
+
+        def column(col):
+            if col not in arrays:
+                arrays[col] = _column(table, col)
+            return arrays[col]
+
+        n = len(table)
+        keep = np.ones(n, dtype=bool)
+        for rule in table_rules:
+            if rule.kind == 'not_null':
+                bad = np.zeros(n, dtype=bool)
+                for col in rule.columns:
+                    bad |= _missing(column(col))
+            elif rule.kind == 'unique':
+                bad = _duplicates([column(col) for col in rule.columns])
+            elif rule.kind == 'in_range':
+                bad = _out_of_range(column(rule.columns[0]), *rule.args)
+            elif rule.kind == 'references':
+                parent, key = rule.args
+                keys = _column(tables[parent], key)
+                if parent in report._keep:
+                    keys = keys.filter(report._keep[parent])
+                bad = _missing_keys(column(rule.columns[0]), keys)
+            else:
+                raise ValueError(f"Unknown rule kind {rule.kind!r}")
+            count = int(bad.sum())
+            if not count:
+                continue
+            rows = np.flatnonzero(bad)[:EXAMPLES]
+            values = [column(col).take(rows).to_pylist() for col in rule.columns]
+            examples = values[0] if len(values) == 1 else list(zip(*values))
+            report.violations.append(Violation(name, rule.kind, rule.columns, count, examples, rule.action))
+            if rule.action == 'drop':
+                keep &= ~bad
+        report.rows[name] = n
+        report._keep[name] = keep
+    return report
+
+
+# ============================================================================
+# DATASET RULES
+# ============================================================================
+
+# countries.csv / indicators.csv / metrics.csv in clean/weo (both loaders)
+WEO_RULES = {
+    'countries': [
+        not_null('iso_code', 'name', action='drop'),
+        unique('country_id'),
+        unique('iso_code'),
+    ],
+    'indicators': [
+        not_null('subject_code', action='drop'),
+        unique('indicator_id'),
+        unique('subject_code'),
+    ],
+    'metrics': [
+        not_null('iso_code', 'subject_code', 'year'),
+        unique('metric_id'),
+        unique('iso_code', 'subject_code', 'year'),
+        in_range('year', 1980, 2030),
+        references('iso_code', 'countries'),
+        references('subject_code', 'indicators'),
+    ],
+}
+
+# clean/titanic passenger, restaurant and luggage tables (duck_etl.py)
+TITANIC_RULES = {
+    'passengers': [
+        not_null('passenger_id'),
+        unique('passenger_id'),
+    ],
+    'restaurant': [
+        references('passenger_id', 'passengers'),
+    ],
+    'luggage': [
+        unique('passenger_id', 'bag_number'),
+        in_range('weight_kgs', 0, 1000),
+        references('passenger_id', 'passengers'),
+    ],
+}
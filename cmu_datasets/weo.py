@@ -0,0 +1,294 @@
+"""
+WEO Export Parsing
+
+Shared helpers for the IMF World Economic Outlook "entire database" exports
+(tab-separated, UTF-16 files with an .xls extension):
+- read_export(): read and clean one export
+- year_columns(): the year columns present in an export
+- vintage_from_filename(): '2025-04' from 'weo-2025-04-full.xls' or 'WEOApr2025all.xls'
+- clean_vintage(): one export as a compact long Arrow table tagged with its vintage
+- simple_panel(): one value per country and indicator as a wide country-by-indicator table
+"""
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+MONTHS = {'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04', 'may': '05', 'jun': '06',
+          'jul': '07', 'aug': '08', 'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'}
+
+ID_COLUMNS = ['weo_country_code', 'iso', 'weo_subject_code', 'country']
+
+
+def read_export(path):
+    """Read a WEO export and clean its column names."""
+    import janitor  # noqa: F401  (registers DataFrame.clean_names)
+
+    raw = pd.read_csv(path, sep='\t', encoding='utf-16-le')
+    return raw.clean_names()  # improve the column names
+
+
+def year_columns(df):
+    """Column names that are four-digit years, in order."""
+    return [c for c in df.columns if re.fullmatch(r'\d{4}', str(c))]
+
+
+def vintage_from_filename(path):
+    """Vintage label ('YYYY-MM') from an export file name, or the bare name."""
+    name = os.path.basename(path)
+    match = re.search(r'(\d{4})[-_]?(\d{2})', name)
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+    match = re.search(r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*[-_]?(\d{4})', name, re.IGNORECASE)
+    if match:
+        return f"{match.group(2)}-{MONTHS[match.group(1).lower()]}"
+    return os.path.splitext(name)[0]
+
+
+# Cells that mean "no data" in WEO exports
+SENTINELS = ['n/a', '--', '', 'NaN', 'nan']
+
+
+def _as_arrow_strings(column):
+    import pyarrow as pa
+
+    try:
+        return pa.array(column, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(column.astype(str), type=pa.string())
+
+
+def parse_numbers_arrow(strings):
+    """
+    Parse an Arrow string array of WEO cells to float64 (NaN for no data).
+
+    Thousands separators are removed, and the 'n/a' / '--' sentinels and any
+    other unparseable cell become NaN, like pd.to_numeric(errors='coerce').
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    strings = pc.utf8_trim_whitespace(strings)
+    strings = pc.if_else(pc.is_in(strings, pa.array(SENTINELS)), pa.scalar(None, pa.string()), strings)
+    strings = pc.replace_substring(strings, ',', '')
+    try:
+        numbers = pc.cast(strings, pa.float64())
+    except pa.ArrowInvalid:
+        # Rare stray text: let pandas coerce it to NaN
+        return pd.to_numeric(strings.to_pandas(), errors='coerce').to_numpy(dtype='float64')
+    return numbers.to_numpy(zero_copy_only=False)
+
+
+def parse_year_block(raw, years):
+    """
+    Convert all year columns to one contiguous float64 matrix.
+
+    Text columns are concatenated into a single Arrow string array and
+    parsed in one vectorized pass instead of astype(str) / str.replace /
+    to_numeric per column. Columns pandas already read as numbers are
+    copied as-is.
+
+    Args:
+        raw: WEO export DataFrame.
+        years: Year column names, in order.
+
+    Returns:
+        numpy.ndarray: C-contiguous (rows, years) float64 array, NaN for no data.
+    """
+    import pyarrow as pa
+
+    n_rows = len(raw)
+    block = np.empty((len(years), n_rows), dtype='float64')  # one row per year while filling
+    text = []
+    for j, year in enumerate(years):
+        column = raw[year]
+        if pd.api.types.is_numeric_dtype(column):
+            block[j] = column.to_numpy(dtype='float64', na_value=np.nan)
+        else:
+            text.append(j)
+    if text:
+        chunks = []
+        for j in text:
+            column = _as_arrow_strings(raw[years[j]])
+            chunks.extend(column.chunks if isinstance(column, pa.ChunkedArray) else [column])
+        strings = pa.chunked_array(chunks, type=pa.string()).combine_chunks()
+        block[text] = parse_numbers_arrow(strings).reshape(len(text), n_rows)
+    return np.ascontiguousarray(block.T)
+
+
+def most_recent(block, years):
+    """
+    Last non-missing value in each row of a year block, and its year.
+
+    Args:
+        block: (rows, years) float64 array from parse_year_block().
+        years: Year labels for the block's columns.
+
+    Returns:
+        tuple: (values float64 array, years object array with None where a row is empty)
+    """
+    present = ~np.isnan(block)
+    has_value = present.any(axis=1)
+    last = block.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+    values = np.where(has_value, block[np.arange(block.shape[0]), last], np.nan)
+    labels = np.asarray(years, dtype=object)[last]
+    labels[~has_value] = None
+    return values, labels
+
+
+def simple_panel(raw, subject_codes, value='most_recent', names=None, countries=None,
+                 country_columns=()):
+    """
+    Scatter one value per (country, subject) row into a country-by-indicator table.
+
+    The subject codes are the categories of the column axis: each row's
+    column is its subject's category code, and each value is written
+    straight into a preallocated float64 array. There is no filter copy,
+    MultiIndex pivot, rename or reset_index.
+
+    Args:
+        raw: WEO frame with one row per country and subject.
+        subject_codes: Indicators to keep, in column order (any WEO subject codes).
+        value: Column holding the value for each row.
+        names: Optional {subject_code: output column name}.
+        countries: Optional CountryDimension; with a `country_id` column in
+            `raw`, `country_columns` are attached by key.
+        country_columns: Dimension columns to add after `country`.
+
+    Returns:
+        pandas.DataFrame: country, country_columns..., one column per subject,
+        countries sorted by name.
+    """
+    names = names or {}
+    # category code per row, -1 for subjects not asked for
+    subject = pd.Index(list(subject_codes)).get_indexer(raw['weo_subject_code'])
+    selected = np.flatnonzero(subject >= 0)
+    row, country_names = pd.factorize(raw['country'].to_numpy()[selected], sort=True)
+    has_country = row >= 0
+    selected, row = selected[has_country], row[has_country]
+
+    n_subjects = len(subject_codes)
+    cell = row * n_subjects + subject[selected]
+    if len(cell) and np.bincount(cell).max() > 1:
+        raise ValueError("More than one row per country and subject code")
+    panel = np.full((len(country_names), n_subjects), np.nan)
+    panel.ravel()[cell] = raw[value].to_numpy(dtype='float64', na_value=np.nan)[selected]
+
+    df = pd.DataFrame(panel, columns=[names.get(code, code) for code in subject_codes], copy=False)
+    if countries is not None and country_columns:
+        keys = np.full(len(country_names), -1, dtype='int64')
+        keys[row] = raw[countries.key].to_numpy()[selected]
+        for position, column in enumerate(country_columns):
+            df.insert(position, column, countries.lookup(keys, column).to_numpy())
+    df.insert(0, 'country', np.asarray(country_names, dtype=object))
+    return df
+
+
+def clean_vintage(path, vintage=None, max_year=None):
+    """
+    Parse one WEO export into a compact long Arrow table.
+
+    Args:
+        path: Export file.
+        vintage: Label stored on every row (default: from the file name).
+        max_year: Drop years after this one (e.g. projections).
+
+    Returns:
+        pyarrow.Table: vintage, iso, country, subject_code, year, value with
+        dictionary-encoded text columns; rows without a value are dropped.
+    """
+    import pyarrow as pa
+
+    vintage = vintage or vintage_from_filename(path)
+    raw = read_export(path)
+    # the final row is a source statement, not data
+    raw = raw[raw['weo_subject_code'].notna()]
+    years = [y for y in year_columns(raw) if max_year is None or int(y) <= max_year]
+
+    values = parse_year_block(raw, years)
+    n_rows, n_years = values.shape
+    flat = values.ravel()  # row-major: every year of row 1, then row 2, ...
+    keep = ~np.isnan(flat)
+    row_index = np.repeat(np.arange(n_rows), n_years)[keep]
+    year_index = np.tile(np.array([int(y) for y in years], dtype='int16'), n_rows)[keep]
+
+    def dictionary(column):
+        codes, categories = pd.factorize(raw[column])
+        codes = codes[row_index]
+        indices = pa.array(codes, pa.int32(), mask=codes < 0)  # -1 = missing
+        return pa.DictionaryArray.from_arrays(indices, pa.array(categories.astype(str), pa.string()))
+
+    return pa.table({
+        'vintage': pa.DictionaryArray.from_arrays(pa.array(np.zeros(keep.sum(), dtype='int32')),
+                                                  pa.array([vintage])),
+        'iso': dictionary('iso'),
+        'country': dictionary('country'),
+        'subject_code': dictionary('weo_subject_code'),
+        'year': pa.array(year_index),
+        'value': pa.array(flat[keep]),
+    })
+
+
+def _vintage_worker(path, max_year):
+    """Process-pool task: parse one export, return it as Arrow IPC bytes."""
+    import pyarrow as pa
+
+    try:
+        table = clean_vintage(path, max_year=max_year)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return path, sink.getvalue().to_pybytes(), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def find_exports(directory):
+    """WEO export files (*.xls / *.tsv / *.txt) in a directory, sorted by name."""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(('.xls', '.tsv', '.txt'))
+    )
+
+
+def process_vintages(paths, workers=None, max_year=None):
+    """
+    Parse many WEO exports in parallel worker processes.
+
+    A failing file is reported and skipped; it never stops the other files.
+
+    Args:
+        paths: Export files.
+        workers: Worker processes (default: one per core).
+        max_year: Drop years after this one.
+
+    Returns:
+        tuple: (pyarrow.Table with every vintage, {path: error message})
+    """
+    import pyarrow as pa
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    tables = {}
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_vintage_worker, path, max_year) for path in paths]
+        for future in as_completed(futures):
+            try:
+                path, payload, error = future.result()
+            except Exception as e:  # worker process died
+                failures[paths[futures.index(future)]] = f"{type(e).__name__}: {e}"
+                continue
+            if error:
+                failures[path] = error
+                print(f"  failed: {os.path.basename(path)} ({error})")
+            else:
+                tables[path] = pa.ipc.open_stream(payload).read_all()
+                print(f"  parsed: {os.path.basename(path)} ({tables[path].num_rows:,} values)")
+
+    if not tables:
+        return None, failures
+    # Dictionaries differ per vintage; unify them so the merged table stays compact
+    merged = pa.concat_tables([tables[p] for p in paths if p in tables]).unify_dictionaries()
+    return merged.combine_chunks(), failures
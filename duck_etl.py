@@ -2,22 +2,53 @@
 
 import duckdb
 import pandas as pd
+from cmu_datasets.duck import get_manager
+from cmu_datasets.profiling import traced
+from cmu_datasets.records import record_type
+from cmu_datasets.validate import TITANIC_RULES, validate
+
+# Row types of the join results below (typed columns, rows are views)
+JoinedRows = record_type('JoinedRow', {
+    'passenger_id': 'str',
+    'sex': 'category',
+    'class': 'category',
+    'meal_type': 'category',
+    'weight_kgs': 'float64',
+})
+AnalysisRows = record_type('AnalysisRow', {
+    'passenger_id': 'str',
+    'sex': 'category',
+    'survived': 'bool',
+    'passenger_class': 'category',
+    'age': 'float64',
+    'meal_type': 'category',
+    'weight_kgs': 'float64',
+    'dining_status': 'category',
+    'luggage_status': 'category',
+})
 
 # Step 1: Import DuckDB and connect to a database file
 # This creates a new file called "titanic.duckdb" (or connects to existing one)
-conn = duckdb.connect("titanic.duckdb")
+conn = traced(duckdb.connect("titanic.duckdb"))
 
 # Step 2: Define your three Titanic CSV file paths
 csv_file1 = "clean/titanic/titanic.csv"           # Main passenger data
 csv_file2 = "clean/titanic/titanic_restaurant.csv"  # Restaurant/dining data
 csv_file3 = "clean/titanic/titanic_luggage.csv"     # Luggage data
 
-# Step 3: Create first table from main Titanic CSV file
-# This reads the main passenger data and creates a table called 'passengers'
-conn.execute("""
-    CREATE TABLE passengers AS 
-    SELECT * FROM read_csv('clean/titanic/titanic.csv')
-""")
+# Step 3: Read the three CSV files and validate them before creating any table
+# (unique passenger ids, every restaurant / luggage row belongs to a passenger)
+passengers_csv = conn.execute(f"SELECT * FROM read_csv('{csv_file1}')").to_arrow_table()
+restaurant_csv = conn.execute(f"SELECT * FROM read_csv('{csv_file2}')").to_arrow_table()
+luggage_csv = conn.execute(f"SELECT * FROM read_csv('{csv_file3}')").to_arrow_table()
+report = validate({'passengers': passengers_csv, 'restaurant': restaurant_csv,
+                   'luggage': luggage_csv}, TITANIC_RULES)
+print("Validating CSV files...")
+print(report)
+report.raise_for_errors()
+
+# This creates a table called 'passengers' from the main passenger data
+conn.execute("CREATE TABLE passengers AS SELECT * FROM passengers_csv")
 
 # Step 4: Verify the passengers table was created
 result = conn.execute("SELECT COUNT(*) FROM passengers").fetchone()
@@ -30,20 +61,14 @@ for column in schema:
     print(f"  {column[0]} ({column[1]})")
 
 # Step 6: Create second table from restaurant CSV file
-conn.execute("""
-    CREATE TABLE restaurant AS 
-    SELECT * FROM read_csv('clean/titanic/titanic_restaurant.csv')
-""")
+conn.execute("CREATE TABLE restaurant AS SELECT * FROM restaurant_csv")
 
 # Step 7: Verify the restaurant table
 result = conn.execute("SELECT COUNT(*) FROM restaurant").fetchone()
 print(f"\nRestaurant table created with {result[0]} rows")
 
 # Step 8: Create third table from luggage CSV file
-conn.execute("""
-    CREATE TABLE luggage AS 
-    SELECT * FROM read_csv('clean/titanic/titanic_luggage.csv')
-""")
+conn.execute("CREATE TABLE luggage AS SELECT * FROM luggage_csv")
 
 # Step 9: Verify the luggage table
 result = conn.execute("SELECT COUNT(*) FROM luggage").fetchone()
@@ -74,43 +99,47 @@ print(f"Sample passenger_ids from luggage table: {[row[0] for row in luggage_ids
 
 # Step 13: Test a join query across tables using passenger_id
 print("\nTesting joins using passenger_id...")
-joined_data = conn.execute("""
+joined_data = JoinedRows.from_query(conn.execute("""
     SELECT 
         p.passenger_id,
-        p.name,
+        p.sex,
         p.class,
-        r.meal_preference,
-        l.luggage_weight
+        r.meal_type,
+        l.weight_kgs
     FROM passengers p
     LEFT JOIN restaurant r ON p.passenger_id = r.passenger_id
     LEFT JOIN luggage l ON p.passenger_id = l.passenger_id
     LIMIT 5
-""").fetchall()
+"""))
 
 print(f"Joined data sample (5 rows):")
-for row in joined_data:
-    print(f"  {row}")
+for row in joined_data.scan():
+    print(f"  {row.as_tuple()}")
 
 # Step 14: Close the connection (saves the database file)
 conn.close()
 print("\nTitanic database saved as 'titanic.duckdb'")
 
 # Step 15: Test that the Titanic database file was created and can be reopened
+# Reopen read-only: checks like these don't need (or block on) the write lock
 print("\nTesting that the Titanic database file was saved correctly...")
-test_conn = duckdb.connect("titanic.duckdb")
+titanic_db = get_manager("titanic.duckdb", read_only=True)
+test_conn = traced(titanic_db.cursor())
 tables_check = test_conn.execute("SHOW TABLES").fetchall()
 print(f"Reopened database contains tables: {[table[0] for table in tables_check]}")
 
-# Check total passengers across all tables
-total_passengers = test_conn.execute("SELECT COUNT(DISTINCT passenger_id) FROM passengers").fetchone()[0]
-total_restaurant = test_conn.execute("SELECT COUNT(DISTINCT passenger_id) FROM restaurant").fetchone()[0] 
-total_luggage = test_conn.execute("SELECT COUNT(DISTINCT passenger_id) FROM luggage").fetchone()[0]
+# Check total passengers across all tables (one statement)
+total_passengers, total_restaurant, total_luggage = test_conn.execute("""
+    SELECT (SELECT COUNT(DISTINCT passenger_id) FROM passengers),
+           (SELECT COUNT(DISTINCT passenger_id) FROM restaurant),
+           (SELECT COUNT(DISTINCT passenger_id) FROM luggage)
+""").fetchone()
 
 print(f"Unique passengers in main table: {total_passengers}")
 print(f"Unique passengers with restaurant data: {total_restaurant}")
 print(f"Unique passengers with luggage data: {total_luggage}")
 
-test_conn.close()
+titanic_db.close()
 
 print("✅ Success! Your Titanic DuckDB database file is ready to use.")
 
@@ -120,11 +149,11 @@ print("ALTERNATIVE METHOD - Direct CSV reading for Titanic:")
 print("="*50)
 
 # Step A: Connect to a new database file
-conn2 = duckdb.connect("titanic_direct.duckdb")
+conn2 = traced(duckdb.connect("titanic_direct.duckdb"))
 
 # Step B: Create tables directly with descriptive names
 conn2.execute("CREATE TABLE titanic_passengers AS SELECT * FROM 'clean/titanic/titanic.csv'")
-conn2.execute("CREATE TABLE titanic_dining AS SELECT * FROM 'clean/titanic/titanic_restaraunt.csv'")
+conn2.execute("CREATE TABLE titanic_dining AS SELECT * FROM 'clean/titanic/titanic_restaurant.csv'")
 conn2.execute("CREATE TABLE titanic_baggage AS SELECT * FROM 'clean/titanic/titanic_luggage.csv'")
 
 # Step C: Verify all tables and test a comprehensive join
@@ -132,15 +161,15 @@ tables2 = conn2.execute("SHOW TABLES").fetchall()
 print(f"Direct method created tables: {[table[0] for table in tables2]}")
 
 # Test comprehensive Titanic analysis query
-analysis_query = conn2.execute("""
+analysis_query = AnalysisRows.from_query(conn2.execute("""
     SELECT 
         p.passenger_id,
-        p.name,
+        p.sex,
         p.survived,
-        p.class,
+        p.class AS passenger_class,
         p.age,
-        d.meal_preference,
-        b.luggage_weight,
+        d.meal_type,
+        b.weight_kgs,
         CASE 
             WHEN d.passenger_id IS NOT NULL THEN 'Has dining data'
             ELSE 'No dining data'
@@ -153,11 +182,11 @@ analysis_query = conn2.execute("""
     LEFT JOIN titanic_dining d ON p.passenger_id = d.passenger_id
     LEFT JOIN titanic_baggage b ON p.passenger_id = b.passenger_id
     LIMIT 10
-""").fetchall()
+"""))
 
 print("Comprehensive Titanic analysis (10 passengers):")
-for row in analysis_query:
-    print(f"  Passenger {row[0]}: {row[1]} - Survived: {row[2]} - Class: {row[3]}")
+for row in analysis_query.scan():
+    print(f"  Passenger {row.passenger_id}: {row.sex} - Survived: {row.survived} - Class: {row.passenger_class}")
 
 # Step D: Close the second database
 conn2.close()
@@ -169,13 +198,13 @@ print("="*50)
 
 try:
     # Step 1: Connect
-    conn3 = duckdb.connect("titanic_safe.duckdb")
+    conn3 = traced(duckdb.connect("titanic_safe.duckdb"))
     print("✅ Connected to Titanic database")
     
     # Step 2: List of Titanic CSV files with meaningful table names
     csv_files = [
         "clean/titanic/titanic.csv", 
-        "clean/titanic/titanic_restaraunt.csv", 
+        "clean/titanic/titanic_restaurant.csv", 
         "clean/titanic/titanic_luggage.csv"
     ]
     table_names = ["main_passengers", "dining_records", "luggage_records"]
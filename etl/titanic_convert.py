@@ -1,110 +1,149 @@
 import pandas as pd
 import os
+from cmu_datasets import parquet
+from cmu_datasets.pipeline import Pipeline
 
 output_dir = 'clean/titanic'
-os.makedirs(output_dir, exist_ok=True)
+# the curated passenger table (with passenger_id, the key of the restaurant /
+# luggage tables); every other format in output_dir is written from it
+source_csv = f'{output_dir}/titanic.csv'
+
+pipeline = Pipeline("titanic_convert")
+
+
+@pipeline.stage("read csv")
+def read_csv(_):
+    os.makedirs(output_dir, exist_ok=True)
+    return pd.read_csv(source_csv)
 
-df = pd.read_csv('clean/titanic.csv')
 
 # 1. CSV Variations (pandas.DataFrame.to_csv)
 
-df.to_csv(f'{output_dir}/titanic.csv', index=False)  # Standard comma
-df.to_csv(f'{output_dir}/titanic_semicolon.csv', sep=';', index=False)  # European
-df.to_csv(f'{output_dir}/titanic_pipe.csv', sep='|', index=False)  # Pipe-delimited
+@pipeline.stage("write csv variants")
+def write_csv_variants(df):
+    # Standard comma: source_csv itself, not rewritten
+    df.to_csv(f'{output_dir}/titanic_semicolon.csv', sep=';', index=False)  # European
+    df.to_csv(f'{output_dir}/titanic_pipe.csv', sep='|', index=False)  # Pipe-delimited
+
+    # 2. TSV (pandas.DataFrame.to_csv with tab separator)
+    df.to_csv(f'{output_dir}/titanic.tsv', sep='\t', index=False)
+    return df
 
-# 2. TSV (pandas.DataFrame.to_csv with tab separator)
-df.to_csv(f'{output_dir}/titanic.tsv', sep='\t', index=False)
 
 # 3. JSON Formats (pandas.DataFrame.to_json)
 
-df.to_json(f'{output_dir}/titanic_records.json', orient='records', indent=2)
-df.to_json(f'{output_dir}/titanic_index.json', orient='index', indent=2)
-df.to_json(f'{output_dir}/titanic_values.json', orient='values', indent=2)
-df.to_json(f'{output_dir}/titanic_split.json', orient='split', indent=2)
-df.to_json(f'{output_dir}/titanic_table.json', orient='table', indent=2)
+@pipeline.stage("write json formats")
+def write_json_formats(df):
+    df.to_json(f'{output_dir}/titanic_records.json', orient='records', indent=2)
+    df.to_json(f'{output_dir}/titanic_index.json', orient='index', indent=2)
+    df.to_json(f'{output_dir}/titanic_values.json', orient='values', indent=2)
+    df.to_json(f'{output_dir}/titanic_split.json', orient='split', indent=2)
+    df.to_json(f'{output_dir}/titanic_table.json', orient='table', indent=2)
+    return df
 
-# 4. Parquet (pandas.DataFrame.to_parquet)
 
-try:
-    df.to_parquet(f'{output_dir}/titanic.parquet', index=False)
-    print("success")
-except ImportError:
-    print("failure")
+# 4. Parquet (codec / encoding chosen per column, cmu_datasets.parquet)
+
+@pipeline.stage("write parquet")
+def write_parquet(df):
+    try:
+        parquet.write_parquet(df, f'{output_dir}/titanic.parquet')
+        print("success")
+    except ImportError:
+        print("failure")
+    return df
+
 
 # 5. Feather (pandas.DataFrame.to_feather)
-try:
-    df.to_feather(f'{output_dir}/titanic.feather')
-    print("success")
-except ImportError:
-    print("failure")
+
+@pipeline.stage("write feather")
+def write_feather(df):
+    try:
+        df.to_feather(f'{output_dir}/titanic.feather')
+        print("success")
+    except ImportError:
+        print("failure")
+    return df
+
 
 # 6. Pickle (pandas.DataFrame.to_pickle)
 
-df.to_pickle(f'{output_dir}/titanic.pkl')
+@pipeline.stage("write pickle")
+def write_pickle(df):
+    df.to_pickle(f'{output_dir}/titanic.pkl')
+    return df
 
 
 # 7. Excel (pandas.DataFrame.to_excel)
-try:
-    # Single sheet
-    df.to_excel(f'{output_dir}/titanic.xlsx', index=False, sheet_name='Passengers')
-    
-    # Multiple sheets
-    with pd.ExcelWriter(f'{output_dir}/titanic_multi.xlsx') as writer:
-        df.to_excel(writer, sheet_name='All_Passengers', index=False)
-        survivors = df[df['survived'] == 1]
-        non_survivors = df[df['survived'] == 0]
-        survivors.to_excel(writer, sheet_name='Survivors', index=False)
-        non_survivors.to_excel(writer, sheet_name='Non_Survivors', index=False)
-    
-    print("success")
-except ImportError:
-    print("failure")
-
-
-files_in_output = []
-if os.path.exists(output_dir):
-    for file in sorted(os.listdir(output_dir)):
-        file_path = os.path.join(output_dir, file)
-        if os.path.isfile(file_path):
-            size = os.path.getsize(file_path)
-            files_in_output.append((file, size))
-
-print(f"{'Filename':<25} {'Size (bytes)':<12} {'Size (KB)':<10} {'Format Type'}")
-print("-" * 65)
-
-for filename, size in files_in_output:
-    size_kb = size / 1024
-    
-    # Determine format type
-    if filename.endswith('.csv') or filename.endswith('.tsv'):
-        format_type = "Text"
-    elif filename.endswith('.json'):
-        format_type = "Text"
-    else:
-        format_type = "Binary"
-    
-    print(f"{filename:<25} {size:<12,} {size_kb:<10.1f} {format_type}")
+
+@pipeline.stage("write excel")
+def write_excel(df):
+    try:
+        # Single sheet
+        df.to_excel(f'{output_dir}/titanic.xlsx', index=False, sheet_name='Passengers')
+        
+        # Multiple sheets
+        with pd.ExcelWriter(f'{output_dir}/titanic_multi.xlsx') as writer:
+            df.to_excel(writer, sheet_name='All_Passengers', index=False)
+            survivors = df[df['survived'] == 1]
+            non_survivors = df[df['survived'] == 0]
+            survivors.to_excel(writer, sheet_name='Survivors', index=False)
+            non_survivors.to_excel(writer, sheet_name='Non_Survivors', index=False)
+        
+        print("success")
+    except ImportError:
+        print("failure")
+    return df
+
+
+@pipeline.stage("list output files")
+def list_output_files(df):
+    files_in_output = []
+    if os.path.exists(output_dir):
+        for file in sorted(os.listdir(output_dir)):
+            file_path = os.path.join(output_dir, file)
+            if os.path.isfile(file_path):
+                size = os.path.getsize(file_path)
+                files_in_output.append((file, size))
+
+    print(f"{'Filename':<25} {'Size (bytes)':<12} {'Size (KB)':<10} {'Format Type'}")
+    print("-" * 65)
+
+    for filename, size in files_in_output:
+        size_kb = size / 1024
+        
+        # Determine format type
+        if filename.endswith('.csv') or filename.endswith('.tsv'):
+            format_type = "Text"
+        elif filename.endswith('.json'):
+            format_type = "Text"
+        else:
+            format_type = "Binary"
+        
+        print(f"{filename:<25} {size:<12,} {size_kb:<10.1f} {format_type}")
+    return df
+
 
 # READING IN 
 
-# Test text format
-csv_test = pd.read_csv(f'{output_dir}/titanic.csv')
-print(f"CSV read successfully: {csv_test.shape}")
+@pipeline.stage("read back and verify")
+def read_back_and_verify(df):
+    # Test text format
+    csv_test = pd.read_csv(f'{output_dir}/titanic.csv')
+    print(f"CSV read successfully: {csv_test.shape}")
 
-# Test JSON format
-json_test = pd.read_json(f'{output_dir}/titanic_records.json')
-print(f"JSON read successfully: {json_test.shape}")
+    # Test JSON format
+    json_test = pd.read_json(f'{output_dir}/titanic_records.json')
+    print(f"JSON read successfully: {json_test.shape}")
 
-# Test binary format (pickle always works)
-pickle_test = pd.read_pickle(f'{output_dir}/titanic.pkl')
-print(f"Pickle read successfully: {pickle_test.shape}")
+    # Test binary format (pickle always works)
+    pickle_test = pd.read_pickle(f'{output_dir}/titanic.pkl')
+    print(f"Pickle read successfully: {pickle_test.shape}")
 
-# Verify data integrity
-print(f"All formats contain same data: {df.equals(csv_test) and df.equals(json_test) and df.equals(pickle_test)}")
+    # Verify data integrity
+    print(f"All formats contain same data: {df.equals(csv_test) and df.equals(json_test) and df.equals(pickle_test)}")
+    return df
 
-print("\n" + "="*70)
-print("FORMAT CHARACTERISTICS")
-print("="*70)
 
 characteristics = '''
 TEXT FORMATS (Human Readable):
@@ -126,7 +165,15 @@ PANDAS ADVANTAGES:
 ✓ Memory-efficient reading
 '''
 
-print(characteristics)
 
-print(f"\n✓ All files created in {output_dir}/")
-print("✓ Students can now compare formats and understand trade-offs")
+if __name__ == "__main__":
+    pipeline.main()
+
+    print("\n" + "="*70)
+    print("FORMAT CHARACTERISTICS")
+    print("="*70)
+
+    print(characteristics)
+
+    print(f"\n✓ All files created in {output_dir}/")
+    print("✓ Students can now compare formats and understand trade-offs")
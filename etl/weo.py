@@ -1,54 +1,67 @@
-import pandas as pd
-import janitor
-
-
-raw = pd.read_csv('data/weo-2025-04-full.xls', sep='\t', encoding='utf-16-le')
-raw = raw.clean_names() # improve the column names
-
-# remove projection columns. 2025 and above.
-
-years_to_drop = ['2025', '2026', '2027', '2028', '2029', '2030']
-raw = raw.drop(columns=years_to_drop)
+from collections import namedtuple
 
+from cmu_datasets.dimensions import CountryDimension
+from cmu_datasets.parquet import write_parquet
+from cmu_datasets.pipeline import Pipeline
+from cmu_datasets.weo import most_recent, parse_year_block, read_export, simple_panel
 
+pipeline = Pipeline("weo")
 
+# Get year columns (1980-2024)
+year_cols = [str(year) for year in range(1980, 2025)]
 
-# remove final row that is a source statement
+# from parsing on, stages hand on the export rows together with their year
+# columns as one contiguous float64 block (rows, years), the block's year
+# labels and, once keyed, the country dimension (keyed by country_id)
+Export = namedtuple('Export', ['raw', 'block', 'years', 'countries'])
 
-# Get year columns
-year_cols = [str(year) for year in range(1980, 2025)]
 
-# Convert year columns from string to numeric, removing commas
-for col in year_cols:
-    if col in raw.columns:
-        raw[col] = pd.to_numeric(raw[col].astype(str).str.replace(',', ''), errors='coerce')
+@pipeline.stage("read export (utf-16)")
+def read_weo_export(_):
+    return read_export('data/weo-2025-04-full.xls')
 
 
+@pipeline.stage("drop projections")
+def drop_projections(raw):
+    # remove projection columns. 2025 and above.
+    years_to_drop = ['2025', '2026', '2027', '2028', '2029', '2030']
+    return raw.drop(columns=years_to_drop)
 
-raw = raw[:-1].copy()
 
-# append country information
-country_info = pd.read_csv("data/country_info.csv")
+@pipeline.stage("parse year columns")
+def parse_year_columns(raw):
+    # Convert year columns from string to numeric, removing commas and
+    # n/a / -- sentinels, in one vectorized pass over all columns; the block
+    # is handed on as is rather than written back into the frame
+    years = [col for col in year_cols if col in raw.columns]
+    return Export(raw, parse_year_block(raw, years), years, None)
 
-raw = raw.merge(country_info, on='country', how='left')
 
+@pipeline.stage("drop source row")
+def drop_source_row(export):
+    # remove final row that is a source statement
+    return export._replace(raw=export.raw[:-1].copy(), block=export.block[:-1])
 
-# get most recent value
+# country columns carried into the simple data frame
+country_cols = ['region7', 'econ_group', 'group_g7', 'group_european_union', 'group_asean5']
 
-# Get the year columns (1980-2024)
-year_cols = [str(year) for year in range(1980, 2025)]
 
-# Create the most_recent column (LAST non-null value, going right to left)
-raw['most_recent'] = raw[year_cols].ffill(axis=1).iloc[:, -1]
+@pipeline.stage("encode country keys")
+def encode_country_keys(export):
+    # the fact table only carries the integer key; country information is
+    # looked up by key when the simple panel is built
+    countries = CountryDimension.from_csv("data/country_info.csv", name='country')
+    export.raw['country_id'] = countries.encode(names=export.raw['country'])
+    return export._replace(countries=countries)
 
-# Create the most_recent_year column (which year it came from)
-def get_most_recent_year(row):
-    for year in reversed(year_cols):  # Start from 2024 and go backwards
-        if pd.notna(row[year]):
-            return year
-    return None
 
-raw['most_recent_year'] = raw.apply(get_most_recent_year, axis=1)
+@pipeline.stage("most recent value")
+def most_recent_value(export):
+    # Create the most_recent column (LAST non-null value, going right to left)
+    # and the most_recent_year column (which year it came from)
+    raw = export.raw
+    raw['most_recent'], raw['most_recent_year'] = most_recent(export.block, export.years)
+    return export
 
 
 # create simple data frame with core variables
@@ -60,36 +73,33 @@ subject_codes = ['PPPGDP', # GDP PPP International $
                 'LP', # population
 ]
 
-
-
-simple_df = raw[raw['weo_subject_code'].isin(subject_codes)].reset_index(drop=True)
-
-
-desired_cols = ['country', 'region7', 'subject_descriptor', 'most_recent', 'most_recent_year', 'econ_group', 'group_g7', 'group_european_union', 'group_asean5']
-simple_df = simple_df[desired_cols]
-
-
 subject_mapping = {
-    'Gross domestic product, current prices': 'gdp',
-    'Gross domestic product per capita, current prices': 'gdp_capita',
-    'Inflation, average consumer prices': 'inflation',
-    'Unemployment rate': 'unemployment',
-    'Population': 'population'
+    'PPPGDP': 'gdp',
+    'PPPPC': 'gdp_capita',
+    'PCPIPCH': 'inflation',
+    'LUR': 'unemployment',
+    'LP': 'population'
 }
 
+# column order of clean/weo-simple.csv (the original pivot's, by subject descriptor)
+simple_columns = ['gdp_capita', 'gdp', 'inflation', 'population', 'unemployment']
+
 
-# Pivot the data
-pivoted_df = simple_df.pivot(index=['country', 'region7','econ_group', 'group_g7', 'group_european_union', 'group_asean5'], 
-                            columns='subject_descriptor', 
-                            values='most_recent')
+@pipeline.stage("build simple panel")
+def build_simple_panel(export):
+    # one row per country, one column per subject code, filled in place, in
+    # clean/weo-simple.csv's column order
+    codes = sorted(subject_codes, key=lambda code: simple_columns.index(subject_mapping[code]))
+    return simple_panel(export.raw, codes, names=subject_mapping,
+                        countries=export.countries, country_columns=country_cols)
 
-# Rename the columns using the mapping
-pivoted_df = pivoted_df.rename(columns=subject_mapping)
 
-# Reset index to make country a regular column again
-pivoted_df = pivoted_df.reset_index()
+@pipeline.stage("write csv / parquet")
+def write_output(simple_df):
+    simple_df.to_csv('clean/weo-simple.csv', index=False)
+    write_parquet(simple_df, 'clean/weo-simple.parquet')
+    return simple_df
 
-# Clean up the column names (remove the name from columns index)
-pivoted_df.columns.name = None
 
-pivoted_df.to_csv('clean/weo-simple.csv', index=False)
+if __name__ == "__main__":
+    pipeline.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+WEO Observations Export
+
+Writes clean/weo/metrics.csv, the long observations table the clean/weo
+loaders read next to countries.csv and indicators.csv:
+
+    metric_id | iso_code | subject_code | year | value
+
+Only countries and subjects listed in those two files are kept, so the
+loaders' foreign-key rules hold; rows without a value are dropped.
+
+Usage:
+    python etl/weo_metrics.py data/weo-2025-04-full.xls --output clean/weo/metrics.csv
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from cmu_datasets.weo import clean_vintage
+
+
+def export_metrics(path, countries, indicators):
+    """
+    One WEO export as the metrics table.
+
+    Args:
+        path: WEO export (.xls, tab-separated UTF-16).
+        countries: countries.csv DataFrame (iso_code column).
+        indicators: indicators.csv DataFrame (subject_code column).
+
+    Returns:
+        pandas.DataFrame: metric_id, iso_code, subject_code, year, value,
+        sorted by country, subject and year.
+    """
+    table = clean_vintage(path, vintage=os.path.basename(path))
+    df = pd.DataFrame({
+        'iso_code': table.column('iso').to_pandas().astype(object),
+        'subject_code': table.column('subject_code').to_pandas().astype(object),
+        'year': table.column('year').to_numpy().astype('int64'),
+        'value': table.column('value').to_numpy(),
+    })
+    known = df['iso_code'].isin(countries['iso_code']) & df['subject_code'].isin(indicators['subject_code'])
+    df = df[known].sort_values(['iso_code', 'subject_code', 'year'], ignore_index=True)
+    df.insert(0, 'metric_id', np.arange(1, len(df) + 1))
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export WEO observations as clean/weo/metrics.csv")
+    parser.add_argument('export', nargs='?', default='data/weo-2025-04-full.xls',
+                        help="WEO export (.xls tab-separated UTF-16)")
+    parser.add_argument('--countries', default='clean/weo/countries.csv')
+    parser.add_argument('--indicators', default='clean/weo/indicators.csv')
+    parser.add_argument('--output', default='clean/weo/metrics.csv')
+    args = parser.parse_args(argv)
+
+    metrics = export_metrics(args.export, pd.read_csv(args.countries), pd.read_csv(args.indicators))
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    metrics.to_csv(args.output, index=False)
+    print(f"Wrote {len(metrics):,} observations of {metrics['iso_code'].nunique()} countries and "
+          f"{metrics['subject_code'].nunique()} subjects to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
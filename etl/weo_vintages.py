@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+WEO Multi-Vintage Build
+
+Parses every WEO export in a directory (one worker process per file) and
+merges them into one long table tagged with the vintage:
+
+    vintage | iso | country | subject_code | year | value
+
+Failures are isolated per file and listed at the end. Each column's
+Parquet codec and encoding are chosen by cmu_datasets.parquet (--policy).
+
+Usage:
+    python etl/weo_vintages.py data/ --output clean/weo/weo-vintages.parquet --policy smallest
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from cmu_datasets.parquet import POLICIES, write_parquet
+from cmu_datasets.weo import find_exports, process_vintages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge WEO vintages into one long table")
+    parser.add_argument('directory', help="directory of WEO exports (.xls tab-separated UTF-16)")
+    parser.add_argument('--output', default='clean/weo/weo-vintages.parquet')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--max-year', type=int, default=None, help="drop years after this one")
+    parser.add_argument('--policy', default=None, choices=list(POLICIES),
+                        help="Parquet codec policy (default: $CMU_PARQUET_POLICY or balanced)")
+    args = parser.parse_args(argv)
+
+    paths = find_exports(args.directory)
+    if not paths:
+        print(f"No WEO exports found in {args.directory}")
+        return 1
+    # before the parsing, so a bad --output fails fast
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+
+    print(f"Processing {len(paths)} vintages...")
+    start = time.perf_counter()
+    table, failures = process_vintages(paths, workers=args.workers, max_year=args.max_year)
+
+    if table is not None:
+        write_parquet(table, args.output, policy=args.policy)
+        vintages = table.column('vintage').unique().to_pylist()
+        print(f"\nWrote {table.num_rows:,} values from {len(vintages)} vintages to {args.output}")
+    print(f"Elapsed: {time.perf_counter() - start:.1f}s")
+
+    if failures:
+        print(f"\n{len(failures)} file(s) failed:")
+        for path, error in failures.items():
+            print(f"  {path}: {error}")
+    return 1 if table is None else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,17 @@
+import io
 import pandas as pd
 import janitor
+from cmu_datasets.http_cache import HTTPCache
+from cmu_datasets.reshape import melt_split
 
 url = "https://raw.githubusercontent.com/rahultejannavar/rawdata_indiaschool/refs/heads/main/Test%202%20-%20Sheet1.csv"
-df = pd.read_csv(url, quoting=3)
+# download once; later runs revalidate against GitHub's ETag
+response = HTTPCache(ttl=24 * 3600).get(url)
+df = pd.read_csv(io.BytesIO(response.content), quoting=3)
 
 df.iloc[:, 0] = df.iloc[:, 0].str.lstrip('"')
 df.iloc[:, -1] = df.iloc[:, -1].str.rstrip('"')
 df = df.clean_names(remove_special='"')
 
-df_long = pd.melt(df, id_vars = "state_ut")
-df_long[['level', 'category']] = df_long['variable'].str.split('_', expand=True)
+# melt and split level_category in one step; level/category come back as categoricals
+df_long = melt_split(df, id_vars = "state_ut")
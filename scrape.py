@@ -1,5 +1,9 @@
 import time
 import requests
+from cmu_datasets.http_cache import HTTPCache
+
+# Keep pages on disk between runs; stale pages are revalidated, not re-downloaded
+cache = HTTPCache(ttl=24 * 3600)
 
 url = "https://www.cmu.edu/"
 
@@ -11,7 +15,7 @@ headers = {
     "User-Agent": "Educational Web Scraper - Python 2 CMU Course Project"
 }
 
-response = requests.get(url, headers=headers)
+response = cache.get(url, headers=headers)
 
 response.text
 
@@ -50,12 +54,12 @@ soup.select("li")
 [li.text for li in soup.find_all("li")]
 
 soup.find('h1', class_="main-heading").text
- 
+
 soup.find(id="content")
 
 
 import requests
-response = requests.get("https://www.cmu.edu/")
+response = cache.get("https://www.cmu.edu/")
 cmu_homepage = response.text
 soup = BeautifulSoup(cmu_homepage, "html.parser")
 
@@ -72,7 +76,7 @@ soup.find(class_="ftgkle").get_text(strip = True)
 # data
 
 
-response = requests.get(url).text
+response = cache.get(url).text
 soup = BeautifulSoup(response, "html.parser")
 
 
@@ -82,22 +86,34 @@ url = "https://www.olympics.com/en/olympic-games/paris-2024/results/swimming/wom
 
 url = "https://eredivisie.eu/competition/table/"
 # headers = {'User-Agent': 'Educational Web Scraper'}
-response = requests.get(url)
-soup = BeautifulSoup(response.text, 'html.parser')
+response = cache.get(url)
 
 
 import pandas as pd
-# Look for results table
-table = soup.find('table')
+from cmu_datasets.tables import read_table, read_tables
+
+def parse_table(html):
+    # Look for results table and convert it in one streaming pass
+    # (first row becomes column headers, numeric columns are typed,
+    # rowspan/colspan cells are expanded)
+    return read_table(html)
+
+df = parse_table(response.text)
+
+
+# many pages at once
+# fetch_pages downloads concurrently but politely: at most `per_host` requests
+# in flight and `rate` requests per second to each server, with retries
+
+from cmu_datasets.fetch import fetch_pages
 
-# After you have: table = soup.find('table')
-rows = []
+urls = [
+    "https://eredivisie.eu/competition/table/",
+    "https://eredivisie.eu/competition/results/",
+]
+results = fetch_pages(urls, parse=parse_table, headers=headers, rate=1.0, per_host=2, cache=cache)
 
-# Extract all table rows
-for tr in table.find_all('tr'):
-    # Get text from each cell (td or th)
-    row_data = [cell.get_text(strip=True) for cell in tr.find_all(['td', 'th'])]
-    rows.append(row_data)
+tables = {r.url: r.data for r in results if r.data is not None}
 
-# Convert to DataFrame (first row becomes column headers)
-df = pd.DataFrame(rows[1:], columns=rows[0])
+# every table on a page in the same pass
+all_tables = read_tables(response.text)
@@ -0,0 +1,66 @@
+import http.server
+import threading
+import time
+
+import pytest
+
+
+class Server:
+    """Local HTTP server answering each path from a scripted list of responses."""
+
+    def __init__(self):
+        self.routes = {}    # path -> [(status, headers, body), ...]; the last one repeats
+        self.requests = []  # (path, request headers, monotonic time)
+        self._lock = threading.Lock()
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.01},
+                                        daemon=True)
+        self._thread.start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self._httpd.server_port}{path}"
+
+    def plan(self, path, *responses):
+        """Answer `path` with these (status, headers, body) responses in turn."""
+        self.routes[path] = list(responses)
+
+    def hits(self, path):
+        return [r for r in self.requests if r[0] == path]
+
+    def stop(self):
+        if self._thread.is_alive():
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    def _respond(self, path, headers):
+        with self._lock:
+            self.requests.append((path, headers, time.monotonic()))
+            responses = self.routes.get(path, [(404, {}, b'not found')])
+            response = responses.pop(0) if len(responses) > 1 else responses[0]
+        return response
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, headers, body = server._respond(self.path, dict(self.headers))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if 'Content-Length' not in headers:
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def server():
+    server = Server()
+    yield server
+    server.stop()
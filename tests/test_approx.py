@@ -0,0 +1,46 @@
+import math
+
+import duckdb
+import pytest
+
+from cmu_datasets.approx import summarize
+
+
+@pytest.fixture
+def conn():
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE t AS SELECT (i * 7919) % 1000 AS v, i % 50 AS g FROM range(200000) r(i)")
+    conn.execute("CREATE VIEW vw AS SELECT * FROM t")
+    yield conn
+    conn.close()
+
+
+def by_statistic(summary):
+    return summary.set_index('statistic')
+
+
+def test_reservoir_on_a_view_is_not_reported_as_exact(conn):
+    summary = summarize(conn, 'vw', 'v', method='reservoir', sample_rows=1000)
+    stats = by_statistic(summary)
+    assert summary.attrs['fraction'] == pytest.approx(1000 / 200000)
+    assert stats.loc['rows', 'estimate'] == 200000
+    assert math.isnan(stats.loc['min', 'low'])  # the true minimum may be below the sample's
+    assert stats.loc['mean', 'high'] > stats.loc['mean', 'low']
+
+
+def test_reservoir_larger_than_the_view_is_complete(conn):
+    summary = summarize(conn, 'vw', 'v', method='reservoir', sample_rows=500000)
+    stats = by_statistic(summary)
+    assert summary.attrs['fraction'] == 1.0
+    assert (stats.loc['min', 'low'], stats.loc['max', 'high']) == (0, 999)
+
+
+def test_sample_bounds_cover_the_exact_values_at_about_their_confidence(conn):
+    exact = by_statistic(summarize(conn, 't', 'v', exact=True))['estimate']
+    covered = {statistic: 0 for statistic in ['mean', 'p25', 'p50', 'p75']}
+    for seed in range(20):
+        sampled = by_statistic(summarize(conn, 't', 'v', sample_rows=20000, seed=seed))
+        for statistic in covered:
+            covered[statistic] += sampled.loc[statistic, 'low'] <= exact[statistic] <= sampled.loc[statistic, 'high']
+    # 95% bounds: at least 17 of 20 seeded samples should cover the exact value
+    assert min(covered.values()) >= 17, covered
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from cmu_datasets.fetch import TokenBucket, fetch_pages
+from cmu_datasets.http_cache import HTTPCache
+
+OK = (200, {'Content-Type': 'text/html; charset=utf-8'}, b'<p>ok</p>')
+
+
+def test_retries_server_errors_then_succeeds(server):
+    server.plan('/flaky', (503, {}, b''), (500, {}, b''), OK)
+    [result] = fetch_pages([server.url('/flaky')], backoff=0.01, rate=100)
+    assert (result.status, result.text, result.attempts) == (200, '<p>ok</p>', 3)
+    assert len(server.hits('/flaky')) == 3
+
+
+def test_gives_up_after_retries(server):
+    server.plan('/down', (502, {}, b'bad gateway'))
+    [result] = fetch_pages([server.url('/down')], retries=2, backoff=0.01, rate=100)
+    assert (result.status, result.attempts) == (502, 3)
+    assert len(server.hits('/down')) == 3
+
+
+def test_client_errors_are_not_retried(server):
+    [result] = fetch_pages([server.url('/missing')], backoff=0.01, rate=100)
+    assert (result.status, result.attempts) == (404, 1)
+
+
+def test_429_waits_for_retry_after(server):
+    server.plan('/limited', (429, {'Retry-After': '1'}, b''), OK)
+    [result] = fetch_pages([server.url('/limited')], backoff=0.01, rate=100)
+    first, second = (t for _, _, t in server.hits('/limited'))
+    assert (result.status, result.attempts) == (200, 2)
+    assert second - first >= 0.95
+
+
+def test_connection_errors_become_results(server):
+    url = server.url('/gone')
+    server.stop()
+    [result] = fetch_pages([url], retries=1, backoff=0.01, rate=100)
+    assert result.status is None and result.error is not None and result.attempts == 2
+
+
+def test_rate_limit_spaces_requests_per_host(server):
+    server.plan('/page', OK)
+    urls = [server.url('/page')] * 5
+    results = fetch_pages(urls, rate=20, burst=1, per_host=5)
+    times = sorted(t for _, _, t in server.hits('/page'))
+    assert [r.status for r in results] == [200] * 5
+    # one token every 1/20 s after the first request
+    assert times[-1] - times[0] >= 4 / 20 * 0.9
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    async def run():
+        bucket = TokenBucket(rate=10, capacity=3)
+        start = time.monotonic()
+        stamps = []
+        for _ in range(5):
+            await bucket.acquire()
+            stamps.append(time.monotonic() - start)
+        return stamps
+
+    stamps = asyncio.run(run())
+    assert stamps[2] < 0.05
+    assert stamps[4] >= 0.18
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_parse_runs_on_successful_pages(server):
+    server.plan('/page', OK)
+    [ok, missing] = fetch_pages([server.url('/page'), server.url('/missing')], parse=len, rate=100)
+    assert ok.data == len('<p>ok</p>')
+    assert missing.data is None
+
+
+def test_fresh_cache_entries_skip_the_network(server, tmp_path):
+    server.plan('/cached', OK)
+    cache = HTTPCache(str(tmp_path / 'http.sqlite'), ttl=3600)
+    first = fetch_pages([server.url('/cached')], cache=cache, rate=100)[0]
+    second = fetch_pages([server.url('/cached')], cache=cache, rate=100)[0]
+    assert (first.attempts, second.attempts) == (1, 0)
+    assert second.text == first.text
+    assert len(server.hits('/cached')) == 1
@@ -0,0 +1,112 @@
+import gzip
+import time
+
+import pytest
+
+from cmu_datasets.http_cache import HTTPCache
+
+PAGE = b'<html>' + b'x' * 200 + b'</html>'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPCache(str(tmp_path / 'http.sqlite'), ttl=3600)
+    yield cache
+    cache.close()
+
+
+def test_fresh_entry_is_served_without_a_request(server, cache):
+    server.plan('/page', (200, {'Content-Type': 'text/html'}, PAGE))
+    first = cache.get(server.url('/page'))
+    second = cache.get(server.url('/page'))
+    assert (first.from_cache, second.from_cache) == (False, True)
+    assert second.content == PAGE
+    assert len(server.hits('/page')) == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(server, cache):
+    cache.ttl = 0
+    server.plan('/page', (200, {'ETag': '"v1"'}, PAGE), (304, {'ETag': '"v1"'}, b''))
+    cache.get(server.url('/page'))
+    response = cache.get(server.url('/page'))
+    (_, first, _), (_, second, _) = server.hits('/page')
+    assert 'If-None-Match' not in first
+    assert second['If-None-Match'] == '"v1"'
+    assert (response.status, response.from_cache, response.content) == (200, True, PAGE)
+
+
+def test_stale_entry_is_revalidated_with_last_modified(server, cache):
+    cache.ttl = 0
+    modified = 'Wed, 01 Oct 2025 00:00:00 GMT'
+    server.plan('/page', (200, {'Last-Modified': modified}, PAGE), (304, {}, b''))
+    cache.get(server.url('/page'))
+    response = cache.get(server.url('/page'))
+    assert server.hits('/page')[1][1]['If-Modified-Since'] == modified
+    assert response.from_cache
+
+
+def test_changed_page_replaces_the_entry(server, cache):
+    cache.ttl = 0
+    server.plan('/page', (200, {'ETag': '"v1"'}, PAGE), (200, {'ETag': '"v2"'}, b'new'))
+    cache.get(server.url('/page'))
+    response = cache.get(server.url('/page'))
+    cached, _ = cache.lookup(server.url('/page'))
+    assert (response.from_cache, response.content) == (False, b'new')
+    assert (cached.content, cached.headers['ETag']) == (b'new', '"v2"')
+
+
+def test_refresh_resets_the_age(server, cache):
+    server.plan('/page', (200, {'ETag': '"v1"'}, PAGE), (304, {'ETag': '"v1"'}, b''))
+    cache.ttl = 0
+    cache.get(server.url('/page'))
+    before = time.time()
+    cache.get(server.url('/page'))
+    cached, _ = cache.lookup(server.url('/page'))
+    assert cached.stored_at >= before
+
+
+def test_error_responses_are_returned_not_raised_or_cached(server, cache):
+    response = cache.get(server.url('/missing'))
+    assert (response.status, response.content) == (404, b'not found')
+    assert cache.lookup(server.url('/missing')) == (None, False)
+
+
+def test_no_store_is_not_cached(server, cache):
+    server.plan('/private', (200, {'Cache-Control': 'private, no-store'}, PAGE))
+    cache.get(server.url('/private'))
+    assert cache.lookup(server.url('/private')) == (None, False)
+
+
+def test_decoded_body_is_stored_without_transfer_headers(server, cache):
+    body = gzip.compress(PAGE)
+    server.plan('/gzip', (200, {'Content-Encoding': 'gzip', 'Content-Length': str(len(body))}, body))
+    cache.get(server.url('/gzip'))
+    cached, _ = cache.lookup(server.url('/gzip'))
+    assert cached.content == PAGE
+    assert not {'content-encoding', 'content-length'} & {k.lower() for k in cached.headers}
+
+
+def test_key_varies_with_response_changing_headers():
+    url = 'https://example.org/'
+    assert HTTPCache.key(url) == HTTPCache.key(url, {'User-Agent': 'a'})
+    assert HTTPCache.key(url, {'Accept': 'text/html'}) == HTTPCache.key(url, {'accept': 'text/html'})
+    assert HTTPCache.key(url, {'Accept-Language': 'fr'}) != HTTPCache.key(url, {'Accept-Language': 'de'})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = HTTPCache(str(tmp_path / 'http.sqlite'), max_bytes=3 * 1000, level=0)
+    for name in 'abc':
+        cache.store(f'https://example.org/{name}', None, 200, {}, name.encode() * 900)
+    cache.lookup('https://example.org/a')  # a is now more recent than b
+    cache.store('https://example.org/d', None, 200, {}, b'd' * 900)
+    kept = [n for n in 'abcd' if cache.lookup(f'https://example.org/{n}')[0] is not None]
+    cache.close()
+    assert kept == ['a', 'c', 'd']
+
+
+def test_text_uses_the_declared_charset(tmp_path):
+    cache = HTTPCache(str(tmp_path / 'http.sqlite'))
+    response = cache.store('https://example.org/', None, 200,
+                           {'Content-Type': 'text/html; charset=latin-1'}, 'café'.encode('latin-1'))
+    cache.close()
+    assert response.text == 'café'
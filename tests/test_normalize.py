@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from cmu_datasets.normalize import SENTINELS, normalize, null_sentinels, sql_rows, to_bool, to_float
+
+
+@pytest.mark.parametrize('spelling', ['True', 'true', ' TRUE ', 't', 'yes', 'Y', '1', '1.0'])
+def test_true_spellings(spelling):
+    assert to_bool(pd.Series([spelling])).tolist() == [True]
+
+
+@pytest.mark.parametrize('spelling', ['False', 'f', 'no', 'N', '0', '0.0'])
+def test_false_spellings(spelling):
+    assert to_bool(pd.Series([spelling])).tolist() == [False]
+
+
+def test_missing_and_unknown_flags_take_the_default():
+    values = pd.Series(['yes', None, 'maybe', ''])
+    assert to_bool(values).tolist() == [True, False, False, False]
+    assert to_bool(values, default=True).tolist() == [True, True, True, True]
+
+
+def test_flags_from_bool_numeric_and_mixed_columns():
+    assert to_bool(pd.Series([True, None, False], dtype=object)).tolist() == [True, False, False]
+    assert to_bool(pd.Series([1.0, 0.0, np.nan, 2.0])).tolist() == [True, False, False, True]
+    assert to_bool(np.array([0, 1, 5])).tolist() == [False, True, True]
+    # an object column mixing Python bools and strings is compared as strings
+    assert to_bool(pd.Series([True, 'no', 'Yes', None], dtype=object)).tolist() == [True, False, True, False]
+
+
+@pytest.mark.parametrize('sentinel', sorted(SENTINELS) + ['N/A', ' NULL ', 'None', 'NaN'])
+def test_sentinels_become_null(sentinel):
+    assert null_sentinels(pd.Series([sentinel, 'kept'])).to_pylist() == [None, 'kept']
+
+
+def test_non_text_columns_pass_through():
+    array = pa.array([1, None, 3])
+    assert null_sentinels(array) is array
+
+
+def test_numbers_parse_with_sentinels_and_stray_spellings():
+    assert to_float(pd.Series(['1.5', '--', 'n/a', '-2', '1e3'])).to_pylist() == [1.5, None, None, -2.0, 1000.0]
+    parsed = to_float(pd.Series(['1,234', '7', 'abc']))
+    assert parsed.type == pa.float64()
+    assert parsed.to_pylist() == [None, 7.0, None]
+    assert to_float(pa.array([1, 2], pa.int32())).to_pylist() == [1.0, 2.0]
+
+
+def test_normalize_dataframe_keeps_the_index_and_other_columns():
+    df = pd.DataFrame({'region': ['Europe', '--', ''], 'g7': ['yes', 'no', None],
+                       'value': ['1', 'n/a', '2.5'], 'other': ['--', 'x', 'y']}, index=[10, 20, 30])
+    out = normalize(df, text=['region', 'missing'], flags=['g7'], numbers=['value'])
+    assert out.index.tolist() == [10, 20, 30]
+    assert out['region'].isna().tolist() == [False, True, True]
+    assert out['g7'].dtype == bool and out['g7'].tolist() == [True, False, False]
+    assert out['value'].dtype == np.float64 and np.isnan(out['value'].iloc[1])
+    assert out['other'].tolist() == ['--', 'x', 'y']
+    assert df['region'].tolist() == ['Europe', '--', '']  # input untouched
+
+
+def test_normalize_arrow_table_returns_a_table():
+    table = pa.table({'flag': ['Y', 'N'], 'value': ['3', '--']})
+    out = normalize(table, flags=['flag'], numbers=['value'])
+    assert isinstance(out, pa.Table)
+    assert out.column('flag').to_pylist() == [True, False]
+    assert out.column('value').to_pylist() == [3.0, None]
+
+
+def test_sql_rows_give_none_for_missing_values():
+    df = pd.DataFrame({'name': ['a', None], 'value': [1.0, np.nan]})
+    assert sql_rows(df) == [('a', 1.0), (None, None)]
+    assert sql_rows(pa.Table.from_pandas(df)) == [('a', 1.0), (None, None)]
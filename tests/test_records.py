@@ -0,0 +1,15 @@
+import pandas as pd
+
+from cmu_datasets.paths import TITANIC_DIR, TITANIC_PARQUET
+from cmu_datasets.records import Passengers
+
+
+def test_usage_example_runs_on_the_committed_parquet():
+    passengers = Passengers.from_frame(pd.read_parquet(TITANIC_PARQUET))
+    children = [p.passenger_id for p in passengers.scan() if p.survived and p.age < 10]
+    adults = passengers.take(passengers.column('age') >= 18)
+
+    source = pd.read_csv(TITANIC_DIR / 'titanic.csv')
+    assert len(passengers) == len(source)
+    assert len(children) == int((source['survived'].astype(bool) & (source['age'] < 10)).sum())
+    assert len(adults) == int((source['age'] >= 18).sum())
@@ -0,0 +1,114 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from cmu_datasets.paths import WEO_OBSERVATIONS
+from cmu_datasets.timeseries import (cagr, cagr_between, panel, rank, rolling_mean, rolling_std, to_frame,
+                                     window_query, yoy)
+
+WINDOW = 5
+
+
+@pytest.fixture
+def observations():
+    """Long NGDP_R-like series with gaps, a zero and a sign change."""
+    rng = np.random.default_rng(48)
+    rows = []
+    for i in range(25):
+        level = 100 * rng.lognormal()
+        for year in range(1980, 2031):
+            level *= 1 + rng.normal(0.03, 0.05)
+            if rng.random() < 0.1:
+                continue  # gap
+            rows.append((f'C{i:02d}', year, level))
+    df = pd.DataFrame(rows, columns=['iso_code', 'year', 'value'])
+    df.loc[5, 'value'] = 0.0
+    df.loc[df['iso_code'] == 'C03', 'value'] *= np.where(df.loc[df['iso_code'] == 'C03', 'year'] < 2000, -1, 1)
+    return df
+
+
+def reference(df):
+    """The long table on a full country x year grid, one column per country."""
+    years = range(df['year'].min(), df['year'].max() + 1)
+    return df.pivot(index='year', columns='iso_code', values='value').reindex(years)
+
+
+def test_panel_scatters_long_rows(observations):
+    gdp = panel(observations)
+    wide = reference(observations)
+    assert gdp.years.tolist() == wide.index.tolist()
+    assert gdp.countries.tolist() == wide.columns.tolist()
+    np.testing.assert_array_equal(gdp.values, wide.to_numpy().T)
+
+
+def test_panel_rejects_duplicates():
+    with pytest.raises(ValueError):
+        panel(pd.DataFrame({'iso_code': ['A', 'A'], 'year': [2000, 2000], 'value': [1.0, 2.0]}))
+
+
+def test_kernels_match_pandas(observations):
+    gdp, wide = panel(observations), reference(observations)
+    growth = (wide / wide.shift(1) - 1) * 100
+    growth[wide.shift(1) == 0] = np.nan
+    ratio = wide / wide.shift(WINDOW)
+    expected_cagr = (ratio ** (1 / WINDOW) - 1) * 100
+    expected_cagr[~(ratio > 0) | (wide.shift(WINDOW) == 0)] = np.nan
+
+    np.testing.assert_allclose(yoy(gdp).values, growth.to_numpy().T, rtol=1e-9)
+    np.testing.assert_allclose(cagr(gdp, WINDOW).values, expected_cagr.to_numpy().T, rtol=1e-9)
+    np.testing.assert_allclose(rolling_mean(gdp, WINDOW).values,
+                               wide.rolling(WINDOW).mean().to_numpy().T, rtol=1e-9)
+    np.testing.assert_allclose(rolling_mean(gdp, WINDOW, min_periods=2).values,
+                               wide.rolling(WINDOW, min_periods=2).mean().to_numpy().T, rtol=1e-9)
+    np.testing.assert_allclose(rolling_std(yoy(gdp), WINDOW).values,
+                               growth.rolling(WINDOW).std().to_numpy().T, rtol=1e-7)
+    np.testing.assert_array_equal(rank(yoy(gdp)).values,
+                                  growth.rank(axis=1, method='min', ascending=False).to_numpy().T)
+
+
+def test_cagr_between(observations):
+    gdp, wide = panel(observations), reference(observations)
+    expected = ((wide.loc[2010] / wide.loc[2000]) ** (1 / 10) - 1) * 100
+    expected[~(wide.loc[2010] / wide.loc[2000] > 0)] = np.nan
+    np.testing.assert_allclose(cagr_between(gdp, 2000, 2010), expected.to_numpy(), rtol=1e-9)
+    zero_base = panel(pd.DataFrame({'iso_code': ['A', 'A'], 'year': [2000, 2010], 'value': [0.0, 5.0]}))
+    assert np.isnan(cagr_between(zero_base, 2000, 2010)).all()
+    assert np.isnan(cagr(zero_base, 10).values).all()
+    with pytest.raises(TypeError):
+        cagr_between(gdp.values, 2000, 2010)
+
+
+@pytest.mark.parametrize('start, end', [(1998, 2004), (2000, 2006), (2002, 2002), (2004, 2000)])
+def test_cagr_between_rejects_years_outside_the_panel(start, end):
+    years = np.arange(2000, 2005)
+    short = panel(pd.DataFrame({'iso_code': ['A'] * 5, 'year': years, 'value': 100 * 1.05 ** (years - 2000)}))
+    with pytest.raises(ValueError):
+        cagr_between(short, start, end)
+    np.testing.assert_allclose(cagr_between(short, 2000, 2004), [5.0])
+
+
+def test_rank_shares_the_lowest_rank_on_ties():
+    values = np.array([[3.0], [5.0], [3.0], [np.nan], [1.0]])
+    assert rank(values).ravel().tolist()[:3] == [2.0, 1.0, 2.0]
+    assert np.isnan(rank(values)[3, 0])
+    assert rank(values, ascending=True)[4, 0] == 1.0
+
+
+def test_window_query_matches_the_numpy_kernels(observations):
+    conn = duckdb.connect()
+    conn.register('source', observations.assign(subject_code='NGDP_R'))
+    conn.execute(f"CREATE TABLE {WEO_OBSERVATIONS} AS SELECT iso_code, subject_code, year, value FROM source")
+    sql, params = window_query('NGDP_R', window=WINDOW)
+    database = conn.execute(sql, params).df()
+
+    gdp = panel(observations)
+    growth = yoy(gdp)
+    kernels = to_frame(gdp, growth=growth, cagr=cagr(gdp, WINDOW),
+                       rolling_mean=rolling_mean(gdp, WINDOW), volatility=rolling_std(growth, WINDOW),
+                       growth_rank=rank(growth))
+
+    assert database[['iso_code', 'year']].values.tolist() == kernels[['iso_code', 'year']].values.tolist()
+    for column in ['value', 'growth', 'cagr', 'rolling_mean', 'volatility', 'growth_rank']:
+        np.testing.assert_allclose(database[column].astype(float).to_numpy(), kernels[column].to_numpy(),
+                                   rtol=1e-9, err_msg=column)
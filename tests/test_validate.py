@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from cmu_datasets.validate import (WEO_RULES, ValidationError, in_range, not_null, references, unique,
+                                   validate)
+
+
+def violations(report):
+    return {(v.table, v.rule, v.columns): v.rows for v in report.violations}
+
+
+def test_not_null_counts_blank_strings_and_nan():
+    df = pd.DataFrame({'name': ['a', '', '  ', None, 'b'], 'value': [1.0, 2.0, np.nan, 4.0, 5.0]})
+    report = validate({'t': df}, {'t': [not_null('name'), not_null('value')]})
+    assert violations(report) == {('t', 'not_null', ('name',)): 3, ('t', 'not_null', ('value',)): 1}
+    assert not report.ok
+
+
+def test_unique_checks_composite_keys_and_skips_missing_parts():
+    df = pd.DataFrame({'iso': ['USA', 'USA', 'USA', 'FRA', None, None],
+                       'year': [2000, 2001, 2000, 2000, 2000, 2000]})
+    report = validate({'t': df}, {'t': [unique('iso', 'year'), unique('iso')]})
+    assert violations(report) == {('t', 'unique', ('iso', 'year')): 1, ('t', 'unique', ('iso',)): 2}
+    [composite, _] = report.violations
+    assert composite.examples == [('USA', 2000)]
+
+
+def test_in_range_is_inclusive_and_open_ended():
+    df = pd.DataFrame({'year': [1979, 1980, 2030, 2031, None]})
+    bounded = validate({'t': df}, {'t': [in_range('year', 1980, 2030)]})
+    low_only = validate({'t': df}, {'t': [in_range('year', low=2000)]})
+    assert violations(bounded) == {('t', 'in_range', ('year',)): 2}
+    assert violations(low_only) == {('t', 'in_range', ('year',)): 2}
+
+
+def test_references_ignores_missing_values():
+    parents = pd.DataFrame({'iso_code': ['USA', 'FRA']})
+    children = pd.DataFrame({'iso_code': ['USA', 'DEU', None, 'DEU']})
+    report = validate({'countries': parents, 'metrics': children},
+                      {'countries': [], 'metrics': [references('iso_code', 'countries')]})
+    assert violations(report) == {('metrics', 'references', ('iso_code',)): 2}
+    assert report.violations[0].examples == ['DEU', 'DEU']
+
+
+def test_references_casts_the_key_type_and_uses_another_key_name():
+    parents = pd.DataFrame({'id': np.array([1, 2], dtype=np.int32)})
+    children = pd.DataFrame({'parent': np.array([1, 3], dtype=np.int64)})
+    report = validate({'p': parents, 'c': children}, {'p': [], 'c': [references('parent', 'p', 'id')]})
+    assert violations(report) == {('c', 'references', ('parent',)): 1}
+
+
+def test_drop_rules_shrink_the_keep_mask_and_the_referenced_keys():
+    countries = pd.DataFrame({'iso_code': ['USA', None, 'FRA'], 'name': ['United States', 'Nowhere', '']})
+    metrics = pd.DataFrame({'iso_code': ['USA', 'FRA']})
+    rules = {'countries': [not_null('iso_code', 'name', action='drop')],
+             'metrics': [references('iso_code', 'countries')]}
+    report = validate({'countries': countries, 'metrics': metrics}, rules)
+    assert report.keep('countries').tolist() == [True, False, False]
+    assert report.dropped('countries') == 2
+    # FRA was dropped from countries, so its metrics no longer reference anything
+    assert violations(report)[('metrics', 'references', ('iso_code',))] == 1
+    assert [v.action for v in report.errors] == ['error']
+
+
+def test_raise_for_errors_carries_the_report():
+    report = validate({'t': pd.DataFrame({'id': [1, 1]})}, {'t': [unique('id')]})
+    with pytest.raises(ValidationError) as raised:
+        report.raise_for_errors()
+    assert raised.value.report is report
+    assert 'unique(id): 1 rows' in str(raised.value)
+
+
+def test_drop_only_violations_pass():
+    report = validate({'t': pd.DataFrame({'id': [1, None]})}, {'t': [not_null('id', action='drop')]})
+    report.raise_for_errors()
+    assert report.ok and 'not_null(id): 1 dropped' in str(report)
+
+
+def test_arrow_tables_match_dataframes():
+    df = pd.DataFrame({'iso': ['USA', 'USA', ''], 'year': [2000, 2000, 2040]})
+    rules = {'t': [not_null('iso'), unique('iso', 'year'), in_range('year', 1980, 2030)]}
+    from_pandas = validate({'t': df}, rules)
+    from_arrow = validate({'t': pa.Table.from_pandas(df)}, rules)
+    assert violations(from_pandas) == violations(from_arrow) == {
+        ('t', 'not_null', ('iso',)): 1, ('t', 'unique', ('iso', 'year')): 1, ('t', 'in_range', ('year',)): 1}
+
+
+def test_weo_rules_on_a_clean_and_a_broken_load():
+    countries = pd.DataFrame({'country_id': [1, 2], 'iso_code': ['USA', 'FRA'], 'name': ['US', 'France']})
+    indicators = pd.DataFrame({'indicator_id': [1], 'subject_code': ['NGDP_R']})
+    metrics = pd.DataFrame({'metric_id': [1, 2, 3], 'iso_code': ['USA', 'FRA', 'FRA'],
+                            'subject_code': ['NGDP_R'] * 3, 'year': [2000, 2000, 2001]})
+    tables = {'countries': countries, 'indicators': indicators, 'metrics': metrics}
+    assert validate(tables, WEO_RULES).violations == []
+
+    tables['metrics'] = metrics.assign(iso_code=['USA', 'FRA', 'XXX'], year=[2000, 2000, 1900])
+    assert violations(validate(tables, WEO_RULES)) == {
+        ('metrics', 'in_range', ('year',)): 1, ('metrics', 'references', ('iso_code',)): 1}